@@ -0,0 +1,151 @@
+"""In-process response cache with push invalidation.
+
+Scoring (core/scoring.py) and ingest (ingest/load_db.py) publish on the
+``sovai_data_changed`` channel inside their write transactions; Postgres
+delivers the NOTIFY when they commit. Every API worker runs a listener
+thread that bumps the data version and drops cached entries as soon as a
+notification arrives, so there is no TTL to wait out.
+
+Entries are keyed by (endpoint, params, data version). The cache is only
+used while the listener is connected: if the LISTEN connection drops we
+serve uncached reads rather than risk stale ones.
+
+Settings (env):
+  - API_CACHE_SIZE   max cached entries per worker, 0 disables (default 256)
+"""
+
+import logging
+import os
+import select
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+import psycopg2
+
+from api import db
+from core.scoring import DATA_CHANGED_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+_MISS = object()
+
+
+class ResponseCache:
+    """Bounded, thread-safe LRU mapping."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return _MISS
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_cache = ResponseCache(int(os.getenv("API_CACHE_SIZE", "256")))
+_version = 0
+_version_lock = threading.Lock()
+_listening = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def data_version() -> Optional[int]:
+    """Current data version, or None while no listener is connected."""
+    return _version if _listening.is_set() else None
+
+
+def bump_version():
+    """Mark all cached data stale (called on every change notification)."""
+    global _version
+    with _version_lock:
+        _version += 1
+        _cache.clear()
+
+
+async def cached(endpoint: str, params: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Return the cached result for (endpoint, params) or run ``loader``."""
+    version = data_version()
+    if version is None or _cache.maxsize <= 0:
+        return await loader()
+    key = (endpoint, params, version)
+    hit = _cache.get(key)
+    if hit is not _MISS:
+        return hit
+    value = await loader()
+    # Don't store a result that raced with a rescore
+    if data_version() == version:
+        _cache.put(key, value)
+    return value
+
+
+def _listen_forever():
+    backoff = 0.5
+    while not _stop.is_set():
+        conn = None
+        try:
+            conn = db.get_conn()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {DATA_CHANGED_CHANNEL};")
+            # Anything cached before (re)connecting may have missed a notification
+            bump_version()
+            _listening.set()
+            backoff = 0.5
+            while not _stop.is_set():
+                # Short timeout only bounds shutdown latency; NOTIFY wakes select at once
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                if conn.notifies:
+                    conn.notifies.clear()
+                    bump_version()
+        except (psycopg2.Error, OSError) as e:
+            logger.warning("Cache listener disconnected: %s", e)
+        finally:
+            _listening.clear()
+            if conn is not None:
+                conn.close()
+        _stop.wait(backoff)
+        backoff = min(backoff * 2, 30.0)
+
+
+def start_listener():
+    """Start the LISTEN thread (called from the app lifespan)."""
+    global _thread
+    if _cache.maxsize <= 0 or (_thread is not None and _thread.is_alive()):
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_listen_forever, name="cache-listener", daemon=True)
+    _thread.start()
+
+
+def stop_listener():
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=5)
+        _thread = None
+    _cache.clear()
@@ -0,0 +1,338 @@
+"""Database access for the API.
+
+The app keeps one connection pool per process, opened and closed with the
+FastAPI lifespan, so handlers borrow a connection through ``cursor()``
+instead of dialing Postgres on every request.
+
+Pool settings (env, next to the DB_* connection settings):
+  - DB_POOL_MIN              connections opened at startup and kept warm (default 1)
+  - DB_POOL_MAX              hard cap on open connections (default 10)
+  - DB_POOL_TIMEOUT          seconds to wait for a free connection (default 5)
+  - DB_POOL_VALIDATE_AFTER   idle seconds after which a checkout is pinged (default 30)
+  - DB_ASYNC                 1 to serve queries through an async psycopg 3 pool
+
+Handlers use ``cursor(query)``, an async context manager yielding a cursor
+with awaitable ``execute`` / ``fetchone`` / ``fetchall``; ``query`` is the
+logical name its executes are timed under (/metrics, Server-Timing). In
+async mode it wraps a native psycopg 3 ``AsyncCursor``; otherwise the
+psycopg2 calls run on the threadpool so the event loop never blocks on the
+database. Without an open pool (scripts and tests that skip the lifespan)
+it dials a one-off connection and closes it afterwards.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions as pg_ext
+from psycopg2.pool import PoolError
+from starlette.concurrency import run_in_threadpool
+
+from api import metrics, timing
+
+logger = logging.getLogger(__name__)
+
+
+def _conn_kwargs() -> dict:
+    return dict(
+        dbname=os.getenv("DB_NAME", "sovai"),
+        user=os.getenv("DB_USER", "sovai"),
+        password=os.getenv("DB_PASSWORD", "sovai"),
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+    )
+
+
+def get_conn():
+    return psycopg2.connect(**_conn_kwargs())
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT."""
+
+
+class ConnectionPool:
+    """Small thread-safe psycopg2 pool with checkout validation.
+
+    Idle connections are reused LIFO. A checked-out connection is dropped and
+    replaced when it is closed, its server link is gone, or (after sitting idle
+    longer than ``validate_after``) it fails a ``SELECT 1`` ping.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, validate_after: float):
+        self.minconn = minconn
+        self.maxconn = max(1, maxconn)
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self._idle: List[Tuple[object, float]] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        for _ in range(min(minconn, self.maxconn)):
+            try:
+                conn = self._connect()
+            except psycopg2.OperationalError as e:
+                # Keep the API up (e.g. /health) and dial lazily once the DB is back
+                logger.warning("DB pool warm-up failed: %s", e)
+                break
+            self._idle.append((conn, time.monotonic()))
+            self._size += 1
+
+    def _connect(self):
+        conn = get_conn()
+        conn.autocommit = True
+        return conn
+
+    def _usable(self, conn, idle_for: float) -> bool:
+        if conn.closed or conn.info.transaction_status == pg_ext.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if idle_for < self.validate_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                while not self._closed and not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout("no database connection available")
+                    self._cond.wait(remaining)
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                else:
+                    self._size += 1
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            if self._usable(conn, time.monotonic() - last_used):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn, broken: bool = False):
+        if not broken and not conn.closed:
+            status = conn.info.transaction_status
+            if status == pg_ext.TRANSACTION_STATUS_UNKNOWN:
+                broken = True
+            else:
+                try:
+                    if status != pg_ext.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if not conn.autocommit:
+                        conn.autocommit = True
+                except psycopg2.Error:
+                    broken = True
+        if broken or conn.closed or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def size(self) -> Tuple[int, int]:
+        """(open connections, idle connections)."""
+        with self._cond:
+            return self._size, len(self._idle)
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_async_pool = None  # psycopg_pool.AsyncConnectionPool when DB_ASYNC=1
+
+
+def async_enabled() -> bool:
+    return os.getenv("DB_ASYNC", "0").strip().lower() in {"1", "true", "yes"}
+
+
+def open_pool():
+    """Create the process-wide sync pool (called from the app lifespan)."""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(
+            minconn=int(os.getenv("DB_POOL_MIN", "1")),
+            maxconn=int(os.getenv("DB_POOL_MAX", "10")),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+            validate_after=float(os.getenv("DB_POOL_VALIDATE_AFTER", "30")),
+        )
+    return _pool
+
+
+def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.closeall()
+        _pool = None
+
+
+async def open_async_pool():
+    """Create the async pool; requires the optional psycopg 3 packages."""
+    global _async_pool
+    if _async_pool is not None:
+        return _async_pool
+    try:
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError as e:  # pragma: no cover - depends on optional deps
+        raise RuntimeError(
+            "DB_ASYNC=1 needs 'psycopg[binary]' and 'psycopg-pool' installed"
+        ) from e
+
+    pool = AsyncConnectionPool(
+        conninfo="",
+        kwargs={**_conn_kwargs(), "autocommit": True},
+        min_size=int(os.getenv("DB_POOL_MIN", "1")),
+        max_size=int(os.getenv("DB_POOL_MAX", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+        check=AsyncConnectionPool.check_connection,
+        open=False,
+    )
+    # Don't block startup on the DB; the pool fills in the background
+    await pool.open(wait=False)
+    _async_pool = pool
+    return pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+class _ThreadedCursor:
+    """Awaitable facade over a psycopg2 cursor.
+
+    ``execute`` runs on the threadpool; psycopg2 cursors buffer results
+    client-side, so the fetch calls never touch the network.
+    """
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    async def execute(self, sql, params=None):
+        await run_in_threadpool(self._cur.execute, sql, params)
+
+    async def fetchone(self):
+        return self._cur.fetchone()
+
+    async def fetchall(self):
+        return self._cur.fetchall()
+
+
+def _record_wait(seconds: float, pool: str):
+    metrics.POOL_WAIT_SECONDS.observe(seconds, (pool,))
+    timing.add("conn", seconds)
+
+
+class _TimedCursor:
+    """Records each execute under the cursor's logical query name."""
+
+    def __init__(self, cur, query: str):
+        self._cur = cur
+        self._query = (query,)
+
+    async def execute(self, sql, params=None):
+        start = time.perf_counter()
+        try:
+            await self._cur.execute(sql, params)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.QUERY_SECONDS.observe(elapsed, self._query)
+            timing.add("db", elapsed)
+
+    async def fetchone(self):
+        return await self._cur.fetchone()
+
+    async def fetchall(self):
+        return await self._cur.fetchall()
+
+
+@asynccontextmanager
+async def cursor(query: str = "other"):
+    """Borrow a connection and yield an awaitable cursor (see module docs)."""
+    start = time.perf_counter()
+    if _async_pool is not None:
+        from psycopg_pool import PoolTimeout as AsyncPoolTimeout
+
+        try:
+            async with _async_pool.connection() as conn, conn.cursor() as cur:
+                _record_wait(time.perf_counter() - start, "async")
+                yield _TimedCursor(cur, query)
+        except AsyncPoolTimeout as e:
+            raise PoolTimeout(str(e)) from e
+        return
+
+    pool = _pool
+    conn = await run_in_threadpool(pool.getconn if pool is not None else get_conn)
+    if pool is not None:
+        _record_wait(time.perf_counter() - start, "sync")
+    else:
+        timing.add("conn", time.perf_counter() - start)
+    broken = False
+    try:
+        with conn.cursor() as cur:
+            yield _TimedCursor(_ThreadedCursor(cur), query)
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        if pool is None:
+            conn.close()
+        else:
+            pool.putconn(conn, broken=broken)
+
+
+def _pool_connections():
+    if _async_pool is not None:
+        stats = _async_pool.get_stats()
+        size, idle = stats.get("pool_size", 0), stats.get("pool_available", 0)
+    elif _pool is not None:
+        size, idle = _pool.size()
+    else:
+        return []
+    return [(("idle",), idle), (("in_use",), size - idle)]
+
+
+metrics.register(
+    metrics.Gauge(
+        "sovai_db_pool_connections",
+        "Open pooled database connections by state.",
+        ("state",),
+        _pool_connections,
+    )
+)
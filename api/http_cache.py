@@ -0,0 +1,126 @@
+"""ETag / Last-Modified support for the read endpoints.
+
+Validators come from the ``data_version`` row that scoring and ingest bump
+in every transaction that changes what the API serves, including in-place
+updates such as renames and re-parsed indicators. The ETag hashes its
+version; Last-Modified is its ``updated_at``. That row is itself cached per
+data version (see api/cache.py), so a revalidation normally answers 304
+without touching Postgres and always without building or serializing the
+payload.
+
+The ETag is strong and identical across workers because it only depends on
+database state, the endpoint and its parameters. In read-only mode the
+snapshot file's content version takes the place of the database state.
+
+Endpoints that negotiate a content coding (api/payloads.py) pass it as
+``coding``: each compressed variant gets its own ETag (``"<etag>-gzip"``)
+and responses, 304s included, carry ``Vary: Accept-Encoding``.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from api import cache, db
+
+
+async def _load_state() -> tuple:
+    async with db.cursor("validators") as cur:
+        await cur.execute("SELECT version, updated_at FROM data_version;")
+        # No row until db/schema.sql has been applied
+        return await cur.fetchone() or (None, None)
+
+
+async def validators(endpoint: str, params: Hashable) -> Tuple[str, Optional[datetime]]:
+    """Return (etag, last_modified) for a response of ``endpoint(params)``."""
+    version, updated_at = await cache.cached("validators", (), _load_state)
+    digest = hashlib.sha1(repr((endpoint, params, version)).encode("utf-8")).hexdigest()
+    last_modified = None
+    if updated_at is not None:
+        # updated_at is written as naive UTC by the writers
+        last_modified = updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+    return f'"{digest[:32]}"', last_modified
+
+
+def snapshot_validators(
+    snap, endpoint: str, params: Hashable
+) -> Tuple[str, Optional[datetime]]:
+    """(etag, last_modified) for a response served from a core.snapshot.Snapshot."""
+    digest = hashlib.sha1(
+        repr((endpoint, params, "snapshot", snap.version)).encode("utf-8")
+    ).hexdigest()
+    last_modified = None
+    if snap.computed_at is not None:
+        last_modified = snap.computed_at.replace(tzinfo=timezone.utc, microsecond=0)
+    return f'"{digest[:32]}"', last_modified
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return etag in candidates
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        return _etag_matches(inm, etag)
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
+    return False
+
+
+def headers_for(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """Strong ETags must differ between content codings of the same resource."""
+    return etag if coding == "identity" else f'{etag[:-1]}-{coding}"'
+
+
+async def check(
+    request: Request,
+    response: Response,
+    endpoint: str,
+    params: Hashable,
+    coding: Optional[str] = None,
+) -> Optional[Response]:
+    """Set validator headers on ``response``; return a 304 if the client is current."""
+    etag, last_modified = await validators(endpoint, params)
+    return respond(request, response, etag, last_modified, coding)
+
+
+def respond(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime],
+    coding: Optional[str] = None,
+) -> Optional[Response]:
+    """check() for validators computed elsewhere."""
+    if coding is not None:
+        etag = coded_etag(etag, coding)
+    headers = headers_for(etag, last_modified)
+    if coding is not None:
+        headers["Vary"] = "Accept-Encoding"
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
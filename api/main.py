@@ -1,17 +1,64 @@
 """SovAI Index API (FastAPI)
 
 Endpoints provide transparent, structured data for the frontend and demo.
+
+With ``API_READ_ONLY=1``, ``/countries``, ``/compare``, the rankings and
+``/simulate`` are served from the memory-mapped score snapshot written by
+scoring (core/snapshot.py) and the worker opens no Postgres connection at
+all. Endpoints only Postgres can answer (``/country/{iso}``, history,
+export) then return 503, unless ``API_READ_ONLY_DB=1`` keeps them (and a
+connection pool, without the cache listener).
+
+``/countries`` and ``/methodology`` answer with bodies serialized and
+compressed once per data (or snapshot) version (api/payloads.py).
 """
 
+import functools
 import os
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Annotated, Dict, List, Literal, Optional, Tuple
 
-import psycopg2
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-
-app = FastAPI(title="SovAI Index API", version="0.2")
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from api import cache, db, http_cache, metrics, payloads, simulation, timing
+from core import export as score_export
+from core import rankings, scoring, snapshot
+
+READ_ONLY = os.getenv("API_READ_ONLY", "0").strip().lower() in {"1", "true", "yes"}
+# Read-only workers still serve the Postgres-only endpoints when set
+READ_ONLY_DB = os.getenv("API_READ_ONLY_DB", "0").strip().lower() in {"1", "true", "yes"}
+
+_snapshots = snapshot.SnapshotReader()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared DB pool on startup and close it on shutdown."""
+    timing.configure_logging()
+    if not READ_ONLY or READ_ONLY_DB:
+        if db.async_enabled():
+            await db.open_async_pool()
+        else:
+            db.open_pool()
+    # Snapshot reads follow the file, not NOTIFY; without the listener the
+    # response cache is bypassed, so DB reads in read-only mode stay fresh
+    if not READ_ONLY:
+        cache.start_listener()
+    try:
+        yield
+    finally:
+        cache.stop_listener()
+        await db.close_async_pool()
+        db.close_pool()
+
+
+app = FastAPI(title="SovAI Index API", version="0.2", lifespan=lifespan)
+# Notes when each endpoint returns so encoding time shows up in Server-Timing
+app.router.route_class = timing.TimedRoute
 
 # Allow local dev frontend to call API
 app.add_middleware(
@@ -21,16 +68,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(timing.TimingMiddleware)
+# Outermost, so timings include CORS and exception handling
+app.add_middleware(metrics.MetricsMiddleware)
 
 
-def get_conn():
-    return psycopg2.connect(
-        dbname=os.getenv("DB_NAME", "sovai"),
-        user=os.getenv("DB_USER", "sovai"),
-        password=os.getenv("DB_PASSWORD", "sovai"),
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432"),
-    )
+@app.exception_handler(db.PoolTimeout)
+def pool_timeout_handler(request: Request, exc: db.PoolTimeout):
+    return JSONResponse(status_code=503, content={"detail": "Database busy, retry shortly"})
 
 
 # ---------- Pydantic Models ----------
@@ -78,6 +123,108 @@ class CountryDetail(BaseModel):
     methodology: dict
 
 
+class HistoryPoint(BaseModel):
+    """One snapshot, or one bucket of snapshots when downsampled."""
+
+    iso_code: str
+    computed_at: str  # snapshot time, or bucket start when bucketed
+    readiness_score: Optional[float] = None
+    policy_score: Optional[float] = None
+    infra_score: Optional[float] = None
+    language_score: Optional[float] = None
+    risk_score: Optional[float] = None
+    samples: int = 1
+
+
+class History(BaseModel):
+    """A page of score history; pass ``next_after`` as ``after`` for the next page."""
+
+    bucket: str
+    agg: str
+    points: List[HistoryPoint] = []
+    next_after: Optional[str] = None
+
+
+RankComponent = Literal["readiness", "policy", "infra", "language", "risk"]
+
+
+class RankingEntry(BaseModel):
+    rank: int  # ties share the better rank
+    iso_code: str
+    name: str
+    region: Optional[str] = None
+    value: float
+    percentile: float  # 100 = best in scope, 0 = worst
+
+
+class Ranking(BaseModel):
+    """Best-first slice of a precomputed ranking."""
+
+    component: str
+    region: Optional[str] = None  # None: all countries
+    lower_is_better: bool
+    total: int  # countries ranked in this scope
+    computed_at: Optional[str] = None
+    entries: List[RankingEntry] = []
+
+
+class ComponentRank(BaseModel):
+    component: str
+    scope: str  # "all" or the country's region
+    rank: int
+    total: int
+    percentile: float
+    value: float
+
+
+class CountryRank(BaseModel):
+    iso_code: str
+    name: str
+    region: Optional[str] = None
+    computed_at: Optional[str] = None
+    ranks: List[ComponentRank] = []
+
+
+ComponentScore = Annotated[float, Field(ge=0, le=100)]
+Weight = Annotated[float, Field(ge=0, le=1)]
+
+
+class SimulationWeights(BaseModel):
+    """Component weights; omitted ones keep the methodology defaults."""
+
+    policy: Weight = scoring.WEIGHTS["policy"]
+    infra: Weight = scoring.WEIGHTS["infra"]
+    language: Weight = scoring.WEIGHTS["language"]
+    risk_penalty: Weight = scoring.WEIGHTS["risk_penalty"]
+
+
+class SimulationRequest(BaseModel):
+    weights: SimulationWeights = SimulationWeights()
+    infra: Dict[str, ComponentScore] = {}  # ISO code -> infra score to use instead
+    language: Dict[str, ComponentScore] = {}  # ISO code -> language score to use instead
+    top: Optional[int] = Field(default=None, ge=1)  # only return the best N
+
+
+class SimulatedScore(BaseModel):
+    iso_code: str
+    name: str
+    rank: int
+    baseline_rank: int
+    readiness_score: float
+    baseline_readiness_score: float
+    policy_score: float
+    infra_score: float
+    language_score: float
+    risk_score: float
+
+
+class Simulation(BaseModel):
+    """Every scored country re-ranked under the requested weights."""
+
+    weights: Dict[str, float]
+    countries: List[SimulatedScore] = []
+
+
 # ---------- Routes ----------
 
 
@@ -87,201 +234,674 @@ def health():
     return {"status": "ok"}
 
 
+def _database():
+    """Dependency of routes that only Postgres can answer."""
+    if READ_ONLY and not READ_ONLY_DB:
+        raise HTTPException(
+            status_code=503, detail="Not served in read-only mode (see API_READ_ONLY_DB)"
+        )
+
+
+def _from_snapshot(
+    request: Request,
+    response: Response,
+    endpoint: str,
+    params,
+    build,
+    coding: Optional[str] = None,
+):
+    """Serve ``build(snapshot)`` with validators derived from the snapshot version."""
+    try:
+        snap = _snapshots.get()
+    except snapshot.SnapshotError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    etag, last_modified = http_cache.snapshot_validators(snap, endpoint, params)
+    not_modified = http_cache.respond(request, response, etag, last_modified, coding)
+    if not_modified is not None:
+        return not_modified
+    return build(snap)
+
+
+_SUMMARY_FIELDS = tuple(CountrySummary.model_fields)
+
+
+def _summary(iso_code: str, name: str, *scores) -> dict:
+    """A CountrySummary as a plain dict (same keys and order) from a row of scores."""
+    values = (float(v) if v is not None else None for v in scores)
+    return dict(zip(_SUMMARY_FIELDS, (iso_code, name, *values)))
+
+
+_snapshot_countries: Optional[tuple] = None  # (snapshot version, Payload)
+
+
+def _snapshot_countries_payload(snap) -> payloads.Payload:
+    global _snapshot_countries
+    current = _snapshot_countries
+    if current is not None and current[0] == snap.version:
+        return current[1]
+    built = payloads.Payload.of(
+        [_summary(*(row[f] for f in _SUMMARY_FIELDS)) for row in snap.rows()]
+    )
+    _snapshot_countries = (snap.version, built)
+    return built
+
+
 @app.get("/countries", response_model=List[CountrySummary])
-def list_countries():
+async def list_countries(request: Request, response: Response):
     """List countries with latest scores for overview table."""
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT c.iso_code,
-               c.name,
-               rs.score,
-               rs.policy_score,
-               rs.infra_score,
-               rs.language_score,
-               rs.risk_score
-        FROM countries c
-        LEFT JOIN LATERAL (
-            SELECT r.score, r.policy_score, r.infra_score, r.language_score, r.risk_score
-            FROM readiness_scores r
-            WHERE r.country_id = c.id
-            ORDER BY r.computed_at DESC
-            LIMIT 1
-        ) rs ON true
-        ORDER BY c.name;
-        """
-    )
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-    return [
-        CountrySummary(
-            iso_code=iso,
+    coding = payloads.negotiate(request.headers.get("accept-encoding"))
+    if READ_ONLY:
+        return _from_snapshot(
+            request, response, "countries", (),
+            lambda snap: payloads.respond(
+                _snapshot_countries_payload(snap), coding, response.headers
+            ),
+            coding,
+        )
+    not_modified = await http_cache.check(request, response, "countries", (), coding)
+    if not_modified is not None:
+        return not_modified
+    payload = await cache.cached("countries", (), _load_countries)
+    return payloads.respond(payload, coding, response.headers)
+
+
+async def _load_countries() -> payloads.Payload:
+    async with db.cursor("latest_scores") as cur:
+        await cur.execute(
+            """
+            SELECT c.iso_code,
+                   c.name,
+                   rs.score,
+                   rs.policy_score,
+                   rs.infra_score,
+                   rs.language_score,
+                   rs.risk_score
+            FROM countries c
+            LEFT JOIN latest_scores rs ON rs.country_id = c.id
+            ORDER BY c.name;
+            """
+        )
+        rows = await cur.fetchall()
+    with timing.phase("model"):
+        return payloads.Payload.of([_summary(*row) for row in rows])
+
+
+@app.get(
+    "/country/{iso_code}", response_model=CountryDetail, dependencies=[Depends(_database)]
+)
+async def get_country(iso_code: str, request: Request, response: Response):
+    """Country details including provenance of key indicators."""
+    iso = iso_code.upper()
+    not_modified = await http_cache.check(request, response, "country", iso)
+    if not_modified is not None:
+        return not_modified
+    return await cache.cached("country", iso, lambda: _load_country(iso))
+
+
+async def _load_country(iso_code: str) -> CountryDetail:
+    """One round trip: the latest score comes from latest_scores and the
+    policies (with their indicators) are aggregated to nested JSON in SQL.
+    """
+    async with db.cursor("country_detail") as cur:
+        await cur.execute(
+            """
+            SELECT c.name,
+                   rs.score,
+                   rs.policy_score,
+                   rs.infra_score,
+                   rs.language_score,
+                   rs.risk_score,
+                   rs.computed_at,
+                   COALESCE(pol.policies, '[]'::json)
+            FROM countries c
+            LEFT JOIN latest_scores rs ON rs.country_id = c.id
+            LEFT JOIN LATERAL (
+                SELECT json_agg(
+                           json_build_object(
+                               'id', p.id,
+                               'name', p.name,
+                               'source_url', p.source_url,
+                               'category', p.category,
+                               'status', p.status,
+                               'indicators', COALESCE(ind.items, '[]'::json)
+                           )
+                           ORDER BY p.name, p.id
+                       ) AS policies
+                FROM policies p
+                LEFT JOIN LATERAL (
+                    SELECT json_agg(
+                               json_build_object('key', pi.key, 'value', pi.value)
+                               ORDER BY pi.key
+                           ) AS items
+                    FROM policy_indicators pi
+                    WHERE pi.policy_id = p.id
+                ) ind ON true
+                WHERE p.country_id = c.id
+            ) pol ON true
+            WHERE c.iso_code = %s;
+            """,
+            (iso_code.upper(),),
+        )
+        row = await cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Country not found")
+    name, score, ps, iscore, ls, rs, computed_at, policies_json = row
+
+    with timing.phase("model"):
+        policies = [
+            Policy(
+                id=p["id"],
+                name=p["name"],
+                source_url=p["source_url"],
+                category=p["category"],
+                status=p["status"],
+                indicators=[
+                    PolicyIndicator(
+                        policy_name=p["name"],
+                        key=ind["key"],
+                        value=str(ind["value"]),
+                        source_url=p["source_url"],
+                    )
+                    for ind in p["indicators"]
+                ],
+            )
+            for p in policies_json
+        ]
+
+        methodology = methodology_spec()
+        return CountryDetail(
+            iso_code=iso_code.upper(),
             name=name,
             readiness_score=float(score) if score is not None else None,
             policy_score=float(ps) if ps is not None else None,
             infra_score=float(iscore) if iscore is not None else None,
             language_score=float(ls) if ls is not None else None,
             risk_score=float(rs) if rs is not None else None,
+            computed_at=computed_at.isoformat() if computed_at is not None else None,
+            policies=policies,
+            methodology=methodology,
         )
-        for (iso, name, score, ps, iscore, ls, rs) in rows
-    ]
 
 
-@app.get("/country/{iso_code}", response_model=CountryDetail)
-def get_country(iso_code: str):
-    """Country details including provenance of key indicators."""
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT c.id, c.name
-        FROM countries c
-        WHERE c.iso_code = %s;
-        """,
-        (iso_code.upper(),),
-    )
-    row = cur.fetchone()
-    if not row:
-        cur.close()
-        conn.close()
-        raise HTTPException(status_code=404, detail="Country not found")
-    cid, name = row
-
-    cur.execute(
-        """
-        SELECT score, policy_score, infra_score, language_score, risk_score, computed_at
-        FROM readiness_scores
-        WHERE country_id = %s
-        ORDER BY computed_at DESC
-        LIMIT 1;
-        """,
-        (cid,),
-    )
-    score_row = cur.fetchone()
-
-    # Fetch policies
-    cur.execute(
-        """
-        SELECT id, name, source_url, category, status
-        FROM policies
-        WHERE country_id = %s
-        ORDER BY name;
-        """,
-        (cid,),
-    )
-    policies_rows = cur.fetchall()
+@app.get("/compare", response_model=List[CountrySummary])
+async def compare(request: Request, response: Response, iso: List[str] = Query(default=[])):
+    """Compare multiple countries by ISO codes."""
+    if not iso:
+        return []
+    codes = tuple(sorted({i.upper() for i in iso}))
+    if READ_ONLY:
+        return _from_snapshot(
+            request, response, "compare", codes,
+            lambda snap: [CountrySummary(**row) for row in snap.select(codes)],
+        )
+    not_modified = await http_cache.check(request, response, "compare", codes)
+    if not_modified is not None:
+        return not_modified
+    return await cache.cached("compare", codes, lambda: _load_compare(codes))
 
-    policies: List[Policy] = []
-    for (pid, pname, psrc, pcat, pstat) in policies_rows:
-        cur.execute(
+
+async def _load_compare(codes) -> List[CountrySummary]:
+    async with db.cursor("latest_scores") as cur:
+        await cur.execute(
             """
-            SELECT pi.key, pi.value, p.source_url
-            FROM policy_indicators pi
-            JOIN policies p ON p.id = pi.policy_id
-            WHERE pi.policy_id = %s
-            ORDER BY pi.key;
+            SELECT c.iso_code,
+                   c.name,
+                   rs.score,
+                   rs.policy_score,
+                   rs.infra_score,
+                   rs.language_score,
+                   rs.risk_score
+            FROM countries c
+            LEFT JOIN latest_scores rs ON rs.country_id = c.id
+            WHERE c.iso_code = ANY(%s)
+            ORDER BY c.name;
             """,
-            (pid,),
+            (list(codes),),
         )
-        inds = [
-            PolicyIndicator(policy_name=pname, key=k, value=str(v), source_url=src)
-            for (k, v, src) in cur.fetchall()
+        rows = await cur.fetchall()
+    with timing.phase("model"):
+        return [
+            CountrySummary(
+                iso_code=iso,
+                name=name,
+                readiness_score=float(score) if score is not None else None,
+                policy_score=float(ps) if ps is not None else None,
+                infra_score=float(iscore) if iscore is not None else None,
+                language_score=float(ls) if ls is not None else None,
+                risk_score=float(rs) if rs is not None else None,
+            )
+            for (iso, name, score, ps, iscore, ls, rs) in rows
         ]
-        policies.append(
-            Policy(
-                id=pid,
-                name=pname,
-                source_url=psrc,
-                category=pcat,
-                status=pstat,
-                indicators=inds,
+
+
+def _ranking(component: str, region: Optional[str], total: int, computed_at, entries) -> Ranking:
+    return Ranking(
+        component=component,
+        region=region,
+        lower_is_better=component in rankings.LOWER_IS_BETTER,
+        total=total,
+        computed_at=computed_at.isoformat() if computed_at is not None else None,
+        entries=entries,
+    )
+
+
+@app.get("/rankings", response_model=Ranking)
+async def get_rankings(
+    request: Request,
+    response: Response,
+    component: RankComponent = "readiness",
+    region: Optional[str] = None,
+    top: int = Query(default=10, ge=1, le=5000),
+):
+    """Top countries by readiness or one component, overall or within a region.
+
+    Served from the ranking index rebuilt by each scoring run, so the cost
+    is proportional to ``top``, not to the number of countries.
+    """
+    params = (component, region, top)
+    if READ_ONLY:
+        return _from_snapshot(
+            request, response, "rankings", params,
+            lambda snap: _snapshot_ranking(snap, component, region, top),
+        )
+    not_modified = await http_cache.check(request, response, "rankings", params)
+    if not_modified is not None:
+        return not_modified
+    return await cache.cached("rankings", params, lambda: _load_ranking(component, region, top))
+
+
+def _snapshot_ranking(snap, component: str, region: Optional[str], top: int) -> Ranking:
+    entries = rankings.snapshot_index(snap).top(component, region or rankings.OVERALL, top)
+    if not entries and region:
+        raise HTTPException(status_code=404, detail="Region not found")
+    return _ranking(
+        component,
+        region,
+        entries[0].total if entries else 0,
+        snap.computed_at,
+        [
+            RankingEntry(
+                rank=e.rank,
+                iso_code=e.iso_code,
+                name=e.name,
+                region=e.region,
+                value=e.value,
+                percentile=e.percentile,
             )
+            for e in entries
+        ],
+    )
+
+
+async def _load_ranking(component: str, region: Optional[str], top: int) -> Ranking:
+    async with db.cursor("rankings") as cur:
+        # Primary-key range scan: reads ``top`` rows whatever the scope size
+        await cur.execute(
+            """
+            SELECT r.rank, c.iso_code, c.name, c.region, r.value, r.percentile,
+                   r.total, r.computed_at
+            FROM rankings r
+            JOIN countries c ON c.id = r.country_id
+            WHERE r.component = %s AND r.scope = %s
+            ORDER BY r.position
+            LIMIT %s;
+            """,
+            (component, region or rankings.OVERALL, top),
+        )
+        rows = await cur.fetchall()
+    if not rows and region:
+        raise HTTPException(status_code=404, detail="Region not found")
+    with timing.phase("model"):
+        return _ranking(
+            component,
+            region,
+            rows[0][6] if rows else 0,
+            rows[0][7] if rows else None,
+            [
+                RankingEntry(
+                    rank=rank,
+                    iso_code=iso,
+                    name=name,
+                    region=reg,
+                    value=float(value),
+                    percentile=float(pct),
+                )
+                for (rank, iso, name, reg, value, pct, _total, _at) in rows
+            ],
         )
 
-    cur.close()
-    conn.close()
 
-    methodology = methodology_spec()
-    return CountryDetail(
-        iso_code=iso_code.upper(),
+@app.get("/country/{iso_code}/rank", response_model=CountryRank)
+async def country_rank(iso_code: str, request: Request, response: Response):
+    """Rank and percentile of one country per component, overall and in its region."""
+    code = iso_code.upper()
+    if READ_ONLY:
+        return _from_snapshot(
+            request, response, "country_rank", code,
+            lambda snap: _snapshot_country_rank(snap, code),
+        )
+    not_modified = await http_cache.check(request, response, "country_rank", code)
+    if not_modified is not None:
+        return not_modified
+    return await cache.cached("country_rank", code, lambda: _load_country_rank(code))
+
+
+def _country_rank(iso_code: str, name: str, region, computed_at, ranks) -> CountryRank:
+    order = {c: i for i, c in enumerate(rankings.COMPONENTS)}
+    # Overall before regional, then methodology component order
+    ranks.sort(key=lambda r: (r.scope != rankings.OVERALL, order[r.component]))
+    return CountryRank(
+        iso_code=iso_code,
         name=name,
-        readiness_score=float(score_row[0]) if score_row else None,
-        policy_score=float(score_row[1]) if score_row else None,
-        infra_score=float(score_row[2]) if score_row else None,
-        language_score=float(score_row[3]) if score_row else None,
-        risk_score=float(score_row[4]) if score_row else None,
-        computed_at=score_row[5].isoformat() if score_row else None,
-        policies=policies,
-        methodology=methodology,
+        region=region,
+        computed_at=computed_at.isoformat() if computed_at is not None else None,
+        ranks=ranks,
     )
 
 
-@app.get("/compare", response_model=List[CountrySummary])
-def compare(iso: List[str] = Query(default=[])):
-    """Compare multiple countries by ISO codes."""
+def _snapshot_country_rank(snap, iso_code: str) -> CountryRank:
+    found = rankings.snapshot_index(snap).country(iso_code)
+    if not found:
+        raise HTTPException(status_code=404, detail="Country not ranked")
+    entry = found[0][2]
+    return _country_rank(
+        iso_code,
+        entry.name,
+        entry.region,
+        snap.computed_at,
+        [
+            ComponentRank(
+                component=component,
+                scope=scope,
+                rank=e.rank,
+                total=e.total,
+                percentile=e.percentile,
+                value=e.value,
+            )
+            for component, scope, e in found
+        ],
+    )
+
+
+async def _load_country_rank(iso_code: str) -> CountryRank:
+    async with db.cursor("rankings") as cur:
+        await cur.execute(
+            """
+            SELECT c.name, c.region, r.component, r.scope, r.rank, r.total, r.percentile,
+                   r.value, r.computed_at
+            FROM countries c
+            JOIN rankings r ON r.country_id = c.id
+            WHERE c.iso_code = %s;
+            """,
+            (iso_code,),
+        )
+        rows = await cur.fetchall()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Country not ranked")
+    with timing.phase("model"):
+        return _country_rank(
+            iso_code,
+            rows[0][0],
+            rows[0][1],
+            rows[0][8],
+            [
+                ComponentRank(
+                    component=component,
+                    scope=scope,
+                    rank=rank,
+                    total=total,
+                    percentile=float(pct),
+                    value=float(value),
+                )
+                for (_n, _r, component, scope, rank, total, pct, value, _at) in rows
+            ],
+        )
+
+
+HISTORY_COLUMNS = ("score", "policy_score", "infra_score", "language_score", "risk_score")
+
+
+def _parse_cursor(after: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    """Decode the opaque keyset cursor '<timestamp>,<iso>'."""
+    if not after:
+        return None
+    try:
+        ts, iso = after.rsplit(",", 1)
+        return datetime.fromisoformat(ts), iso.upper()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'after' cursor")
+
+
+async def _load_history(
+    codes: Tuple[str, ...],
+    bucket: str,
+    agg: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    after: Optional[str],
+    limit: int,
+) -> History:
+    """Score snapshots ordered by (computed_at, iso_code), one page at a time.
+
+    Bucketing happens in SQL (date_trunc + GROUP BY), so only the
+    downsampled points leave Postgres. Pagination is keyset-based on
+    (time, iso_code): every page is an index range scan on
+    readiness_scores (country_id, computed_at), however deep.
+    """
+    cursor = _parse_cursor(after)
+    where = ["c.iso_code = ANY(%(codes)s)"]
+    params = {"codes": list(codes), "limit": limit + 1, "bucket": bucket}
+    if since is not None:
+        where.append("rs.computed_at >= %(since)s")
+        params["since"] = since
+    if until is not None:
+        where.append("rs.computed_at < %(until)s")
+        params["until"] = until
+    if cursor is not None:
+        # Lets the index skip earlier snapshots; the exact cut is applied below
+        where.append("rs.computed_at >= %(after_t)s")
+        params["after_t"], params["after_iso"] = cursor
+
+    if bucket == "raw":
+        t = "rs.computed_at"
+        values = ", ".join(f"rs.{col}" for col in HISTORY_COLUMNS) + ", 1"
+        group = ""
+    else:
+        t = "date_trunc(%(bucket)s, rs.computed_at)"
+        if agg == "avg":
+            values = ", ".join(f"avg(rs.{col})" for col in HISTORY_COLUMNS)
+        else:
+            values = ", ".join(
+                f"(array_agg(rs.{col} ORDER BY rs.computed_at DESC))[1]" for col in HISTORY_COLUMNS
+            )
+        values += ", count(*)"
+        group = "GROUP BY 1, 2"
+
+    sql = f"""
+        SELECT * FROM (
+            SELECT c.iso_code, {t} AS t, {values}
+            FROM readiness_scores rs
+            JOIN countries c ON c.id = rs.country_id
+            WHERE {" AND ".join(where)}
+            {group}
+        ) h
+        {"WHERE (h.t, h.iso_code) > (%(after_t)s, %(after_iso)s)" if cursor is not None else ""}
+        ORDER BY h.t, h.iso_code
+        LIMIT %(limit)s;
+    """
+    async with db.cursor("history") as cur:
+        await cur.execute(sql, params)
+        rows = await cur.fetchall()
+
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after = f"{rows[-1][1].isoformat()},{rows[-1][0]}"
+    with timing.phase("model"):
+        points = [
+            HistoryPoint(
+                iso_code=iso,
+                computed_at=ts.isoformat(),
+                readiness_score=float(score) if score is not None else None,
+                policy_score=float(ps) if ps is not None else None,
+                infra_score=float(iscore) if iscore is not None else None,
+                language_score=float(ls) if ls is not None else None,
+                risk_score=float(rs) if rs is not None else None,
+                samples=samples,
+            )
+            for (iso, ts, score, ps, iscore, ls, rs, samples) in rows
+        ]
+    return History(bucket=bucket, agg=agg, points=points, next_after=next_after)
+
+
+async def _country_exists(iso_code: str) -> bool:
+    async with db.cursor("countries") as cur:
+        await cur.execute("SELECT 1 FROM countries WHERE iso_code = %s;", (iso_code,))
+        return await cur.fetchone() is not None
+
+
+async def _history(
+    request: Request,
+    response: Response,
+    codes: Tuple[str, ...],
+    bucket: str,
+    agg: str,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    after: Optional[str],
+    limit: int,
+):
+    params = (codes, bucket, agg, since, until, after, limit)
+    not_modified = await http_cache.check(request, response, "history", params)
+    if not_modified is not None:
+        return not_modified
+    return await cache.cached("history", params, lambda: _load_history(*params))
+
+
+@app.get(
+    "/country/{iso_code}/history", response_model=History, dependencies=[Depends(_database)]
+)
+async def country_history(
+    iso_code: str,
+    request: Request,
+    response: Response,
+    bucket: Literal["raw", "day", "week", "month"] = "raw",
+    agg: Literal["last", "avg"] = "last",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=5000),
+):
+    """Time series of component scores for one country.
+
+    ``bucket`` downsamples to the last (or ``agg=avg``) value per day, week
+    or month; ``since``/``until`` bound the range (UTC, until exclusive).
+    """
+    iso = iso_code.upper()
+    history = await _history(request, response, (iso,), bucket, agg, since, until, after, limit)
+    if isinstance(history, History) and not history.points and not after:
+        if not await cache.cached("country_exists", iso, lambda: _country_exists(iso)):
+            raise HTTPException(status_code=404, detail="Country not found")
+    return history
+
+
+@app.get(
+    "/history", response_model=History, dependencies=[Depends(_database)]
+)
+async def history(
+    request: Request,
+    response: Response,
+    iso: List[str] = Query(default=[]),
+    bucket: Literal["raw", "day", "week", "month"] = "raw",
+    agg: Literal["last", "avg"] = "last",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=5000),
+):
+    """Score history for several countries, interleaved by time."""
     if not iso:
-        return []
-    codes = [i.upper() for i in iso]
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT c.iso_code,
-               c.name,
-               rs.score,
-               rs.policy_score,
-               rs.infra_score,
-               rs.language_score,
-               rs.risk_score
-        FROM countries c
-        LEFT JOIN LATERAL (
-            SELECT r.score, r.policy_score, r.infra_score, r.language_score, r.risk_score
-            FROM readiness_scores r
-            WHERE r.country_id = c.id
-            ORDER BY r.computed_at DESC
-            LIMIT 1
-        ) rs ON true
-        WHERE c.iso_code = ANY(%s)
-        ORDER BY c.name;
-        """,
-        (codes,),
+        return History(bucket=bucket, agg=agg)
+    codes = tuple(sorted({i.upper() for i in iso}))
+    return await _history(request, response, codes, bucket, agg, since, until, after, limit)
+
+
+@app.get("/export", dependencies=[Depends(_database)])
+def export(
+    fmt: Literal["ndjson", "csv", "arrow"] = Query(default="ndjson", alias="format"),
+    scope: Literal["latest", "history"] = "latest",
+    region: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Stream latest or historical scores with country metadata (see core/export.py).
+
+    Uses its own connection rather than a pool slot, since a large export
+    can hold it for a while.
+    """
+    try:
+        score_export.check_format(fmt)
+    except score_export.ExportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    def body():
+        conn = db.get_conn()
+        try:
+            yield from score_export.stream_export(
+                conn, fmt, scope=scope, region=region, since=since, until=until
+            )
+        finally:
+            conn.close()
+
+    media_type, ext = score_export.FORMATS[fmt]
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sovai-scores-{scope}.{ext}"'},
     )
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-    return [
-        CountrySummary(
-            iso_code=iso,
-            name=name,
-            readiness_score=float(score) if score is not None else None,
-            policy_score=float(ps) if ps is not None else None,
-            infra_score=float(iscore) if iscore is not None else None,
-            language_score=float(ls) if ls is not None else None,
-            risk_score=float(rs) if rs is not None else None,
+
+
+@app.post("/simulate", response_model=Simulation)
+async def simulate(body: SimulationRequest):
+    """Recompute readiness and ranks under custom weights (nothing is stored)."""
+    if READ_ONLY:
+        try:
+            snap = _snapshots.get()
+        except snapshot.SnapshotError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        matrix = simulation.snapshot_matrix(snap)
+    else:
+        matrix = await simulation.matrix()
+
+    infra = {iso.upper(): value for iso, value in body.infra.items()}
+    language = {iso.upper(): value for iso, value in body.language.items()}
+    unknown = matrix.unknown(infra.keys() | language.keys())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown or unscored countries: {unknown}")
+
+    weights = body.weights.model_dump()
+    result = matrix.simulate(weights, infra, language)
+    with timing.phase("model"):
+        # Plain floats/ints from our own arrays: encode directly, no output validation
+        return payloads.json_response(
+            {"weights": weights, "countries": matrix.ranked(result, body.top)}
         )
-        for (iso, name, score, ps, iscore, ls, rs) in rows
-    ]
 
 
 def methodology_spec() -> dict:
     """Static but structured methodology for frontend transparency."""
+    w = scoring.WEIGHTS
+    composite = f"{w['policy']:g}*policy + {w['infra']:g}*infra + {w['language']:g}*language"
     return {
         "inputs": [
             "policy_indicators (mentions_* flags from parsed texts)",
             "infra_signals (gpu_capacity_index, power_cost_index)",
             "language_signals (placeholder by ISO)",
         ],
-        "weights": {
-            "policy": 0.4,
-            "infra": 0.3,
-            "language": 0.2,
-            "risk_penalty": 0.1,
-        },
+        "weights": dict(w),
         "equations": {
-            "readiness": "0.4*policy + 0.3*infra + 0.2*language - 0.1*risk",
-            "risk": "100 - (0.4*policy + 0.3*infra + 0.2*language)",
+            "readiness": f"{composite} - {w['risk_penalty']:g}*risk",
+            "risk": f"100 - ({composite})",
         },
         "notes": [
             "Infra defaults to 50 when missing (low confidence).",
@@ -291,10 +911,23 @@ def methodology_spec() -> dict:
     }
 
 
+@functools.lru_cache(maxsize=1)
+def _methodology_payload() -> payloads.Payload:
+    # Depends only on code (scoring.WEIGHTS), so one payload per process
+    return payloads.Payload.of(methodology_spec())
+
+
 @app.get("/methodology")
-def methodology():
+def methodology(request: Request):
     """Return methodology specification for transparency UI."""
-    return methodology_spec()
+    coding = payloads.negotiate(request.headers.get("accept-encoding"))
+    return payloads.respond(_methodology_payload(), coding)
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition of this worker's metrics (see api/metrics.py)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
@@ -307,6 +940,9 @@ def root():
             "/countries",
             "/country/EU",
             "/compare?iso=EU&iso=IN",
+            "/country/EU/history?bucket=month",
+            "/rankings?component=infra&region=Asia&top=5",
+            "/country/EU/rank",
             "/methodology",
             "/docs",
         ],
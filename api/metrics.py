@@ -0,0 +1,196 @@
+"""Prometheus metrics for the API, in the text exposition format.
+
+A small in-process registry rather than a client library: histograms are
+fixed bucket arrays per label set, so recording a sample is a bisect and
+an increment under a lock (about a microsecond), cheap enough to leave on
+in production. ``GET /metrics`` renders the registry of the worker that
+answers; with several uvicorn workers each keeps its own registry, so
+scrape workers individually (or run one worker per container).
+
+Recorded:
+  - sovai_http_request_duration_seconds{route,method,status}
+  - sovai_http_response_size_bytes{route,status}
+  - sovai_db_query_duration_seconds{query}   logical query name, see db.cursor()
+  - sovai_db_pool_wait_seconds{pool}          time to check out a connection
+  - sovai_db_pool_connections{state}          sampled at scrape time
+
+Settings (env):
+  - METRICS_ENABLED   0 to skip recording and serve an empty /metrics (default 1)
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()):
+        if not ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1]) for k, v in sorted(self._series.items())]
+        for values, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge:
+    """Gauge whose samples come from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str],
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+    ):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for values, value in self.collect():
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "sovai_http_request_duration_seconds",
+    "Time from request start to the last response byte.",
+    ("route", "method", "status"),
+    LATENCY_BUCKETS,
+)
+RESPONSE_BYTES = Histogram(
+    "sovai_http_response_size_bytes",
+    "Response body size.",
+    ("route", "status"),
+    SIZE_BUCKETS,
+)
+QUERY_SECONDS = Histogram(
+    "sovai_db_query_duration_seconds",
+    "Database query execution time by logical query name.",
+    ("query",),
+    LATENCY_BUCKETS,
+)
+POOL_WAIT_SECONDS = Histogram(
+    "sovai_db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+    ("pool",),
+    LATENCY_BUCKETS,
+)
+
+_registry: List[object] = [REQUEST_SECONDS, RESPONSE_BYTES, QUERY_SECONDS, POOL_WAIT_SECONDS]
+
+
+def register(metric):
+    """Add a metric (e.g. a callback Gauge) to the /metrics output."""
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines: List[str] = []
+    if ENABLED:
+        for metric in _registry:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # Route templates keep the label set bounded; unmatched paths share one label
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request and measuring its body size."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_label(scope)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start, (route, scope["method"], str(status))
+            )
+            RESPONSE_BYTES.observe(size, (route, str(status)))
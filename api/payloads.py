@@ -0,0 +1,121 @@
+"""Pre-serialized, pre-compressed response bodies.
+
+The hot list endpoints (``/countries``, ``/methodology``) keep their whole
+response as a ``Payload``: the JSON bytes, encoded once, plus gzip and
+brotli variants compressed on first use. The payload is cached per data
+version like any other read (api/cache.py), or per snapshot version in
+read-only mode. So a request only negotiates Accept-Encoding and copies
+bytes: no Pydantic models, no JSON encoding, no compression.
+
+``dumps()`` / ``json_response()`` are the fast encoder for uncached
+endpoints that build plain dicts. They use ``orjson`` when it is installed
+and pydantic-core's Rust encoder otherwise; both give the same compact
+UTF-8 output as FastAPI.
+
+Settings (env):
+  - API_GZIP_LEVEL       gzip level of cached variants (default 6)
+  - API_BROTLI_QUALITY   brotli quality of cached variants (default 5; 11 takes
+                         seconds for large bodies)
+
+Brotli needs the optional ``brotli`` package; without it clients get gzip.
+"""
+
+import gzip
+import os
+from typing import Any, Dict, Optional
+
+import pydantic_core
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on optional deps
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on optional deps
+    brotli = None
+
+API_GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", "6"))
+API_BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", "5"))
+
+IDENTITY = "identity"
+# Server preference when the client accepts several codings equally
+CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON of plain Python data (dicts, lists, str, numbers, None)."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return pydantic_core.to_json(content)
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """A JSON response encoded with ``dumps()`` (skips FastAPI's response_model pass)."""
+    return Response(dumps(content), status_code=status_code, media_type="application/json")
+
+
+def _compress(body: bytes, coding: str) -> bytes:
+    if coding == "gzip":
+        # mtime=0 keeps the bytes (and so the ETag'd variant) identical across workers
+        return gzip.compress(body, compresslevel=API_GZIP_LEVEL, mtime=0)
+    return brotli.compress(body, quality=API_BROTLI_QUALITY)
+
+
+class Payload:
+    """One JSON response body and its compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self._variants: Dict[str, bytes] = {IDENTITY: body}
+
+    @classmethod
+    def of(cls, content: Any) -> "Payload":
+        return cls(dumps(content))
+
+    def encoded(self, coding: str) -> bytes:
+        """The body in ``coding``, compressed the first time it is asked for."""
+        try:
+            return self._variants[coding]
+        except KeyError:
+            # Two concurrent first requests may both compress; the result is the same
+            data = self._variants[coding] = _compress(self.body, coding)
+            return data
+
+
+def negotiate(accept_encoding: Optional[str]) -> str:
+    """Pick the content coding for an Accept-Encoding header (RFC 9110 12.5.3)."""
+    if not accept_encoding:
+        return IDENTITY
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            weights[coding] = q
+    best, best_q = IDENTITY, 0.0
+    for coding in CODINGS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def respond(payload: Payload, coding: str, headers=None) -> Response:
+    """Serve ``payload`` in the negotiated ``coding``, keeping ``headers`` (validators)."""
+    response = Response(payload.encoded(coding), media_type="application/json")
+    if headers:
+        response.headers.update(headers)
+    if coding != IDENTITY:
+        response.headers["Content-Encoding"] = coding
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
@@ -0,0 +1,180 @@
+"""What-if scoring under alternative weights.
+
+``POST /simulate`` re-weights the latest component scores of every scored
+country without touching the database. The components (policy, infra,
+language) are loaded once into a NumPy matrix and kept in a slot of their
+own, keyed by the ``data_version`` row that scoring and ingest bump, so
+response traffic cannot evict it and a dropped cache listener costs one
+version lookup per request rather than a rebuild; in read-only mode it is
+built from the score snapshot instead. A simulation is then a few array operations
+(``core.scoring.combine_components`` plus an argsort for the ranks), i.e.
+milliseconds for thousands of countries.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from api import cache, db, timing
+from core import scoring
+
+POLICY, INFRA, LANGUAGE = range(3)
+
+
+class ComponentMatrix:
+    """Latest policy/infra/language scores as an (n, 3) float64 matrix.
+
+    Rows follow /countries order (by name); baseline readiness and ranks
+    under the default weights are computed once per matrix.
+    """
+
+    def __init__(self, iso_codes: Sequence[str], names: Sequence[str], components: np.ndarray):
+        self.iso_codes = list(iso_codes)
+        self.names = list(names)
+        self.components = components
+        self.index = {iso: i for i, iso in enumerate(self.iso_codes)}
+        _, self.baseline = scoring.combine_components(
+            components[:, POLICY], components[:, INFRA], components[:, LANGUAGE]
+        )
+        self.baseline_ranks = rank(self.baseline)
+
+    @classmethod
+    def from_rows(cls, rows) -> "ComponentMatrix":
+        """Build from (iso_code, name, policy, infra, language) rows, skipping unscored ones."""
+        scored = [r for r in rows if None not in r[2:5]]
+        components = np.array([r[2:5] for r in scored], dtype=np.float64).reshape(-1, 3)
+        return cls([r[0] for r in scored], [r[1] for r in scored], components)
+
+    def __len__(self) -> int:
+        return len(self.iso_codes)
+
+    def unknown(self, iso_codes) -> List[str]:
+        return sorted(iso for iso in iso_codes if iso not in self.index)
+
+    def simulate(
+        self,
+        weights: Dict[str, float],
+        infra: Optional[Dict[str, float]] = None,
+        language: Optional[Dict[str, float]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Component, risk and readiness arrays plus ranks under ``weights``.
+
+        ``infra`` / ``language`` map ISO codes (already validated) to
+        replacement component scores for those countries.
+        """
+        policy_col = self.components[:, POLICY]
+        infra_col = _override(self.components[:, INFRA], self.index, infra)
+        language_col = _override(self.components[:, LANGUAGE], self.index, language)
+        risk, readiness = scoring.combine_components(policy_col, infra_col, language_col, weights)
+        return {
+            "policy": policy_col,
+            "infra": infra_col,
+            "language": language_col,
+            "risk": risk,
+            "readiness": readiness,
+            "rank": rank(readiness),
+        }
+
+    def ranked(self, result: Dict[str, np.ndarray], top: Optional[int] = None) -> List[dict]:
+        """Rows of a ``simulate()`` result best-first, with baseline readiness and rank."""
+        order = np.argsort(result["rank"])[:top]
+        columns = {k: v[order].tolist() for k, v in result.items()}
+        baseline = self.baseline[order].tolist()
+        baseline_ranks = self.baseline_ranks[order].tolist()
+        return [
+            {
+                "iso_code": self.iso_codes[row],
+                "name": self.names[row],
+                "rank": columns["rank"][i],
+                "baseline_rank": baseline_ranks[i],
+                "readiness_score": columns["readiness"][i],
+                "baseline_readiness_score": baseline[i],
+                "policy_score": columns["policy"][i],
+                "infra_score": columns["infra"][i],
+                "language_score": columns["language"][i],
+                "risk_score": columns["risk"][i],
+            }
+            for i, row in enumerate(order.tolist())
+        ]
+
+
+def _override(column: np.ndarray, index: Dict[str, int], values: Optional[Dict[str, float]]):
+    if not values:
+        return column
+    column = column.copy()
+    rows = np.fromiter((index[iso] for iso in values), dtype=np.intp, count=len(values))
+    column[rows] = np.fromiter(values.values(), dtype=np.float64, count=len(values))
+    return column
+
+
+def rank(readiness: np.ndarray) -> np.ndarray:
+    """1-based ranks, highest readiness first; ties keep matrix (name) order."""
+    order = np.argsort(-readiness, kind="stable")
+    ranks = np.empty(len(readiness), dtype=np.int64)
+    ranks[order] = np.arange(1, len(readiness) + 1)
+    return ranks
+
+
+async def _data_version(cur) -> Optional[int]:
+    await cur.execute("SELECT version FROM data_version;")
+    row = await cur.fetchone()
+    return None if row is None else row[0]
+
+
+async def _load_matrix() -> Tuple[Optional[int], ComponentMatrix]:
+    async with db.cursor("simulation_matrix") as cur:
+        # Read first: a write landing in between only makes the next check reload
+        version = await _data_version(cur)
+        await cur.execute(
+            """
+            SELECT c.iso_code, c.name, rs.policy_score, rs.infra_score, rs.language_score
+            FROM countries c
+            JOIN latest_scores rs ON rs.country_id = c.id
+            ORDER BY c.name;
+            """
+        )
+        rows = await cur.fetchall()
+    with timing.phase("model"):
+        return version, ComponentMatrix.from_rows(rows)
+
+
+# (listener version, data_version row, ComponentMatrix)
+_db_matrix: Optional[tuple] = None
+
+
+async def matrix() -> ComponentMatrix:
+    """The component matrix for the current data version."""
+    global _db_matrix
+    listened = cache.data_version()
+    current = _db_matrix
+    # No notification since it was checked: current without a query
+    if current is not None and listened is not None and current[0] == listened:
+        return current[2]
+    if current is not None and current[1] is not None:
+        async with db.cursor("data_version") as cur:
+            version = await _data_version(cur)
+        if version == current[1]:
+            _db_matrix = (listened, version, current[2])
+            return current[2]
+    version, built = await _load_matrix()
+    _db_matrix = (listened, version, built)
+    return built
+
+
+_snapshot_matrix: Optional[tuple] = None  # (snapshot version, ComponentMatrix)
+
+
+def snapshot_matrix(snap) -> ComponentMatrix:
+    """The component matrix for a score snapshot (read-only mode)."""
+    global _snapshot_matrix
+    current = _snapshot_matrix
+    if current is not None and current[0] == snap.version:
+        return current[1]
+    built = ComponentMatrix.from_rows(
+        [
+            (r["iso_code"], r["name"], r["policy_score"], r["infra_score"], r["language_score"])
+            for r in snap.rows()
+        ]
+    )
+    _snapshot_matrix = (snap.version, built)
+    return built
@@ -0,0 +1,215 @@
+"""Per-request correlation IDs, phase timings and request logs.
+
+Every request gets an ID (an incoming ``X-Request-ID`` is kept when it looks
+sane) that is echoed back in the response. Sampled requests also collect
+time per phase and report it in a ``Server-Timing`` header and one JSON log
+line on the ``api.timing`` logger:
+
+  - conn    waiting for / opening a pooled DB connection
+  - db      executing queries
+  - model   building Pydantic models in the loaders
+  - encode  response validation and JSON encoding after the handler returns
+  - total   request start to response start
+
+Phases are accumulated in a context variable, so code anywhere in the
+request (db.cursor(), loaders) records with ``add()`` / ``phase()``, which
+are no-ops for unsampled requests.
+
+Settings (env):
+  - REQUEST_TIMING_SAMPLE   fraction of requests timed and logged, 0-1 (default 1)
+  - REQUEST_LOG_SLOW_MS     always log requests slower than this, even when
+                            not sampled (0 disables, default 1000)
+  - REQUEST_LOG             emit the log lines (default 1). At startup the
+                            ``api.timing`` logger gets INFO level, and a
+                            stderr handler when no logging is configured;
+                            set 0 to leave it to your own logging config
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Dict, Optional
+
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = float(os.getenv("REQUEST_TIMING_SAMPLE", "1"))
+SLOW_MS = float(os.getenv("REQUEST_LOG_SLOW_MS", "1000"))
+REQUEST_LOG = os.getenv("REQUEST_LOG", "1").strip().lower() in {"1", "true", "yes"}
+
+PHASES = ("conn", "db", "model", "encode")
+
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def configure_logging():
+    """Make the request log lines visible (called from the app lifespan).
+
+    Nothing else configures logging under uvicorn, so INFO records on this
+    logger would be dropped by Python's last-resort WARNING handler.
+    """
+    if not REQUEST_LOG:
+        return
+    logger.setLevel(logging.INFO)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+
+class RequestTiming:
+    """Mutable per-request state shared through the context variable."""
+
+    __slots__ = ("request_id", "sampled", "phases", "endpoint_done")
+
+    def __init__(self, request_id: str, sampled: bool):
+        self.request_id = request_id
+        self.sampled = sampled
+        self.phases: Dict[str, float] = {}
+        self.endpoint_done: Optional[float] = None
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    timing = _current.get()
+    return timing.request_id if timing is not None else None
+
+
+def add(phase: str, seconds: float):
+    """Add ``seconds`` to ``phase`` for the current (sampled) request."""
+    timing = _current.get()
+    if timing is not None and timing.sampled:
+        timing.phases[phase] = timing.phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str):
+    """Time the enclosed block as ``name``."""
+    timing = _current.get()
+    if timing is None or not timing.sampled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[name] = timing.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def _mark_endpoint_done():
+    timing = _current.get()
+    if timing is not None and timing.sampled:
+        timing.endpoint_done = time.perf_counter()
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that notes when the endpoint returns, so the remaining time
+    until the response starts (validation + JSON encoding) is the encode phase.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if iscoroutinefunction(endpoint):
+
+            @wraps(endpoint)
+            async def timed(*args, **kw):
+                try:
+                    return await endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+
+        else:
+
+            @wraps(endpoint)
+            def timed(*args, **kw):
+                try:
+                    return endpoint(*args, **kw)
+                finally:
+                    _mark_endpoint_done()
+
+        super().__init__(path, timed, **kwargs)
+
+
+def _server_timing(phases: Dict[str, float], total: float) -> str:
+    parts = [f"{name};dur={phases[name] * 1000:.2f}" for name in PHASES if name in phases]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class TimingMiddleware:
+    """ASGI middleware assigning request IDs and reporting phase timings."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for key, value in scope["headers"]:
+            if key == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = incoming if incoming and _VALID_ID.match(incoming) else uuid.uuid4().hex
+        sampled = SAMPLE_RATE >= 1 or (SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE)
+        timing = RequestTiming(request_id, sampled)
+        token = _current.set(timing)
+
+        start = time.perf_counter()
+        status = 500
+        total = None
+
+        async def send_wrapper(message):
+            nonlocal status, total
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = time.perf_counter()
+                total = now - start
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                if timing.sampled:
+                    if timing.endpoint_done is not None:
+                        timing.phases["encode"] = now - timing.endpoint_done
+                    headers.append(
+                        (b"server-timing", _server_timing(timing.phases, total).encode("latin-1"))
+                    )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if total is None:
+                total = time.perf_counter() - start
+            slow = SLOW_MS > 0 and total * 1000 >= SLOW_MS
+            if timing.sampled or slow:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                logger.info(
+                    json.dumps(
+                        {
+                            "request_id": request_id,
+                            "method": scope["method"],
+                            "route": route,
+                            "path": scope["path"],
+                            "status": status,
+                            "duration_ms": round(total * 1000, 2),
+                            "phases_ms": {
+                                k: round(v * 1000, 2) for k, v in timing.phases.items()
+                            },
+                            "slow": slow,
+                        }
+                    )
+                )
@@ -0,0 +1,339 @@
+"""Scoring and parsing microbenchmarks with JSON baselines.
+
+Cases (each at several sizes):
+  - policy_score     core.scoring._compute_policy_score per country
+  - infra_score      core.scoring._compute_infra_score per country
+  - score_arrays     the vectorized batch engine over all countries
+  - extract          ingest.parse_policies.extract_indicators on large
+                     documents (no keyword present, so the whole text is scanned)
+  - compute_scores   a full ``compute_scores(full=True)`` run against a local
+                     database seeded by load/seed.py (opt-in with ``--db``; it
+                     writes score snapshots, so use a scratch database)
+
+Every case is timed ``--repeat`` times with the GC paused (fast cases are
+looped so each sample lasts at least 50 ms) after one untimed warm-up
+sample; the best sample gives the throughput (items per second), which is
+what baselines store and compare. Inputs are generated from a fixed seed, so runs are comparable.
+
+  python benchmarks/run.py --save baselines/dev.json
+  python benchmarks/run.py --compare baselines/dev.json --threshold 10
+
+Baselines are only comparable on the same machine; regenerate them when
+the benchmark host changes.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from core import scoring  # noqa: E402
+from ingest.parse_policies import extract_indicators  # noqa: E402
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+COUNTRY_SIZES = (100, 1_000, 10_000)
+DOC_SIZES_KB = (100, 1_000, 10_000)
+DB_SIZES = (100, 1_000)
+
+# Shortest timed sample; faster cases are looped up to this
+MIN_SAMPLE_S = 0.05
+
+# (name, unit, items per call, callable)
+Case = Tuple[str, str, int, Callable[[], object]]
+
+_INDICATOR_KEYS = (
+    "mentions_data_localization",
+    "mentions_ai_systems",
+    "mentions_cross_border",
+    "data_residency_required",
+    "ai_registry_required",
+    "cross_border_restrictions",
+)
+_WORDS = (
+    "the", "minister", "shall", "publish", "guidance", "on", "processing", "of", "personal",
+    "information", "by", "public", "bodies", "and", "operators", "within", "national",
+    "territory", "subject", "to", "review", "article", "section", "regulation", "authority",
+)
+
+
+def _inputs(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    iso_codes, indicators, infra = [], [], []
+    for i in range(n):
+        iso_codes.append(f"{i:03d}"[-3:] if i % 50 else "EU")
+        indicators.append(
+            {
+                k: rng.choice(("true", "false", "yes", ""))
+                for k in _INDICATOR_KEYS
+                if rng.random() < 0.7
+            }
+        )
+        infra.append(
+            {}
+            if rng.random() < 0.2
+            else {
+                "gpu_capacity_index": rng.uniform(0, 100),
+                "power_cost_index": rng.uniform(0, 100),
+            }
+        )
+    return iso_codes, indicators, infra
+
+
+def _document(kb: int, seed: int = 11) -> str:
+    rng = random.Random(seed)
+    target = kb * 1024
+    parts, size = [], 0
+    while size < target:
+        word = rng.choice(_WORDS)
+        parts.append(word)
+        size += len(word) + 1
+    return " ".join(parts)
+
+
+def cpu_cases(sizes=COUNTRY_SIZES, doc_sizes_kb=DOC_SIZES_KB) -> Iterator[Case]:
+    for n in sizes:
+        iso_codes, indicators, infra = _inputs(n)
+
+        def policy(indicators=indicators):
+            for ind in indicators:
+                scoring._compute_policy_score(ind)
+
+        def infra_score(infra=infra):
+            for signals in infra:
+                scoring._compute_infra_score(signals)
+
+        def arrays(iso_codes=iso_codes, indicators=indicators, infra=infra):
+            scoring._compute_score_arrays(iso_codes, indicators, infra)
+
+        yield f"policy_score[n={n}]", "countries/s", n, policy
+        yield f"infra_score[n={n}]", "countries/s", n, infra_score
+        yield f"score_arrays[n={n}]", "countries/s", n, arrays
+
+    for kb in doc_sizes_kb:
+        text = _document(kb)
+        yield f"extract[kb={kb}]", "KB/s", kb, lambda text=text: extract_indicators(text)
+
+
+def db_cases(sizes=DB_SIZES) -> Iterator[Case]:
+    from core import snapshot
+    from load import seed as synthetic
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        synthetic.apply_schema()
+    # Time the scoring itself; the Arrow snapshot has its own cost profile
+    snapshot.SNAPSHOT_PATH = ""
+    for n in sizes:
+        conn = synthetic.get_conn()
+        try:
+            with conn.cursor() as cur:
+                synthetic.reset(cur)
+                synthetic.seed(cur, n, 5, 1, 24.0, datetime(2026, 1, 1))
+            conn.commit()
+            with conn.cursor() as cur:
+                cur.execute("SELECT count(*) FROM countries;")
+                total = cur.fetchone()[0]
+        finally:
+            conn.close()
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                scoring.compute_scores(full=True)
+
+        yield f"compute_scores[n={n}]", "countries/s", total, run
+
+
+def cleanup_db():
+    from load import seed as synthetic
+
+    conn = synthetic.get_conn()
+    try:
+        with conn.cursor() as cur:
+            synthetic.reset(cur)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float = MIN_SAMPLE_S):
+    """Best-of-``repeat`` timing; returns (loops per sample, sample timings).
+
+    Fast cases run in a loop until one sample takes ``min_time`` (like
+    timeit's autorange), so timer resolution and scheduling noise stay small.
+    """
+    start = time.perf_counter()
+    fn()  # warm caches (compiled regexes, imports, DB buffers)
+    single = time.perf_counter() - start
+    loops = max(1, int(min_time / single)) if single > 0 else 1
+    for _ in range(loops):
+        fn()  # one untimed sample so the CPU clock and caches settle
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            timings.append((time.perf_counter() - start) / loops)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return loops, timings
+
+
+def run_cases(cases, repeat: int, only: Optional[str] = None) -> Dict[str, dict]:
+    results = {}
+    for name, unit, items, fn in cases:
+        if only and only not in name:
+            continue
+        loops, timings = measure(fn, repeat)
+        best = min(timings)
+        results[name] = {
+            "unit": unit,
+            "items": items,
+            "loops": loops,
+            "best_s": round(best, 6),
+            "median_s": round(statistics.median(timings), 6),
+            "throughput": round(items / best, 2),
+        }
+        print(
+            f"{name:<28} {items / best:>14,.0f} {unit:<12} best {best * 1000:9.2f} ms",
+            file=sys.stderr,
+        )
+    return results
+
+
+def environment() -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(baseline: Dict[str, dict], current: Dict[str, dict], threshold_pct: float):
+    """Per-case throughput change vs the baseline.
+
+    Returns (rows, regressions); a case regresses when its throughput fell
+    by more than ``threshold_pct`` percent. Cases missing on either side are
+    reported with a None change and never fail the comparison.
+    """
+    rows, regressions = [], []
+    for name in sorted(set(baseline) | set(current)):
+        base = baseline.get(name, {}).get("throughput")
+        now = current.get(name, {}).get("throughput")
+        change = None
+        if base and now is not None:
+            change = (now - base) / base * 100
+            if change < -threshold_pct:
+                regressions.append(name)
+        rows.append({"case": name, "baseline": base, "current": now, "change_pct": change})
+    return rows, regressions
+
+
+def _print_comparison(rows, regressions, threshold_pct: float):
+    for row in rows:
+        change = row["change_pct"]
+        label = "n/a" if change is None else f"{change:+.1f}%"
+        flag = "  REGRESSION" if row["case"] in regressions else ""
+        print(f"{row['case']:<28} {label:>9}{flag}", file=sys.stderr)
+    if regressions:
+        print(
+            f"{len(regressions)} case(s) slower than the baseline by more than {threshold_pct}%",
+            file=sys.stderr,
+        )
+
+
+def _resolve(path: str) -> Path:
+    p = Path(path)
+    return p if p.is_absolute() or p.parent != Path(".") else BASELINE_DIR / p
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the scoring/parsing benchmarks.")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (default 5)")
+    parser.add_argument(
+        "--sizes",
+        type=lambda s: tuple(int(x) for x in s.split(",")),
+        default=COUNTRY_SIZES,
+        help="country counts for the scoring cases (default 100,1000,10000)",
+    )
+    parser.add_argument(
+        "--doc-kb",
+        type=lambda s: tuple(int(x) for x in s.split(",")),
+        default=DOC_SIZES_KB,
+        help="document sizes in KB for extract (default 100,1000,10000)",
+    )
+    parser.add_argument(
+        "--db", action="store_true", help="also benchmark compute_scores against the local DB"
+    )
+    parser.add_argument(
+        "--db-sizes",
+        type=lambda s: tuple(int(x) for x in s.split(",")),
+        default=DB_SIZES,
+        help="synthetic countries seeded for compute_scores (default 100,1000)",
+    )
+    parser.add_argument("-k", dest="only", help="only run cases whose name contains this")
+    parser.add_argument(
+        "--save", help="write results as a baseline (bare names go to benchmarks/baselines/)"
+    )
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="fail when throughput drops more than this percent (default 10)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_cases(cpu_cases(args.sizes, args.doc_kb), args.repeat, args.only)
+    if args.db:
+        try:
+            results.update(run_cases(db_cases(args.db_sizes), args.repeat, args.only))
+        finally:
+            cleanup_db()
+
+    report = {"environment": environment(), "repeat": args.repeat, "results": results}
+    if args.save:
+        path = _resolve(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {path}", file=sys.stderr)
+
+    status = 0
+    if args.compare:
+        baseline = json.loads(_resolve(args.compare).read_text(encoding="utf-8"))
+        rows, regressions = compare(baseline["results"], results, args.threshold)
+        report["comparison"] = {
+            "baseline": str(args.compare),
+            "threshold_pct": args.threshold,
+            "cases": rows,
+            "regressions": regressions,
+        }
+        _print_comparison(rows, regressions, args.threshold)
+        status = 1 if regressions else 0
+
+    print(json.dumps(report, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Bulk export of readiness scores
+-------------------------------
+
+Streams latest or full-history scores joined with country metadata as
+NDJSON, CSV or Arrow IPC. Rows come from a server-side (named) cursor in
+batches and each batch is encoded and handed on before the next is
+fetched, so memory stays constant however large the history grows.
+
+Shared by the API (``GET /export``) and the CLI:
+
+  python -m core.export --format csv --scope history --region Asia \\
+      --since 2024-01-01 -o scores.csv
+
+Arrow output needs the optional ``pyarrow`` package.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+COLUMNS = (
+    "iso_code",
+    "name",
+    "region",
+    "computed_at",
+    "readiness_score",
+    "policy_score",
+    "infra_score",
+    "language_score",
+    "risk_score",
+)
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+SCOPES = ("latest", "history")
+
+FETCH_ROWS = 5000
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown format/scope, missing optional deps)."""
+
+
+def _query(
+    scope: str, region: Optional[str], since: Optional[datetime], until: Optional[datetime]
+) -> Tuple[str, dict]:
+    if scope not in SCOPES:
+        raise ExportError(f"Unknown scope {scope!r}; expected one of {', '.join(SCOPES)}")
+    table = "latest_scores" if scope == "latest" else "readiness_scores"
+    where, params = [], {}
+    if region is not None:
+        where.append("lower(c.region) = lower(%(region)s)")
+        params["region"] = region
+    if since is not None:
+        where.append("s.computed_at >= %(since)s")
+        params["since"] = since
+    if until is not None:
+        where.append("s.computed_at < %(until)s")
+        params["until"] = until
+    # History follows insertion order (primary key), which Postgres can
+    # stream straight off the index without sorting first
+    order = "c.iso_code" if scope == "latest" else "s.id"
+    sql = f"""
+        SELECT c.iso_code, c.name, c.region, s.computed_at,
+               s.score, s.policy_score, s.infra_score, s.language_score, s.risk_score
+        FROM {table} s
+        JOIN countries c ON c.id = s.country_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY {order};
+    """
+    return sql, params
+
+
+def iter_batches(
+    conn,
+    scope: str = "latest",
+    region: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_rows: int = FETCH_ROWS,
+) -> Iterator[List[tuple]]:
+    """Yield row batches from a server-side cursor on ``conn`` (psycopg2).
+
+    Scores are converted to float and timestamps kept as datetimes.
+    """
+    sql, params = _query(scope, region, since, until)
+    with conn.cursor(name="sovai_export") as cur:
+        cur.itersize = batch_rows
+        cur.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(batch_rows)
+            if not rows:
+                break
+            yield [
+                row[:4] + tuple(float(v) if v is not None else None for v in row[4:])
+                for row in rows
+            ]
+
+
+def _ndjson(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    for rows in batches:
+        lines = []
+        for row in rows:
+            record = dict(zip(COLUMNS, row))
+            if record["computed_at"] is not None:
+                record["computed_at"] = record["computed_at"].isoformat()
+            lines.append(json.dumps(record))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for rows in batches:
+        writer.writerows(
+            (*row[:3], row[3].isoformat() if row[3] is not None else "", *row[4:]) for row in rows
+        )
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate(0)
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def _arrow_module():
+    try:
+        import pyarrow
+    except ImportError as e:  # pragma: no cover - depends on optional deps
+        raise ExportError("Arrow export needs the optional 'pyarrow' package installed") from e
+    return pyarrow
+
+
+def arrow_schema():
+    pa = _arrow_module()
+    return pa.schema(
+        [
+            ("iso_code", pa.string()),
+            ("name", pa.string()),
+            ("region", pa.string()),
+            ("computed_at", pa.timestamp("us")),
+            *((col, pa.float64()) for col in COLUMNS[4:]),
+        ]
+    )
+
+
+def _arrow(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    pa = _arrow_module()
+    schema = arrow_schema()
+    sink = io.BytesIO()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+        return data
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        yield drain()  # schema message
+        for rows in batches:
+            columns = list(zip(*rows))
+            writer.write_batch(pa.record_batch([list(c) for c in columns], schema=schema))
+            yield drain()
+    # End-of-stream marker written on close
+    yield drain()
+
+
+_ENCODERS = {"ndjson": _ndjson, "csv": _csv, "arrow": _arrow}
+
+
+def check_format(fmt: str):
+    """Raise ExportError early (before streaming starts) for bad formats."""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if fmt == "arrow":
+        _arrow_module()
+
+
+def stream_export(conn, fmt: str = "ndjson", **filters) -> Iterator[bytes]:
+    """Encoded export chunks; ``filters`` are passed to iter_batches()."""
+    check_format(fmt)
+    return _ENCODERS[fmt](iter_batches(conn, **filters))
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    from core.scoring import get_conn
+
+    parser = argparse.ArgumentParser(description="Export readiness scores.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--scope", choices=SCOPES, default="latest")
+    parser.add_argument("--region", help="only countries in this region (case-insensitive)")
+    parser.add_argument(
+        "--since", type=_parse_time, help="computed_at >= this (ISO date/time, UTC)"
+    )
+    parser.add_argument("--until", type=_parse_time, help="computed_at < this (ISO date/time, UTC)")
+    parser.add_argument("-o", "--output", help="output file (default stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        check_format(args.format)
+    except ExportError as e:
+        parser.error(str(e))
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    conn = get_conn()
+    try:
+        filters = dict(scope=args.scope, region=args.region, since=args.since, until=args.until)
+        for chunk in stream_export(conn, args.format, **filters):
+            out.write(chunk)
+    finally:
+        conn.close()
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
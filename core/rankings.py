@@ -0,0 +1,123 @@
+"""
+Rankings
+--------
+
+Every scoring run ranks the scored countries by readiness and by each
+component, overall and within each ``countries.region``. The result is an
+index of pre-sorted lists, so "top k" is a slice and a country's rank is a
+lookup; nothing is re-sorted per request.
+
+  - position     1-based order in the list (ties broken by country name)
+  - rank         competition rank: tied values share the better rank (1, 2, 2, 4)
+  - percentile   100 for the best in the scope down to 0 for the worst
+                 (100 * (total - rank) / (total - 1))
+
+Risk ranks lower-is-better; every other component ranks higher-is-better.
+
+compute_scores() stores the index in the ``rankings`` table in the same
+transaction as the scores; in read-only mode the API builds the same index
+from the score snapshot (core/snapshot.py).
+"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# Component -> position of its value in a snapshot row (core.snapshot.COLUMNS)
+COMPONENTS: Dict[str, int] = {
+    "readiness": 4,
+    "policy": 5,
+    "infra": 6,
+    "language": 7,
+    "risk": 8,
+}
+LOWER_IS_BETTER = frozenset({"risk"})
+
+# Scope of the ranking across every country; other scopes are region names
+OVERALL = "all"
+
+
+class Entry(NamedTuple):
+    iso_code: str
+    name: str
+    region: Optional[str]
+    value: float
+    position: int
+    rank: int
+    percentile: float
+    total: int
+
+
+def _ranked(component: str, rows: Sequence[tuple]) -> List[Entry]:
+    col = COMPONENTS[component]
+    sign = 1.0 if component in LOWER_IS_BETTER else -1.0
+    ordered = sorted(rows, key=lambda r: (sign * r[col], r[1]))
+    total = len(ordered)
+    entries: List[Entry] = []
+    rank = 0
+    for position, row in enumerate(ordered, start=1):
+        if not entries or row[col] != entries[-1].value:
+            rank = position
+        percentile = round(100.0 * (total - rank) / (total - 1), 2) if total > 1 else 100.0
+        entries.append(Entry(row[0], row[1], row[2], row[col], position, rank, percentile, total))
+    return entries
+
+
+class RankingIndex:
+    """Pre-sorted rankings per (component, scope) with a per-country lookup.
+
+    ``rows`` are snapshot-style tuples (see core.snapshot.COLUMNS); unscored
+    countries are left out.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        scored = [r for r in rows if all(r[col] is not None for col in COMPONENTS.values())]
+        by_scope: Dict[str, List[tuple]] = {OVERALL: scored}
+        for row in scored:
+            if row[2]:
+                by_scope.setdefault(row[2], []).append(row)
+
+        self._lists: Dict[Tuple[str, str], List[Entry]] = {}
+        self._by_country: Dict[str, List[Tuple[str, str, Entry]]] = {}
+        for scope, scope_rows in by_scope.items():
+            for component in COMPONENTS:
+                entries = _ranked(component, scope_rows)
+                self._lists[(component, scope)] = entries
+                for entry in entries:
+                    self._by_country.setdefault(entry.iso_code, []).append(
+                        (component, scope, entry)
+                    )
+
+    @classmethod
+    def from_snapshot(cls, snap) -> "RankingIndex":
+        from core.snapshot import COLUMNS
+
+        return cls(tuple(row[c] for c in COLUMNS) for row in snap.rows())
+
+    def scopes(self) -> List[str]:
+        return sorted({scope for (_component, scope) in self._lists if scope != OVERALL})
+
+    def top(self, component: str, scope: str = OVERALL, k: Optional[int] = None) -> List[Entry]:
+        """The best ``k`` entries (all when k is None); empty for an unknown scope."""
+        return self._lists.get((component, scope), [])[:k]
+
+    def country(self, iso_code: str) -> List[Tuple[str, str, Entry]]:
+        """(component, scope, entry) for every ranking the country appears in."""
+        return self._by_country.get(iso_code, [])
+
+    def __iter__(self) -> Iterator[Tuple[str, str, Entry]]:
+        for (component, scope), entries in self._lists.items():
+            for entry in entries:
+                yield component, scope, entry
+
+
+_snapshot_index: Optional[tuple] = None  # (snapshot version, RankingIndex)
+
+
+def snapshot_index(snap) -> RankingIndex:
+    """The ranking index of a score snapshot, built once per snapshot version."""
+    global _snapshot_index
+    current = _snapshot_index
+    if current is not None and current[0] == snap.version:
+        return current[1]
+    index = RankingIndex.from_snapshot(snap)
+    _snapshot_index = (snap.version, index)
+    return index
@@ -13,6 +13,10 @@ Components and weights:
 Readiness score formula:
   readiness = 0.4*policy + 0.3*infra + 0.2*language - 0.1*risk
 
+The weights live in ``WEIGHTS``; ``combine_components()`` applies them to
+component arrays and is shared by the batch engine, the API methodology
+and what-if simulations (``POST /simulate``).
+
 Notes:
   - policy_score is derived from parsed policy_indicators. We prefer
     explicit “mentions_*” booleans but also accept legacy keys.
@@ -21,13 +25,73 @@ Notes:
   - language_score is a placeholder tied to ISO code until richer data
     is wired in (e.g., local LLM availability, open-source activity).
   - risk_score is a simple inverse heuristic of the other components.
+
+Batch engine:
+  compute_scores() pulls every input in a few bulk queries, evaluates the
+  components as NumPy column arrays (same rules as the per-row helpers
+  below) and writes all snapshots with one multi-row INSERT.
+
+Incremental runs:
+  Each country's inputs are fingerprinted (latest_scores.input_hash). By
+  default only countries whose fingerprint changed are recomputed, and a
+  snapshot is written only when the recomputed scores differ from the
+  latest ones. ``python -m core.scoring --full`` recomputes and snapshots
+  every country.
+
+Rankings:
+  Runs that change scores also rebuild the ``rankings`` table (rank and
+  percentile per component, overall and per region; see core/rankings.py)
+  in the same transaction.
+
+Sharded runs:
+  For entity sets too large for one process, ``python -m core.sharding``
+  scores id-range shards in parallel workers with this same engine and
+  publishes the run in one transaction (see core/sharding.py).
+
+Snapshots:
+  After each run the latest scores are also written to a columnar Arrow
+  file (see core/snapshot.py) for the API's read-only mode.
 """
 
+import argparse
+import hashlib
 import os
 from datetime import datetime
-from typing import Dict, Tuple
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 
+import numpy as np
 import psycopg2
+from psycopg2.extras import execute_values
+
+from core import rankings, snapshot
+
+# Bump when the scoring rules change so incremental runs rescore everything
+SCORING_VERSION = "1"
+
+# Component weights; risk_penalty scales the risk score subtracted from readiness
+WEIGHTS: Dict[str, float] = {"policy": 0.4, "infra": 0.3, "language": 0.2, "risk_penalty": 0.1}
+
+# Transaction-level advisory lock held while scores are written, so a plain run
+# and the finalize step of a sharded run (core/sharding.py) never interleave
+SCORING_LOCK = 0x50A15C02
+
+# API workers LISTEN here and drop cached responses when scores or inputs change
+DATA_CHANGED_CHANNEL = "sovai_data_changed"
+
+
+def notify_data_changed(cur):
+    """Bump the data_version row and notify API workers, both on commit.
+
+    Every writer calls this in the transaction that changes API-visible data:
+    the notification drops cached responses, the version feeds the ETags.
+    """
+    cur.execute(
+        """
+        UPDATE data_version SET version = version + 1, updated_at = now() AT TIME ZONE 'utc';
+        SELECT pg_notify(%s, %s);
+        """,
+        (DATA_CHANGED_CHANNEL, "scores"),
+    )
 
 
 def get_conn():
@@ -109,6 +173,9 @@ def _compute_infra_score(infra: Dict[str, float]) -> Tuple[float, str]:
     return adjusted, "medium"
 
 
+_LANGUAGE_HIGH = {"IN", "EU"}
+
+
 def _compute_language_score(iso_code: str) -> float:
     """Placeholder language/knowledge sovereignty score by ISO code.
 
@@ -116,8 +183,7 @@ def _compute_language_score(iso_code: str) -> float:
     AI ecosystem, language resources), bias a bit towards regions with active
     sovereign AI discourse to make demos meaningful.
     """
-    high = {"IN", "EU"}
-    if iso_code.upper() in high:
+    if iso_code.upper() in _LANGUAGE_HIGH:
         return 70.0
     return 55.0
 
@@ -127,80 +193,347 @@ def _compute_risk_score(policy: float, infra: float, language: float) -> float:
 
     Maps higher component scores to lower risk. Bounded 0..100.
     """
-    composite = 0.4 * policy + 0.3 * infra + 0.2 * language
+    composite = (
+        WEIGHTS["policy"] * policy + WEIGHTS["infra"] * infra + WEIGHTS["language"] * language
+    )
     risk = 100.0 - composite
     return max(0.0, min(100.0, risk))
 
 
-def compute_scores():
-    """Compute and persist readiness scores for all countries.
+def combine_components(
+    policy: np.ndarray,
+    infra: np.ndarray,
+    language: np.ndarray,
+    weights: Dict[str, float] = WEIGHTS,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Risk and readiness arrays for component arrays under ``weights``.
 
-    Writes to readiness_scores with a timestamp, preserving history.
+    Same arithmetic as the per-row helpers, so the default weights give
+    bit-for-bit the stored scores.
     """
-    conn = get_conn()
-    cur = conn.cursor()
+    composite = (
+        weights["policy"] * policy + weights["infra"] * infra + weights["language"] * language
+    )
+    risk = np.clip(100.0 - composite, 0.0, 100.0)
+    readiness = composite - weights["risk_penalty"] * risk
+    return risk, readiness
+
 
-    # Fetch countries
+def _fetch_inputs(cur, id_range: Optional[Tuple[int, int]] = None):
+    """Load countries and all scoring inputs in three bulk queries.
+
+    Returns (countries, indicators, infra) where indicators/infra map
+    country_id -> dict, matching what the per-row queries used to build.
+    ``id_range`` limits everything to countries.id BETWEEN first AND last
+    (one shard of a sharded run, see core/sharding.py).
+    """
+
+    def where(column: str) -> str:
+        return "" if id_range is None else f"WHERE {column} BETWEEN %s AND %s"
+
+    params = id_range
     cur.execute(
-        """
+        f"""
         SELECT c.id, c.iso_code, c.name
-        FROM countries c;
-        """
+        FROM countries c
+        {where("c.id")}
+        ORDER BY c.id;
+        """,
+        params,
     )
     countries = cur.fetchall()
 
-    for cid, iso, name in countries:
-        # Gather policy indicators for the country
-        cur.execute(
-            """
-            SELECT pi.key, pi.value
-            FROM policy_indicators pi
-            JOIN policies p ON p.id = pi.policy_id
-            WHERE p.country_id = %s;
-            """,
-            (cid,),
+    cur.execute(
+        f"""
+        SELECT p.country_id, pi.key, pi.value
+        FROM policy_indicators pi
+        JOIN policies p ON p.id = pi.policy_id
+        {where("p.country_id")};
+        """,
+        params,
+    )
+    indicators: Dict[int, Dict[str, str]] = {}
+    for cid, k, v in cur.fetchall():
+        indicators.setdefault(cid, {})[k] = v
+
+    cur.execute(
+        f"""
+        SELECT country_id, metric, value
+        FROM infra_signals
+        {where("country_id")};
+        """,
+        params,
+    )
+    infra: Dict[int, Dict[str, float]] = {}
+    for cid, m, v in cur.fetchall():
+        infra.setdefault(cid, {})[m] = float(v)
+
+    return countries, indicators, infra
+
+
+def _compute_score_arrays(
+    iso_codes: Sequence[str],
+    indicators: Sequence[Dict[str, str]],
+    infra: Sequence[Dict[str, float]],
+) -> Dict[str, np.ndarray]:
+    """Vectorized equivalent of the per-row component helpers.
+
+    Inputs are aligned lists (one entry per country). Returns float64
+    arrays keyed by policy, infra, language, risk and readiness; values
+    are bit-for-bit identical to calling the per-row functions.
+    """
+    n = len(iso_codes)
+
+    def flag(key: str, legacy: str) -> np.ndarray:
+        return np.fromiter(
+            (_bool(ind.get(key) or ind.get(legacy)) for ind in indicators), dtype=bool, count=n
         )
-        indicators = {k: v for (k, v) in cur.fetchall()}
 
-        # Gather infra signals
-        cur.execute(
-            """
-            SELECT metric, value
-            FROM infra_signals
-            WHERE country_id = %s;
-            """,
-            (cid,),
+    policy = np.full(n, 50.0)
+    policy += np.where(flag("mentions_data_localization", "data_residency_required"), 15.0, 0.0)
+    policy += np.where(flag("mentions_ai_systems", "ai_registry_required"), 10.0, 0.0)
+    policy += np.where(flag("mentions_cross_border", "cross_border_restrictions"), 5.0, 0.0)
+    policy = np.clip(policy, 0.0, 100.0)
+
+    has_infra = np.fromiter((bool(i) for i in infra), dtype=bool, count=n)
+    gpu = np.fromiter((float(i.get("gpu_capacity_index", 50.0)) for i in infra), dtype=float, count=n)
+    power = np.fromiter((float(i.get("power_cost_index", 50.0)) for i in infra), dtype=float, count=n)
+    adjusted = np.clip(gpu - (power - 50.0) * 0.1, 0.0, 100.0)
+    infra_score = np.where(has_infra, adjusted, 50.0)
+
+    upper = np.array([iso.upper() for iso in iso_codes], dtype=object)
+    language = np.where(np.isin(upper, list(_LANGUAGE_HIGH)), 70.0, 55.0)
+
+    risk, readiness = combine_components(policy, infra_score, language)
+
+    return {
+        "policy": policy,
+        "infra": infra_score,
+        "language": language,
+        "risk": risk,
+        "readiness": readiness,
+    }
+
+
+def _input_fingerprint(iso_code: str, indicators: Dict[str, str], infra: Dict[str, float]) -> str:
+    """Stable hash of everything that feeds a country's scores."""
+    payload = repr(
+        (
+            SCORING_VERSION,
+            iso_code.upper(),
+            sorted((k, "" if v is None else str(v)) for k, v in indicators.items()),
+            sorted(infra.items()),
         )
-        infra = {m: float(v) for (m, v) in cur.fetchall()} if cur.rowcount else {}
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _same_scores(previous: Sequence, current: Sequence[float]) -> bool:
+    return all(p is not None and float(p) == c for p, c in zip(previous, current))
+
+
+class ScoredBatch(NamedTuple):
+    countries: List[tuple]  # (id, iso_code, name) of every country considered
+    targets: int  # countries with changed inputs (all of them on full runs)
+    rows: List[tuple]  # new readiness_scores snapshots
+    latest_rows: List[tuple]  # matching latest_scores rows, with input_hash
+    refingerprinted: List[tuple]  # (country_id, input_hash): inputs moved, scores did not
 
-        # Compute component scores
-        policy_score, _ = _compute_policy_score(indicators)
-        infra_score, _confidence = _compute_infra_score(infra)
-        language_score = _compute_language_score(iso)
-        risk_score = _compute_risk_score(policy_score, infra_score, language_score)
 
-        readiness = 0.4 * policy_score + 0.3 * infra_score + 0.2 * language_score - 0.1 * risk_score
+def _score_batch(
+    cur,
+    full: bool,
+    computed_at: datetime,
+    id_range: Optional[Tuple[int, int]] = None,
+    echo: bool = True,
+) -> ScoredBatch:
+    """Fetch inputs, pick the countries to rescore and evaluate them; writes nothing."""
+    countries, indicators, infra = _fetch_inputs(cur, id_range)
+    cur.execute(
+        f"""
+        SELECT country_id, input_hash, score, policy_score, infra_score, language_score, risk_score
+        FROM latest_scores
+        {"" if id_range is None else "WHERE country_id BETWEEN %s AND %s"};
+        """,
+        id_range,
+    )
+    previous = {row[0]: row[1:] for row in cur.fetchall()}
+
+    targets = []
+    for cid, iso, name in countries:
+        fingerprint = _input_fingerprint(iso, indicators.get(cid, {}), infra.get(cid, {}))
+        prev = previous.get(cid)
+        if full or prev is None or prev[0] != fingerprint:
+            targets.append((cid, iso, name, fingerprint))
+
+    scores = _compute_score_arrays(
+        [iso for (_cid, iso, _name, _fp) in targets],
+        [indicators.get(cid, {}) for (cid, _iso, _name, _fp) in targets],
+        [infra.get(cid, {}) for (cid, _iso, _name, _fp) in targets],
+    )
+
+    rows: List[tuple] = []
+    latest_rows: List[tuple] = []
+    refingerprinted: List[tuple] = []
+    for i, (cid, iso, name, fingerprint) in enumerate(targets):
+        readiness = float(scores["readiness"][i])
+        policy_score = float(scores["policy"][i])
+        infra_score = float(scores["infra"][i])
+        language_score = float(scores["language"][i])
+        risk_score = float(scores["risk"][i])
+        values = (readiness, policy_score, infra_score, language_score, risk_score)
+
+        prev = previous.get(cid)
+        if not full and prev is not None and _same_scores(prev[1:], values):
+            # Inputs moved but the scores did not: no new snapshot
+            refingerprinted.append((cid, fingerprint))
+            continue
+
+        rows.append((cid, *values, computed_at))
+        latest_rows.append((cid, *values, computed_at, fingerprint))
+        if echo:
+            print(
+                f"[{iso}] {name}: readiness={readiness:.1f} "
+                f"(policy={policy_score:.1f}, infra={infra_score:.1f}, language={language_score:.1f}, risk={risk_score:.1f})"
+            )
+
+    return ScoredBatch(countries, len(targets), rows, latest_rows, refingerprinted)
+
+
+def compute_scores(full: bool = False):
+    """Compute and persist readiness scores.
+
+    Writes to readiness_scores with a timestamp, preserving history, and
+    keeps latest_scores (one row per country) pointing at the new snapshot.
+    Only countries with changed inputs are rescored unless ``full`` is set.
+    """
+    conn = get_conn()
+    cur = conn.cursor()
+    # Waits for a sharded run that is being finalized (and vice versa)
+    cur.execute("SELECT pg_advisory_xact_lock(%s);", (SCORING_LOCK,))
+
+    countries, targets, rows, latest_rows, refingerprinted = _score_batch(
+        cur, full, datetime.utcnow()
+    )
 
-        # Persist snapshot
-        cur.execute(
+    # Persist every snapshot in one round trip, then refresh latest_scores
+    # in the same transaction so readers never see the two disagree.
+    if rows:
+        execute_values(
+            cur,
             """
             INSERT INTO readiness_scores (
                 country_id, score, policy_score, infra_score, language_score, risk_score, computed_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s);
+            ) VALUES %s;
             """,
-            (cid, readiness, policy_score, infra_score, language_score, risk_score, datetime.utcnow()),
+            rows,
+            page_size=1000,
         )
-
-        print(
-            f"[{iso}] {name}: readiness={readiness:.1f} "
-            f"(policy={policy_score:.1f}, infra={infra_score:.1f}, language={language_score:.1f}, risk={risk_score:.1f})"
+        execute_values(
+            cur,
+            """
+            INSERT INTO latest_scores (
+                country_id, score, policy_score, infra_score, language_score, risk_score,
+                computed_at, input_hash
+            ) VALUES %s
+            ON CONFLICT (country_id) DO UPDATE SET
+                score = EXCLUDED.score,
+                policy_score = EXCLUDED.policy_score,
+                infra_score = EXCLUDED.infra_score,
+                language_score = EXCLUDED.language_score,
+                risk_score = EXCLUDED.risk_score,
+                computed_at = EXCLUDED.computed_at,
+                input_hash = EXCLUDED.input_hash;
+            """,
+            latest_rows,
+            page_size=1000,
+        )
+        # Delivered by Postgres only when this transaction commits
+        notify_data_changed(cur)
+    if refingerprinted:
+        execute_values(
+            cur,
+            """
+            UPDATE latest_scores AS l
+            SET input_hash = v.input_hash
+            FROM (VALUES %s) AS v(country_id, input_hash)
+            WHERE l.country_id = v.country_id;
+            """,
+            refingerprinted,
+            page_size=1000,
         )
+    ranked = None
+    if rows or _rankings_missing(cur):
+        ranked = _write_rankings(cur, countries)
 
     conn.commit()
     cur.close()
+
+    print(
+        f"Scored {len(rows)} of {len(countries)} countries "
+        f"({len(countries) - targets} with unchanged inputs skipped, "
+        f"{len(refingerprinted)} recomputed with unchanged scores)"
+    )
+    if ranked is not None:
+        print(f"Rankings rebuilt ({ranked} entries)")
+    _write_snapshot(conn)
     conn.close()
 
 
-if __name__ == "__main__":
-    compute_scores()
+def _rankings_missing(cur) -> bool:
+    # First run after the rankings table was added, or after it was emptied
+    cur.execute(
+        "SELECT NOT EXISTS (SELECT 1 FROM rankings) AND EXISTS (SELECT 1 FROM latest_scores);"
+    )
+    return cur.fetchone()[0]
+
+
+def _write_rankings(cur, countries) -> int:
+    """Rebuild the rankings table from latest_scores inside the scoring transaction."""
+    ids = {iso: cid for cid, iso, _name in countries}
+    rows = snapshot.fetch_rows(cur)
+    index = rankings.RankingIndex(rows)
+    # As of the newest score, like the snapshot the read-only API ranks from
+    computed_at = max((r[3] for r in rows if r[3] is not None), default=datetime.utcnow())
+    records = [
+        (
+            component, scope, e.position, ids[e.iso_code], e.value, e.rank, e.percentile,
+            e.total, computed_at,
+        )
+        for component, scope, e in index
+    ]
+    cur.execute("DELETE FROM rankings;")
+    execute_values(
+        cur,
+        """
+        INSERT INTO rankings (
+            component, scope, position, country_id, value, rank, percentile, total, computed_at
+        ) VALUES %s;
+        """,
+        records,
+        page_size=1000,
+    )
+    # Same payload as the score update, so Postgres delivers a single notification
+    notify_data_changed(cur)
+    return len(records)
 
+
+def _write_snapshot(conn):
+    """Refresh the columnar snapshot from the committed latest scores."""
+    if not snapshot.SNAPSHOT_PATH:
+        return
+    try:
+        version = snapshot.write_snapshot(conn)
+    except (snapshot.SnapshotError, OSError) as e:
+        print(f"Snapshot skipped: {e}")
+        return
+    print(f"Snapshot written to {snapshot.SNAPSHOT_PATH} (version {version[:12]})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute SovAI readiness scores.")
+    parser.add_argument(
+        "--full", action="store_true", help="recompute and snapshot every country, changed or not"
+    )
+    args = parser.parse_args()
+    compute_scores(full=args.full)
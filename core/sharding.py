@@ -0,0 +1,400 @@
+"""
+Sharded scoring runs
+--------------------
+
+For entity sets that one compute_scores() process cannot finish in time.
+A run splits ``countries`` into contiguous id ranges (shards); any number of
+worker processes, on one host or several, score them; a final step then
+publishes the whole run at once:
+
+  1. start     records the run and its shards (scoring_runs, scoring_shards)
+  2. work      claims one pending shard at a time (FOR UPDATE SKIP LOCKED),
+               scores it with the compute_scores() engine and stages the
+               results in scoring_results. The results and the shard's "done"
+               mark commit together, so each shard is scored exactly once; if
+               a worker dies, its transaction rolls back and the shard can be
+               claimed again.
+  3. finalize  once every shard is done, copies the staged results into
+               readiness_scores / latest_scores, rebuilds rankings and
+               notifies the API in one transaction, then writes the Arrow
+               snapshot. Until that commit the API serves the previous run.
+
+Finalize holds the same advisory lock as compute_scores(), so a plain run
+never interleaves with it. Every snapshot of a run carries the run's start
+time as computed_at; countries added after a run starts are scored by the
+next run. Scores a plain run committed while the sharded run was in flight
+are newer, so finalize keeps them in latest_scores and only appends its own
+to the history. Only one sharded run can be in progress at a time.
+
+  python -m core.sharding run --shards 32 --workers 8 [--full]   # one host
+  python -m core.sharding start --shards 64 [--full]             # several hosts:
+  python -m core.sharding work                                   #   on every node
+  python -m core.sharding finalize                               #   when all are done
+  python -m core.sharding status | abort
+
+Settings (env):
+  - SCORING_SHARDS    shards per run (default 16)
+  - SCORING_WORKERS   worker processes for ``run`` (default: CPU count)
+
+Database settings (DB_*) are the same as for core/scoring.py.
+"""
+
+import argparse
+import os
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from core import scoring
+
+SCORING_SHARDS = int(os.getenv("SCORING_SHARDS", "16"))
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(os.cpu_count() or 1)))
+
+
+class ShardingError(RuntimeError):
+    """A run cannot be started, worked on or finalized in its current state."""
+
+
+def shard_ranges(ids: Sequence[int], shards: int) -> List[Tuple[int, int]]:
+    """Split sorted ids into at most ``shards`` contiguous, near-equal (first, last) ranges."""
+    n = len(ids)
+    shards = max(1, min(shards, n))
+    if not ids:
+        return []
+    bounds = [n * i // shards for i in range(shards + 1)]
+    return [(ids[bounds[i]], ids[bounds[i + 1] - 1]) for i in range(shards)]
+
+
+def _running(cur, run_id: Optional[int] = None, lock: bool = False) -> Tuple[int, bool, datetime]:
+    """(id, full_run, computed_at) of the run in progress; ``lock`` takes its row lock."""
+    cur.execute(
+        f"""
+        SELECT id, full_run, computed_at
+        FROM scoring_runs
+        WHERE status = 'running' {"" if run_id is None else "AND id = %s"}
+        {"FOR UPDATE" if lock else ""};
+        """,
+        None if run_id is None else (run_id,),
+    )
+    row = cur.fetchone()
+    if row is None:
+        what = "No sharded run" if run_id is None else f"Run {run_id} is not"
+        raise ShardingError(f"{what} in progress")
+    return row
+
+
+def start(shards: int = SCORING_SHARDS, full: bool = False) -> int:
+    """Record a new run over the current countries and return its id."""
+    conn = scoring.get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM countries ORDER BY id;")
+            ranges = shard_ranges([r[0] for r in cur.fetchall()], shards)
+            try:
+                cur.execute(
+                    """
+                    INSERT INTO scoring_runs (full_run, shards, computed_at)
+                    VALUES (%s, %s, %s)
+                    RETURNING id;
+                    """,
+                    (full, len(ranges), datetime.utcnow()),
+                )
+            except psycopg2.errors.UniqueViolation:
+                raise ShardingError(
+                    "Another sharded run is in progress; finalize or abort it first"
+                ) from None
+            run_id = cur.fetchone()[0]
+            execute_values(
+                cur,
+                "INSERT INTO scoring_shards (run_id, shard, first_id, last_id) VALUES %s;",
+                [(run_id, i, first, last) for i, (first, last) in enumerate(ranges)],
+                page_size=1000,
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Run {run_id} started: {len(ranges)} shards{' (full)' if full else ''}")
+    return run_id
+
+
+def work(run_id: Optional[int] = None) -> int:
+    """Score pending shards of the run until none are left; returns how many this worker did.
+
+    Safe to run any number of times, concurrently, on any host.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    conn = scoring.get_conn()
+    done = 0
+    try:
+        with conn.cursor() as cur:
+            run_id, full, computed_at = _running(cur, run_id)
+            conn.commit()
+            while True:
+                # The shard lock is held until its results commit; the share lock
+                # on the run makes finalize/abort wait for shards in flight.
+                cur.execute(
+                    """
+                    SELECT s.shard, s.first_id, s.last_id
+                    FROM scoring_shards s
+                    JOIN scoring_runs r ON r.id = s.run_id
+                    WHERE s.run_id = %s AND s.status = 'pending' AND r.status = 'running'
+                    ORDER BY s.shard
+                    LIMIT 1
+                    FOR UPDATE OF s SKIP LOCKED
+                    FOR SHARE OF r SKIP LOCKED;
+                    """,
+                    (run_id,),
+                )
+                claimed = cur.fetchone()
+                if claimed is None:
+                    conn.rollback()
+                    break
+                shard, first_id, last_id = claimed
+                batch = scoring._score_batch(
+                    cur, full, computed_at, (first_id, last_id), echo=False
+                )
+                staged = [
+                    (run_id, cid, *values, fingerprint, True)
+                    for (cid, *values, _computed_at, fingerprint) in batch.latest_rows
+                ]
+                staged += [
+                    (run_id, cid, None, None, None, None, None, fingerprint, False)
+                    for cid, fingerprint in batch.refingerprinted
+                ]
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO scoring_results (
+                        run_id, country_id, score, policy_score, infra_score, language_score,
+                        risk_score, input_hash, new_snapshot
+                    ) VALUES %s;
+                    """,
+                    staged,
+                    page_size=1000,
+                )
+                cur.execute(
+                    """
+                    UPDATE scoring_shards
+                    SET status = 'done', worker = %s, countries = %s, scored = %s,
+                        finished_at = now()
+                    WHERE run_id = %s AND shard = %s;
+                    """,
+                    (worker, len(batch.countries), len(batch.rows), run_id, shard),
+                )
+                conn.commit()
+                done += 1
+                print(
+                    f"Run {run_id} shard {shard} (ids {first_id}-{last_id}): "
+                    f"scored {len(batch.rows)} of {len(batch.countries)} countries"
+                )
+    finally:
+        conn.close()
+    return done
+
+
+def finalize(run_id: Optional[int] = None) -> int:
+    """Publish a run whose shards are all done, in one transaction; returns the run id."""
+    conn = scoring.get_conn()
+    try:
+        cur = conn.cursor()
+        run_id, _full, computed_at = _running(cur, run_id)
+        cur.execute(
+            """
+            SELECT count(*) FILTER (WHERE status <> 'done'), coalesce(sum(countries), 0)
+            FROM scoring_shards
+            WHERE run_id = %s;
+            """,
+            (run_id,),
+        )
+        pending, countries = cur.fetchone()
+        if pending:
+            raise ShardingError(f"Run {run_id} has {pending} shard(s) not done yet")
+        # Done is final, so only a concurrent finalize/abort can change the run now
+        cur.execute("SELECT pg_advisory_xact_lock(%s);", (scoring.SCORING_LOCK,))
+        _running(cur, run_id, lock=True)
+
+        cur.execute(
+            """
+            INSERT INTO readiness_scores (
+                country_id, score, policy_score, infra_score, language_score, risk_score,
+                computed_at
+            )
+            SELECT country_id, score, policy_score, infra_score, language_score, risk_score, %s
+            FROM scoring_results
+            WHERE run_id = %s AND new_snapshot;
+            """,
+            (computed_at, run_id),
+        )
+        scored = cur.rowcount
+        cur.execute(
+            """
+            INSERT INTO latest_scores (
+                country_id, score, policy_score, infra_score, language_score, risk_score,
+                computed_at, input_hash
+            )
+            SELECT country_id, score, policy_score, infra_score, language_score, risk_score,
+                   %s, input_hash
+            FROM scoring_results
+            WHERE run_id = %s AND new_snapshot
+            ON CONFLICT (country_id) DO UPDATE SET
+                score = EXCLUDED.score,
+                policy_score = EXCLUDED.policy_score,
+                infra_score = EXCLUDED.infra_score,
+                language_score = EXCLUDED.language_score,
+                risk_score = EXCLUDED.risk_score,
+                computed_at = EXCLUDED.computed_at,
+                input_hash = EXCLUDED.input_hash
+            -- A plain run that committed while this one was in flight is newer
+            WHERE latest_scores.computed_at <= EXCLUDED.computed_at;
+            """,
+            (computed_at, run_id),
+        )
+        cur.execute(
+            """
+            UPDATE latest_scores AS l
+            SET input_hash = r.input_hash
+            FROM scoring_results r
+            WHERE r.run_id = %s AND NOT r.new_snapshot AND l.country_id = r.country_id
+              AND l.computed_at <= %s;
+            """,
+            (run_id, computed_at),
+        )
+        refingerprinted = cur.rowcount
+        if scored:
+            # Delivered by Postgres only when this transaction commits
+            scoring.notify_data_changed(cur)
+        ranked = None
+        if scored or scoring._rankings_missing(cur):
+            cur.execute("SELECT id, iso_code, name FROM countries;")
+            ranked = scoring._write_rankings(cur, cur.fetchall())
+        cur.execute("DELETE FROM scoring_results WHERE run_id = %s;", (run_id,))
+        cur.execute(
+            "UPDATE scoring_runs SET status = 'finalized', finished_at = now() WHERE id = %s;",
+            (run_id,),
+        )
+        conn.commit()
+        cur.close()
+
+        print(
+            f"Run {run_id} finalized: scored {scored} of {countries} countries "
+            f"({refingerprinted} recomputed with unchanged scores)"
+        )
+        if ranked is not None:
+            print(f"Rankings rebuilt ({ranked} entries)")
+        scoring._write_snapshot(conn)
+    finally:
+        conn.close()
+    return run_id
+
+
+def abort(run_id: Optional[int] = None) -> int:
+    """Drop a run in progress and its staged results; published scores are untouched."""
+    conn = scoring.get_conn()
+    try:
+        with conn.cursor() as cur:
+            run_id, _full, _computed_at = _running(cur, run_id, lock=True)
+            cur.execute("DELETE FROM scoring_results WHERE run_id = %s;", (run_id,))
+            cur.execute(
+                "UPDATE scoring_runs SET status = 'aborted', finished_at = now() WHERE id = %s;",
+                (run_id,),
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Run {run_id} aborted")
+    return run_id
+
+
+def status(run_id: Optional[int] = None):
+    """Print progress of the given run, or of the most recent one."""
+    conn = scoring.get_conn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT r.id, r.status, r.full_run, r.started_at, r.finished_at, r.shards,
+                       count(s.shard) FILTER (WHERE s.status = 'done'),
+                       coalesce(sum(s.countries), 0), coalesce(sum(s.scored), 0),
+                       count(DISTINCT s.worker)
+                FROM scoring_runs r
+                LEFT JOIN scoring_shards s ON s.run_id = r.id
+                {"" if run_id is None else "WHERE r.id = %s"}
+                GROUP BY r.id
+                ORDER BY r.id DESC
+                LIMIT 1;
+                """,
+                None if run_id is None else (run_id,),
+            )
+            row = cur.fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        print("No sharded runs")
+        return
+    rid, state, full, started, finished, shards, done, countries, scored, workers = row
+    print(
+        f"Run {rid} {state}{' (full)' if full else ''}: {done}/{shards} shards done by "
+        f"{workers} worker(s), {scored} of {countries} countries scored; "
+        f"started {started:%Y-%m-%d %H:%M:%S}"
+        + (f", finished {finished:%Y-%m-%d %H:%M:%S}" if finished else "")
+    )
+
+
+def run(shards: int = SCORING_SHARDS, workers: int = SCORING_WORKERS, full: bool = False) -> int:
+    """Start a run, score it with a local process pool and finalize it."""
+    run_id = start(shards, full)
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(work, run_id) for _ in range(max(1, workers))]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:  # its shard went back to pending; others pick it up
+                print(f"Worker failed: {e}", file=sys.stderr)
+    return finalize(run_id)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Sharded SovAI scoring runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("run", help="start, score with a local process pool and finalize")
+    p.add_argument("--shards", type=int, default=SCORING_SHARDS)
+    p.add_argument("--workers", type=int, default=SCORING_WORKERS)
+    p.add_argument("--full", action="store_true", help="recompute every country")
+    p = commands.add_parser("start", help="record a new run and its shards")
+    p.add_argument("--shards", type=int, default=SCORING_SHARDS)
+    p.add_argument("--full", action="store_true", help="recompute every country")
+    for name, help_text in (
+        ("work", "score pending shards until none are left"),
+        ("finalize", "publish a run whose shards are all done"),
+        ("abort", "drop a run in progress"),
+        ("status", "show progress of a run (default: the latest)"),
+    ):
+        p = commands.add_parser(name, help=help_text)
+        p.add_argument("--run", type=int, help="run id (default: the run in progress)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "run":
+            run(args.shards, args.workers, args.full)
+        elif args.command == "start":
+            start(args.shards, args.full)
+        elif args.command == "work":
+            work(args.run)
+        elif args.command == "finalize":
+            finalize(args.run)
+        elif args.command == "abort":
+            abort(args.run)
+        else:
+            status(args.run)
+    except ShardingError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Columnar score snapshots
+------------------------
+
+After every scoring run, the latest scores, their components and country
+metadata are written to one Arrow IPC file (``SNAPSHOT_PATH``). The file is
+written to a temp name and renamed into place, so readers see either the
+old snapshot or the new one, never a partial file.
+
+The API's read-only mode (``API_READ_ONLY=1``) serves ``/countries`` and
+``/compare`` from that file. Each worker memory-maps it, so every uvicorn
+worker on a host shares the same OS page cache and no Postgres connection
+is needed for those reads. Workers notice a swapped file by its inode and
+reopen it.
+
+Settings (env):
+  - SNAPSHOT_PATH   snapshot location, empty disables writing
+                    (default data/snapshots/scores.arrow)
+
+Needs the optional ``pyarrow`` package; scoring skips the snapshot without it.
+"""
+
+import hashlib
+import os
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join("data", "snapshots", "scores.arrow"))
+
+COLUMNS = (
+    "iso_code",
+    "name",
+    "region",
+    "computed_at",
+    "readiness_score",
+    "policy_score",
+    "infra_score",
+    "language_score",
+    "risk_score",
+)
+
+
+class SnapshotError(RuntimeError):
+    """Snapshot cannot be written or read (missing file or optional deps)."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:  # pragma: no cover - depends on optional deps
+        raise SnapshotError("Score snapshots need the optional 'pyarrow' package installed") from e
+    return pyarrow
+
+
+def _schema(pa, metadata: Optional[dict] = None):
+    return pa.schema(
+        [
+            ("iso_code", pa.string()),
+            ("name", pa.string()),
+            ("region", pa.string()),
+            ("computed_at", pa.timestamp("us")),
+            *((col, pa.float64()) for col in COLUMNS[4:]),
+        ],
+        metadata=metadata,
+    )
+
+
+def fetch_rows(cur) -> List[tuple]:
+    """Latest scores of every country as snapshot rows (COLUMNS order).
+
+    Same rows and order as GET /countries, plus region and computed_at;
+    scoring also ranks from them (core/rankings.py).
+    """
+    cur.execute(
+        """
+        SELECT c.iso_code, c.name, c.region, rs.computed_at,
+               rs.score, rs.policy_score, rs.infra_score, rs.language_score, rs.risk_score
+        FROM countries c
+        LEFT JOIN latest_scores rs ON rs.country_id = c.id
+        ORDER BY c.name;
+        """
+    )
+    return [
+        row[:4] + tuple(float(v) if v is not None else None for v in row[4:])
+        for row in cur.fetchall()
+    ]
+
+
+def write_snapshot(conn, path: str = SNAPSHOT_PATH) -> str:
+    """Write the current latest scores to ``path`` atomically; returns its version."""
+    with conn.cursor() as cur:
+        rows = fetch_rows(cur)
+    return write_rows(rows, path)
+
+
+def write_rows(rows: List[tuple], path: str = SNAPSHOT_PATH) -> str:
+    """Write ``rows`` (in COLUMNS order) as a snapshot file; returns its version.
+
+    The version is a digest of the rows, so it only changes when the data
+    does and is identical on every host that reads the same file.
+    """
+    pa = _pyarrow()
+    version = hashlib.sha1(repr(rows).encode("utf-8")).hexdigest()
+    newest = max((r[3] for r in rows if r[3] is not None), default=None)
+    metadata = {
+        "sovai.version": version,
+        "sovai.computed_at": newest.isoformat() if newest is not None else "",
+        "sovai.written_at": datetime.utcnow().isoformat(),
+    }
+    schema = _schema(pa, metadata)
+    table = pa.Table.from_arrays(
+        [pa.array([r[i] for r in rows], type=schema.field(i).type) for i in range(len(COLUMNS))],
+        schema=schema,
+    )
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return version
+
+
+class Snapshot:
+    """One memory-mapped snapshot file (immutable once opened)."""
+
+    def __init__(self, path: str):
+        pa = _pyarrow()
+        self.path = path
+        self.identity = _identity(path)
+        self._source = pa.memory_map(path, "r")
+        # Zero-copy: column buffers point into the mapped file
+        self.table = pa.ipc.open_file(self._source).read_all()
+        meta = {k.decode(): v.decode() for k, v in (self.table.schema.metadata or {}).items()}
+        self.version = meta.get("sovai.version", "")
+        computed_at = meta.get("sovai.computed_at")
+        self.computed_at = datetime.fromisoformat(computed_at) if computed_at else None
+        self._rows: Optional[List[dict]] = None
+
+    def rows(self) -> List[dict]:
+        """All rows in /countries order (materialized once per snapshot)."""
+        if self._rows is None:
+            self._rows = self.table.to_pylist()
+        return self._rows
+
+    def select(self, iso_codes: Iterable[str]) -> List[dict]:
+        """Rows for the given ISO codes, filtered on the mapped columns."""
+        import pyarrow.compute as pc
+
+        mask = pc.is_in(self.table.column("iso_code"), value_set=_pyarrow().array(list(iso_codes)))
+        return self.table.filter(mask).to_pylist()
+
+
+def _identity(path: str):
+    st = os.stat(path)
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class SnapshotReader:
+    """Returns the current Snapshot, reopening it after an atomic swap."""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._current: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Snapshot:
+        try:
+            identity = _identity(self.path)
+        except OSError as e:
+            raise SnapshotError(f"No score snapshot at {self.path}") from e
+        current = self._current
+        if current is not None and current.identity == identity:
+            return current
+        with self._lock:
+            if self._current is None or self._current.identity != identity:
+                # The old mapping stays valid for requests still holding it
+                self._current = Snapshot(self.path)
+            return self._current
@@ -13,7 +13,9 @@ CREATE TABLE IF NOT EXISTS policies (
     category TEXT,                -- e.g. "data_protection", "ai_act", "localization"
     status TEXT,                  -- e.g. "draft", "in_force", "proposed"
     last_updated DATE,
-    raw_text TEXT
+    raw_text TEXT,                -- legacy inline copy; new rows reference raw_blob instead
+    content_hash TEXT,            -- sha256 of the fetched document; one row per version
+    raw_blob TEXT                 -- key of the full document in the blob store (ingest/blob_store.py)
 );
 
 CREATE TABLE IF NOT EXISTS policy_indicators (
@@ -41,3 +43,112 @@ CREATE TABLE IF NOT EXISTS readiness_scores (
     risk_score NUMERIC,
     computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
+
+-- One row per country: the most recent snapshot, maintained by compute_scores()
+-- in the same transaction that appends to readiness_scores.
+CREATE TABLE IF NOT EXISTS latest_scores (
+    country_id INT PRIMARY KEY REFERENCES countries(id),
+    score NUMERIC NOT NULL,
+    policy_score NUMERIC,
+    infra_score NUMERIC,
+    language_score NUMERIC,
+    risk_score NUMERIC,
+    computed_at TIMESTAMP NOT NULL,
+    input_hash TEXT               -- fingerprint of the inputs behind this snapshot
+);
+
+ALTER TABLE latest_scores ADD COLUMN IF NOT EXISTS input_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS readiness_scores_country_computed_idx
+    ON readiness_scores (country_id, computed_at DESC);
+CREATE INDEX IF NOT EXISTS policies_country_idx ON policies (country_id);
+CREATE UNIQUE INDEX IF NOT EXISTS policy_indicators_policy_key_idx
+    ON policy_indicators (policy_id, key);
+CREATE INDEX IF NOT EXISTS infra_signals_country_idx ON infra_signals (country_id);
+
+-- Idempotent ingest: a policy version is identified by (country, source, content)
+ALTER TABLE policies ADD COLUMN IF NOT EXISTS content_hash TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS policies_source_version_idx
+    ON policies (country_id, source_url, content_hash);
+
+-- Raw documents live in the compressed blob store; policies keep the key only
+ALTER TABLE policies ADD COLUMN IF NOT EXISTS raw_blob TEXT;
+
+-- Backfill for databases scored before latest_scores existed
+INSERT INTO latest_scores (
+    country_id, score, policy_score, infra_score, language_score, risk_score, computed_at
+)
+SELECT DISTINCT ON (country_id)
+       country_id, score, policy_score, infra_score, language_score, risk_score, computed_at
+FROM readiness_scores
+WHERE computed_at IS NOT NULL
+ORDER BY country_id, computed_at DESC
+ON CONFLICT (country_id) DO NOTHING;
+
+-- Single row bumped by every writer in the transaction that notifies
+-- sovai_data_changed; the API derives ETag / Last-Modified from it (api/http_cache.py),
+-- so in-place updates (renames, re-parsed indicators) revalidate too.
+CREATE TABLE IF NOT EXISTS data_version (
+    id BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT (now() AT TIME ZONE 'utc')  -- naive UTC
+);
+INSERT INTO data_version DEFAULT VALUES ON CONFLICT (id) DO NOTHING;
+
+-- Pre-sorted rankings per component and scope ('all' or a countries.region),
+-- rebuilt by compute_scores() in the transaction that writes the scores (core/rankings.py).
+CREATE TABLE IF NOT EXISTS rankings (
+    component TEXT NOT NULL,      -- readiness, policy, infra, language or risk
+    scope TEXT NOT NULL,          -- 'all' or a region name
+    position INT NOT NULL,        -- 1-based order within the scope; ties broken by name
+    country_id INT NOT NULL REFERENCES countries(id),
+    value NUMERIC NOT NULL,
+    rank INT NOT NULL,            -- competition rank (ties share the better rank)
+    percentile NUMERIC NOT NULL,  -- 100 = best in scope, 0 = worst
+    total INT NOT NULL,           -- countries ranked in the scope
+    computed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (component, scope, position)
+);
+CREATE INDEX IF NOT EXISTS rankings_country_idx ON rankings (country_id);
+
+-- Sharded scoring runs (core/sharding.py). Workers claim pending shards with
+-- FOR UPDATE SKIP LOCKED and stage their results; finalize copies a complete run
+-- into readiness_scores / latest_scores / rankings in one transaction.
+CREATE TABLE IF NOT EXISTS scoring_runs (
+    id SERIAL PRIMARY KEY,
+    full_run BOOLEAN NOT NULL,
+    shards INT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',  -- running, finalized or aborted
+    computed_at TIMESTAMP NOT NULL,          -- shared by every snapshot of the run
+    started_at TIMESTAMP NOT NULL DEFAULT now(),
+    finished_at TIMESTAMP
+);
+-- At most one run in progress
+CREATE UNIQUE INDEX IF NOT EXISTS scoring_runs_running_idx
+    ON scoring_runs (status) WHERE status = 'running';
+
+CREATE TABLE IF NOT EXISTS scoring_shards (
+    run_id INT NOT NULL REFERENCES scoring_runs(id) ON DELETE CASCADE,
+    shard INT NOT NULL,
+    first_id INT NOT NULL,                   -- countries.id range, inclusive
+    last_id INT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending or done
+    worker TEXT,                             -- host:pid that scored the shard
+    countries INT,
+    scored INT,
+    finished_at TIMESTAMP,
+    PRIMARY KEY (run_id, shard)
+);
+
+CREATE TABLE IF NOT EXISTS scoring_results (
+    run_id INT NOT NULL REFERENCES scoring_runs(id) ON DELETE CASCADE,
+    country_id INT NOT NULL REFERENCES countries(id),
+    score NUMERIC,                           -- NULL when new_snapshot is false
+    policy_score NUMERIC,
+    infra_score NUMERIC,
+    language_score NUMERIC,
+    risk_score NUMERIC,
+    input_hash TEXT NOT NULL,
+    new_snapshot BOOLEAN NOT NULL,           -- false: inputs moved, scores did not
+    PRIMARY KEY (run_id, country_id)
+);
@@ -0,0 +1,116 @@
+# ingest/blob_store.py
+
+import codecs
+import gzip
+import hashlib
+import mmap
+import os
+import threading
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+# Raw source documents, gzip-compressed and addressed by sha256 of their bytes
+BLOB_DIR = os.getenv("BLOB_STORE_DIR", os.path.join("data", "blobs"))
+
+READ_CHUNK_BYTES = 64 * 1024
+COMPRESS_LEVEL = 6
+
+
+class BlobWriter:
+    """Streams one document into the store; the key is given at commit time.
+
+    The caller already hashes the body while streaming (fetch_sources), so the
+    writer only compresses. Use put() when the bytes are in memory.
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self._store = store
+        os.makedirs(store.root, exist_ok=True)
+        self._tmp = os.path.join(store.root, f".incoming.{os.getpid()}.{threading.get_ident()}.tmp")
+        self._raw = open(self._tmp, "wb")
+        self._gz = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0)
+
+    def write(self, block: bytes):
+        self._gz.write(block)
+
+    def abort(self):
+        self._gz.close()
+        self._raw.close()
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+    def commit(self, digest: str) -> str:
+        self._gz.close()
+        self._raw.close()
+        path = self._store.path(digest)
+        if os.path.exists(path):
+            # Same content already stored
+            os.remove(self._tmp)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._tmp, path)
+        return digest
+
+
+class BlobStore:
+    """Content-addressed, compressed store for raw documents.
+
+    Layout: <root>/<digest[:2]>/<digest>.gz. Blobs are immutable, so writes
+    are a rename into place and readers never see partial files. Readers
+    memory-map the compressed file and decompress incrementally, so a large
+    document is never held in memory (or pulled through Postgres) whole.
+    """
+
+    def __init__(self, root: str = BLOB_DIR):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest + ".gz")
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self)
+
+    def put(self, data: bytes) -> str:
+        """Store ``data`` and return its digest."""
+        digest = hashlib.sha256(data).hexdigest()
+        if not self.exists(digest):
+            w = self.writer()
+            w.write(data)
+            w.commit(digest)
+        return digest
+
+    @contextmanager
+    def open(self, digest: str) -> Iterator[BinaryIO]:
+        """Decompressed, read-only binary stream over a memory-mapped blob."""
+        with open(self.path(digest), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with gzip.GzipFile(fileobj=mm, mode="rb") as gz:
+                    yield gz
+
+    def iter_text(
+        self, digest: str, encoding: Optional[str] = None, chunk_bytes: int = READ_CHUNK_BYTES
+    ) -> Iterator[str]:
+        """Yield the document as decoded text chunks (utf-8 unless given)."""
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with self.open(digest) as stream:
+            while True:
+                block = stream.read(chunk_bytes)
+                if not block:
+                    break
+                text = decoder.decode(block)
+                if text:
+                    yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def read_text(self, digest: str, encoding: Optional[str] = None) -> str:
+        return "".join(self.iter_text(digest, encoding))
@@ -1,6 +1,21 @@
 # ingest/fetch_sources.py
 
+import codecs
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+
+if TYPE_CHECKING:
+    from blob_store import BlobStore
 
 SOURCES = [
     {
@@ -19,29 +34,418 @@ SOURCES = [
     },
 ]
 
-def fetch_raw_policies():
-    docs = []
-    for s in SOURCES:
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Local HTTP cache of source bodies and their validators
+CACHE_DIR = os.getenv("INGEST_CACHE_DIR", os.path.join(".cache", "sources"))
+
+# Bodies are streamed in blocks; only the head is kept on the doc (the full
+# body goes to the blob store when one is given)
+STREAM_CHUNK_BYTES = 64 * 1024
+MAX_STORED_CHARS = 200000
+
+
+class SourceCache:
+    """On-disk cache of response bodies plus ETag / Last-Modified per URL.
+
+    Layout: <root>/<sha256(url)>.json (validators, content hash) next to
+    <root>/<sha256(url)>.body (raw bytes). Writes are atomic renames.
+    """
+
+    def __init__(self, root: str = CACHE_DIR):
+        self.root = root
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.root, key)
+        return base + ".json", base + ".body"
+
+    def load(self, url: str) -> Optional[dict]:
+        meta_path, body_path = self._paths(url)
+        if not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, meta: Optional[dict]) -> dict:
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def begin(self, url: str):
+        """Open a temp file to stream a new body into (see commit/abort)."""
+        os.makedirs(self.root, exist_ok=True)
+        _, body_path = self._paths(url)
+        # Unique per fetch: the file waits for the loader to commit or abort it
+        return open(f"{body_path}.{uuid.uuid4().hex}.tmp", "wb")
+
+    def abort(self, sink):
+        sink.close()
         try:
-            resp = requests.get(s["url"], timeout=20)
-            if resp.ok:
-                # For MVP we just store first chunk of HTML/text
-                raw = resp.text
-                docs.append(
-                    {
-                        "country": s["country"],
-                        "iso_code": s["iso_code"],
-                        "name": s["name"],
-                        "url": s["url"],
-                        "category": s["category"],
-                        "raw_text": raw[:200000],
-                    }
+            os.remove(sink.name)
+        except OSError:
+            pass
+
+    def commit(self, url: str, sink, etag: Optional[str], last_modified: Optional[str], content_hash: str):
+        sink.close()
+        meta_path, body_path = self._paths(url)
+        os.replace(sink.name, body_path)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": content_hash,
+        }
+        tmp = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+
+class CacheEntry:
+    """A fetched body and its validators, spooled but not yet in the SourceCache.
+
+    The cache must only describe content the database already holds, or a
+    failed load would make the next run skip the source as unchanged. The
+    loader calls ``commit()`` once the doc's batch has committed and
+    ``abort()`` when it is dropped.
+    """
+
+    def __init__(self, cache: SourceCache, url: str, sink, etag, last_modified, content_hash):
+        self.cache = cache
+        self.url = url
+        self.sink = sink
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+
+    def commit(self):
+        self.cache.commit(self.url, self.sink, self.etag, self.last_modified, self.content_hash)
+
+    def abort(self):
+        self.cache.abort(self.sink)
+
+
+class FetchStats:
+    """Thread-safe per-run counters for cache effectiveness."""
+
+    def __init__(self):
+        self.hits = 0      # 304 or identical content: nothing to re-parse
+        self.misses = 0    # new or changed content
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def add(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hits, {self.misses} misses, {self.failed} failed"
+
+
+class _Deadline:
+    def __init__(self, seconds: float):
+        self.at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+
+def _session(pool_size: int) -> requests.Session:
+    """Shared session so connections to the same host are reused."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _doc(
+    source: dict,
+    raw_text: Optional[str],
+    content_hash: Optional[str],
+    unchanged: bool,
+    indicators: Optional[dict] = None,
+    blob: Optional[str] = None,
+    cache_entry: Optional[CacheEntry] = None,
+) -> dict:
+    return {
+        "country": source["country"],
+        "iso_code": source["iso_code"],
+        "name": source["name"],
+        "url": source["url"],
+        "category": source["category"],
+        "raw_text": raw_text,
+        "content_hash": content_hash,
+        # Blob store key of the full body (None when not stored)
+        "blob": blob,
+        # Parsed from the full body while streaming (None without a parser)
+        "indicators": indicators,
+        # True when the cached copy is still current; downstream skips these
+        "unchanged": unchanged,
+        # SourceCache update to commit once the doc is stored (None without a cache)
+        "cache_entry": cache_entry,
+    }
+
+
+def _decoder(encoding: Optional[str]):
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def _read_body(resp, sinks, parser: Optional[Callable]):
+    """Stream the body once: hash it, spool it to each sink, feed the parser.
+
+    Memory stays bounded by the stored head (MAX_STORED_CHARS) regardless of
+    document size. Returns (content_hash, head_text, indicators).
+    """
+    hasher = hashlib.sha256()
+    decoder = _decoder(resp.encoding)
+    scan = parser() if parser is not None else None
+    head: List[str] = []
+    head_len = 0
+
+    def consume(text: str):
+        nonlocal head_len
+        if head_len < MAX_STORED_CHARS:
+            keep = text[: MAX_STORED_CHARS - head_len]
+            head.append(keep)
+            head_len += len(keep)
+        if scan is not None and not scan.done:
+            scan.feed(text)
+
+    for block in resp.iter_content(STREAM_CHUNK_BYTES):
+        hasher.update(block)
+        for sink in sinks:
+            sink.write(block)
+        consume(decoder.decode(block))
+    consume(decoder.decode(b"", final=True))
+    return hasher.hexdigest(), "".join(head), scan.result() if scan is not None else None
+
+
+def _fetch_one(
+    session: requests.Session,
+    source: dict,
+    host_slot: threading.Semaphore,
+    deadline: _Deadline,
+    timeout: float,
+    retries: int,
+    backoff: float,
+    cache: Optional[SourceCache],
+    stats: FetchStats,
+    parser: Optional[Callable] = None,
+    blobs: Optional["BlobStore"] = None,
+) -> Optional[dict]:
+    """Fetch one source with retries; returns a doc dict or None on failure."""
+    meta = cache.load(source["url"]) if cache is not None else None
+    headers = cache.conditional_headers(meta) if cache is not None else {}
+    attempt = 0
+    while True:
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            print(f"Gave up on {source['name']}: deadline reached")
+            stats.add("failed")
+            return None
+        error = None
+        body = None
+        entry = None
+        with host_slot:
+            try:
+                resp = session.get(
+                    source["url"], headers=headers, timeout=min(timeout, remaining), stream=True
                 )
-                print(f"Fetched: {s['name']}")
+                try:
+                    if resp.ok and resp.status_code != 304:
+                        sink = cache.begin(source["url"]) if cache is not None else None
+                        blob = blobs.writer() if blobs is not None else None
+                        try:
+                            body = _read_body(resp, [x for x in (sink, blob) if x], parser)
+                        except BaseException:
+                            if sink is not None:
+                                cache.abort(sink)
+                            if blob is not None:
+                                blob.abort()
+                            raise
+                        if blob is not None:
+                            blob.commit(body[0])
+                        if sink is not None:
+                            sink.close()
+                            entry = CacheEntry(
+                                cache,
+                                source["url"],
+                                sink,
+                                resp.headers.get("ETag"),
+                                resp.headers.get("Last-Modified"),
+                                body[0],
+                            )
+                finally:
+                    resp.close()
+            except requests.RequestException as e:
+                resp, error = None, e
+
+        if resp is not None and resp.status_code == 304 and meta is not None:
+            print(f"Not modified: {source['name']}")
+            stats.add("hits")
+            return _doc(source, None, meta.get("content_hash"), unchanged=True)
+
+        if body is not None:
+            content_hash, raw_text, indicators = body
+            if meta is not None and meta.get("content_hash") == content_hash:
+                # Already loaded (the cache only records stored content): just
+                # keep the fresh validators
+                if entry is not None:
+                    entry.commit()
+                print(f"Unchanged: {source['name']}")
+                stats.add("hits")
+                return _doc(source, None, content_hash, unchanged=True)
+            print(f"Fetched: {source['name']}")
+            stats.add("misses")
+            return _doc(
+                source,
+                raw_text,
+                content_hash,
+                unchanged=False,
+                indicators=indicators,
+                blob=content_hash if blobs is not None else None,
+                cache_entry=entry,
+            )
+
+        retryable = error is not None or resp.status_code in RETRY_STATUSES
+        if not retryable or attempt >= retries:
+            if error is not None:
+                print(f"Error fetching {source['name']}: {error}")
             else:
-                print(f"Failed {s['name']}: HTTP {resp.status_code}")
-        except Exception as e:
-            print(f"Error fetching {s['name']}: {e}")
+                print(f"Failed {source['name']}: HTTP {resp.status_code}")
+            stats.add("failed")
+            return None
+
+        delay = backoff * (2 ** attempt)
+        if delay >= deadline.remaining():
+            print(f"Gave up on {source['name']}: deadline reached")
+            stats.add("failed")
+            return None
+        time.sleep(delay)
+        attempt += 1
+
+
+def iter_fetch(
+    sources: List[dict] = SOURCES,
+    max_workers: int = 8,
+    per_host: int = 2,
+    timeout: float = 20.0,
+    retries: int = 3,
+    backoff: float = 0.5,
+    deadline: float = 120.0,
+    cache: Optional[SourceCache] = None,
+    use_cache: bool = True,
+    stats: Optional[FetchStats] = None,
+    parser: Optional[Callable] = None,
+    max_pending: Optional[int] = None,
+    blobs: Optional["BlobStore"] = None,
+) -> Iterator[dict]:
+    """Fetch sources concurrently and yield docs as they complete.
+
+    - max_workers: total concurrent requests
+    - per_host:    concurrent requests against any single host
+    - retries:     extra attempts on connection errors, 429 and 5xx,
+                   waiting backoff * 2**attempt between them
+    - deadline:    wall-clock budget for the whole run; sources still
+                   pending when it expires are reported and skipped
+    - cache:       revalidate against the on-disk SourceCache (default
+                   CACHE_DIR); docs whose content is unchanged come back
+                   with unchanged=True and raw_text=None. New content is
+                   only recorded when the caller commits doc["cache_entry"]
+                   after storing the doc
+    - stats:       optional FetchStats to collect hit/miss counts
+    - parser:      factory for a stream parser (``feed(text)``, ``done``,
+                   ``result()``), e.g. parse_policies.indicator_stream; the
+                   whole body is parsed while streaming and the result lands
+                   in doc["indicators"]
+    - max_pending: fetched-or-in-flight docs allowed ahead of the consumer
+                   (default 2 * max_workers); new sources are only submitted
+                   as results are taken, so a slow consumer applies
+                   backpressure instead of docs piling up in memory
+    - blobs:       BlobStore that receives every new body in full, keyed by
+                   its content hash (doc["blob"])
+    """
+    if not sources:
+        return
+    if use_cache and cache is None:
+        cache = SourceCache()
+    elif not use_cache:
+        cache = None
+    stats = stats if stats is not None else FetchStats()
+    window = max_pending if max_pending is not None else 2 * max_workers
+    hosts = {urlsplit(s["url"]).netloc for s in sources}
+    host_slots: Dict[str, threading.Semaphore] = {
+        h: threading.BoundedSemaphore(per_host) for h in hosts
+    }
+    budget = _Deadline(deadline)
+    session = _session(max(max_workers, per_host))
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    queued = iter(sources)
+    pending: Dict[object, dict] = {}
+
+    def top_up():
+        while len(pending) < max(1, window):
+            s = next(queued, None)
+            if s is None:
+                return
+            fut = pool.submit(
+                _fetch_one,
+                session,
+                s,
+                host_slots[urlsplit(s["url"]).netloc],
+                budget,
+                timeout,
+                retries,
+                backoff,
+                cache,
+                stats,
+                parser,
+                blobs,
+            )
+            pending[fut] = s
+
+    try:
+        top_up()
+        while pending:
+            done, _ = wait(pending, timeout=budget.remaining(), return_when=FIRST_COMPLETED)
+            if not done:
+                for s in list(pending.values()) + list(queued):
+                    print(f"Gave up on {s['name']}: deadline reached")
+                    stats.add("failed")
+                break
+            for fut in done:
+                pending.pop(fut)
+                top_up()
+                doc = fut.result()
+                if doc is not None:
+                    yield doc
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        session.close()
+        print(stats.summary())
+
+
+def fetch_raw_policies(**kwargs) -> List[dict]:
+    """Fetch every source; thin list wrapper around iter_fetch().
+
+    Nothing is stored, so the source cache is left as it was.
+    """
+    docs = list(iter_fetch(**kwargs))
+    for d in docs:
+        if d["cache_entry"] is not None:
+            d["cache_entry"].abort()
     return docs
 
 if __name__ == "__main__":
@@ -1,9 +1,27 @@
 # ingest/load_db.py
 
+import argparse
+import hashlib
 import os
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
 import psycopg2
-from fetch_sources import fetch_raw_policies
-from parse_policies import extract_indicators
+from psycopg2.extras import execute_values
+from blob_store import BlobStore
+from fetch_sources import SOURCES, iter_fetch
+from parse_policies import extract_indicators, indicator_stream
+
+# Keep in sync with core.scoring (DATA_CHANGED_CHANNEL, notify_data_changed)
+DATA_CHANGED_CHANNEL = "sovai_data_changed"
+
+def notify_data_changed(cur):
+    """Bump data_version (the API's ETags) and notify API workers, on commit."""
+    cur.execute("""
+        UPDATE data_version SET version = version + 1, updated_at = now() AT TIME ZONE 'utc';
+        SELECT pg_notify(%s, %s);
+    """, (DATA_CHANGED_CHANNEL, "ingest"))
 
 def get_conn():
     return psycopg2.connect(
@@ -14,46 +32,232 @@ def get_conn():
         port=os.getenv("DB_PORT", "5432"),
     )
 
-def upsert_country(cur, iso_code, name):
-    cur.execute("""
+def _content_hash(doc) -> str:
+    if doc.get("content_hash"):
+        return doc["content_hash"]
+    return hashlib.sha256((doc["raw_text"] or "").encode("utf-8")).hexdigest()
+
+def upsert_countries(cur, docs) -> Tuple[Dict[str, int], int]:
+    """Insert new countries, rename changed ones, leave the rest untouched.
+
+    Returns the ids by ISO code and the number of countries added or renamed.
+    """
+    names = {d["iso_code"]: d["country"] for d in docs}
+    changed = execute_values(cur, """
         INSERT INTO countries (iso_code, name)
-        VALUES (%s, %s)
+        VALUES %s
         ON CONFLICT (iso_code) DO UPDATE SET name = EXCLUDED.name
+        WHERE countries.name IS DISTINCT FROM EXCLUDED.name
         RETURNING id;
-    """, (iso_code, name))
-    return cur.fetchone()[0]
+    """, sorted(names.items()), fetch=True)
+    cur.execute("SELECT iso_code, id FROM countries WHERE iso_code = ANY(%s);", (list(names),))
+    return dict(cur.fetchall()), len(changed)
 
-def insert_policy(cur, country_id, doc):
-    cur.execute("""
-        INSERT INTO policies (country_id, name, source_url, category, status, raw_text)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        RETURNING id;
-    """, (country_id, doc["name"], doc["url"], doc["category"], "in_force", doc["raw_text"]))
-    return cur.fetchone()[0]
+def insert_policies(cur, country_ids: Dict[str, int], docs) -> List[Tuple[int, dict]]:
+    """Insert policy versions not stored yet; returns (policy_id, doc) for new ones.
+
+    A version is keyed by (country, source_url, content_hash), so re-loading
+    the same document writes nothing. When a source's content changes, the
+    older versions of that source (and their indicators) are retired.
+    """
+    # A source seen twice in one batch keeps only its last version; two new
+    # versions would otherwise each retire the other below
+    latest = {}
+    for d in docs:
+        latest[(d["iso_code"], d["url"])] = d
+    docs = list(latest.values())
+    # Documents in the blob store are referenced, not copied inline
+    rows = [
+        (country_ids[d["iso_code"]], d["name"], d["url"], d["category"], "in_force",
+         None if d.get("blob") else d["raw_text"], d.get("blob"), _content_hash(d))
+        for d in docs
+    ]
+    inserted = execute_values(cur, """
+        INSERT INTO policies
+            (country_id, name, source_url, category, status, raw_text, raw_blob, content_hash)
+        VALUES %s
+        ON CONFLICT (country_id, source_url, content_hash) DO NOTHING
+        RETURNING id, country_id, source_url, content_hash;
+    """, rows, fetch=True)
+    if not inserted:
+        return []
+
+    by_key = {(r[0], r[2], r[7]): d for r, d in zip(rows, docs)}
+    current = [(pid, cid, url) for (pid, cid, url, _h) in inserted]
+    for table_sql in (
+        """
+        DELETE FROM policy_indicators pi
+        USING policies p, (VALUES %s) AS v(id, country_id, source_url)
+        WHERE pi.policy_id = p.id
+          AND p.country_id = v.country_id AND p.source_url = v.source_url AND p.id <> v.id;
+        """,
+        """
+        DELETE FROM policies p
+        USING (VALUES %s) AS v(id, country_id, source_url)
+        WHERE p.country_id = v.country_id AND p.source_url = v.source_url AND p.id <> v.id;
+        """,
+    ):
+        execute_values(cur, table_sql, current)
+    return [(pid, by_key[(cid, url, h)]) for (pid, cid, url, h) in inserted]
 
-def insert_indicators(cur, policy_id, indicators: dict):
-    for k, v in indicators.items():
-        cur.execute("""
+def insert_indicators(cur, policies: List[Tuple[int, dict]]):
+    """One multi-row insert for the indicators of every new policy."""
+    rows = [
+        (policy_id, k, str(v).lower())
+        for policy_id, doc in policies
+        for k, v in doc["indicators"].items()
+    ]
+    if rows:
+        execute_values(cur, """
             INSERT INTO policy_indicators (policy_id, key, value)
-            VALUES (%s, %s, %s);
-        """, (policy_id, k, str(v).lower()))
+            VALUES %s
+            ON CONFLICT (policy_id, key) DO NOTHING;
+        """, rows, page_size=1000)
+
+def load_batch(cur, docs) -> Tuple[int, int]:
+    """Bulk-load a batch of changed docs.
+
+    Returns the number of new policies and of countries added or renamed.
+    """
+    if not docs:
+        return 0, 0
+    country_ids, countries = upsert_countries(cur, docs)
+    new_policies = insert_policies(cur, country_ids, docs)
+    insert_indicators(cur, new_policies)
+    return len(new_policies), countries
+
+def _pump(items: Iterable, maxsize: int) -> Iterator:
+    """Drain ``items`` on a background thread through a bounded queue.
+
+    Lets the fetch stage keep downloading while the loader writes, without
+    letting it run more than ``maxsize`` docs ahead. Closing the generator
+    (e.g. when the loader fails) stops the producer and closes ``items``.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+    done = object()
+    errors = []
+    stop = threading.Event()
 
-def main():
-    docs = fetch_raw_policies()
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in items:
+                if not put(item):
+                    break
+        except BaseException as e:  # surfaced to the consumer below
+            errors.append(e)
+        finally:
+            if stop.is_set() and hasattr(items, "close"):
+                items.close()  # e.g. iter_fetch shuts its pool down
+            put(done)
+
+    producer = threading.Thread(target=run, name="ingest-fetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+    producer.join()
+    if errors:
+        raise errors[0]
+
+def _parsed(docs: Iterable[dict]) -> Iterator[dict]:
+    """Parse stage: fill indicators when the fetch stage did not stream-parse."""
+    for d in docs:
+        # Sources whose cached copy is still current need no parse or load
+        if not d["unchanged"] and d["indicators"] is None:
+            d["indicators"] = extract_indicators(d["raw_text"])
+        yield d
+
+def main(
+    refresh: bool = False,
+    batch_size: int = 20,
+    buffer: int = 8,
+    sources=None,
+    blobs: Optional[BlobStore] = None,
+):
+    """Stream sources through fetch -> parse -> load, committing per batch.
+
+    Each doc reaches the database as soon as it has downloaded; at most
+    ``buffer`` docs wait between the fetch and load stages.
+    """
+    # Indicators are parsed from the full body while it streams in
+    fetched = iter_fetch(
+        sources if sources is not None else SOURCES,
+        use_cache=not refresh,
+        parser=indicator_stream,
+        blobs=blobs if blobs is not None else BlobStore(),
+    )
+    docs = _pump(fetched, buffer)
     conn = get_conn()
     cur = conn.cursor()
 
-    for d in docs:
-        country_id = upsert_country(cur, d["iso_code"], d["country"])
-        policy_id = insert_policy(cur, country_id, d)
-        inds = extract_indicators(d["raw_text"])
-        insert_indicators(cur, policy_id, inds)
+    loaded = skipped = unchanged_in_db = 0
+    batch: List[dict] = []
 
-    conn.commit()
-    cur.close()
-    conn.close()
-    print(f"Loaded {len(docs)} policies into DB.")
+    def flush():
+        nonlocal loaded, unchanged_in_db
+        written, countries = load_batch(cur, batch)
+        # A rename alone changes what the API serves too
+        if written or countries:
+            notify_data_changed(cur)
+        conn.commit()
+        # Only now may the source cache call these docs unchanged on the next run
+        for d in batch:
+            if d["cache_entry"] is not None:
+                d["cache_entry"].commit()
+        loaded += written
+        unchanged_in_db += len(batch) - written
+        batch.clear()
 
-if __name__ == "__main__":
-    main()
+    try:
+        for d in _parsed(docs):
+            if d["unchanged"]:
+                skipped += 1
+                continue
+            batch.append(d)
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+    finally:
+        # On failure: stop fetching, drop the open transaction and the unsaved
+        # cache entries (those sources are fetched and loaded again next run)
+        docs.close()
+        for d in batch:
+            if d["cache_entry"] is not None:
+                d["cache_entry"].abort()
+        conn.rollback()
+        cur.close()
+        conn.close()
+    print(
+        f"Loaded {loaded} policies into DB ({skipped} unchanged at source, "
+        f"{unchanged_in_db} already stored, skipped)."
+    )
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch, parse and load policy sources.")
+    parser.add_argument(
+        "--refresh", action="store_true", help="ignore the local source cache and reload everything"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=20, help="policies per commit (default 20)"
+    )
+    parser.add_argument(
+        "--buffer", type=int, default=8, help="docs buffered between fetch and load (default 8)"
+    )
+    args = parser.parse_args()
+    main(refresh=args.refresh, batch_size=args.batch_size, buffer=args.buffer)
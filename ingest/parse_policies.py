@@ -1,32 +1,118 @@
 # ingest/parse_policies.py
 
-import re
+from typing import Dict, Iterable, Optional, Sequence
 
+# Keyword registry: each normalized indicator fires when any phrase appears
+# (case-insensitive) anywhere in the document.
+INDICATOR_KEYWORDS: Dict[str, Sequence[str]] = {
+    "mentions_data_localization": ("data localization", "data localisation", "data residency"),
+    "mentions_ai_systems": ("ai system", "high-risk ai", "ai registry"),
+    "mentions_cross_border": ("cross-border data transfer", "third country", "cross border"),
+}
 
-def extract_indicators(raw_text: str) -> dict:
-    """Extract simple, explainable indicators from raw policy text.
+# Legacy key -> normalized indicator it mirrors
+LEGACY_KEYS = {
+    "data_residency_required": "mentions_data_localization",
+    "ai_registry_required": "mentions_ai_systems",
+    "cross_border_restrictions": "mentions_cross_border",
+}
 
-    We emit both normalized keys used by scoring and legacy keys to keep
-    backward compatibility with existing data.
+# Slice size used when scanning an in-memory string
+SCAN_CHUNK_CHARS = 64 * 1024
+
+
+class KeywordMatcher:
+    """Compiled matcher for a keyword registry, scanned chunk by chunk.
+
+    Each chunk is lowercased once and checked with ``in`` for the phrases of
+    the indicators not found yet. CPython's substring search skips ahead in
+    C, so these few scans of a cache-sized chunk beat a regex alternation,
+    which steps through the text one position at a time. Found indicators
+    drop out, and scanning stops as soon as every indicator has been seen.
     """
-    text = raw_text.lower()
-    mentions_data_localization = (
-        "data localization" in text or "data localisation" in text or "data residency" in text
-    )
-    mentions_ai_systems = (
-        "ai system" in text or "high-risk ai" in text or "ai registry" in text
-    )
-    mentions_cross_border = (
-        "cross-border data transfer" in text or "third country" in text or "cross border" in text
-    )
 
+    def __init__(self, registry: Dict[str, Sequence[str]] = INDICATOR_KEYWORDS):
+        self.registry = {k: tuple(p.lower() for p in phrases) for k, phrases in registry.items()}
+        # Characters carried between chunks so straddling phrases still match
+        self.overlap = max(len(p) for phrases in self.registry.values() for p in phrases) - 1
+
+    def stream(self) -> "MatchStream":
+        return MatchStream(self)
+
+
+class MatchStream:
+    """Incremental scan state; feed text chunk by chunk in document order."""
+
+    def __init__(self, matcher: KeywordMatcher):
+        self._matcher = matcher
+        self._tail = ""
+        self.pending = set(matcher.registry)
+        self.found = set()
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def feed(self, chunk: str) -> bool:
+        """Scan the next chunk; returns True once every indicator is found."""
+        if self.done:
+            return True
+        text = self._tail + chunk.lower()
+        registry = self._matcher.registry
+        for key in tuple(self.pending):
+            if any(phrase in text for phrase in registry[key]):
+                self.found.add(key)
+                self.pending.discard(key)
+        if self.done:
+            return True
+        overlap = self._matcher.overlap
+        self._tail = text[-overlap:] if overlap > 0 else ""
+        return False
+
+    def result(self) -> dict:
+        return _indicator_dict(self.found)
+
+
+_DEFAULT_MATCHER: Optional[KeywordMatcher] = None
+
+
+def _default_matcher() -> KeywordMatcher:
+    global _DEFAULT_MATCHER
+    if _DEFAULT_MATCHER is None:
+        _DEFAULT_MATCHER = KeywordMatcher()
+    return _DEFAULT_MATCHER
+
+
+def _indicator_dict(found) -> dict:
+    flags = {key: key in found for key in INDICATOR_KEYWORDS}
     return {
         # Normalized flags
-        "mentions_data_localization": mentions_data_localization,
-        "mentions_ai_systems": mentions_ai_systems,
-        "mentions_cross_border": mentions_cross_border,
+        **flags,
         # Legacy equivalents preserved for safety
-        "data_residency_required": mentions_data_localization,
-        "ai_registry_required": mentions_ai_systems,
-        "cross_border_restrictions": mentions_cross_border,
+        **{legacy: flags[key] for legacy, key in LEGACY_KEYS.items()},
     }
+
+
+def indicator_stream() -> MatchStream:
+    """Start an incremental scan (feed chunks, then call ``result()``)."""
+    return _default_matcher().stream()
+
+
+def extract_indicators_stream(chunks: Iterable[str]) -> dict:
+    """extract_indicators() over text delivered in chunks, in bounded memory."""
+    scan = indicator_stream()
+    for chunk in chunks:
+        if scan.feed(chunk):
+            break
+    return scan.result()
+
+
+def extract_indicators(raw_text: str) -> dict:
+    """Extract simple, explainable indicators from raw policy text.
+
+    We emit both normalized keys used by scoring and legacy keys to keep
+    backward compatibility with existing data.
+    """
+    return extract_indicators_stream(
+        raw_text[i : i + SCAN_CHUNK_CHARS] for i in range(0, len(raw_text), SCAN_CHUNK_CHARS)
+    )
@@ -0,0 +1,90 @@
+# ingest/reparse.py
+
+import argparse
+
+from psycopg2.extras import execute_values
+from blob_store import BlobStore
+from load_db import get_conn, notify_data_changed
+from parse_policies import extract_indicators_stream
+
+def migrate_inline_text(conn, store: BlobStore, batch_size: int = 100) -> int:
+    """Move legacy policies.raw_text into the blob store, batch by batch.
+
+    Each batch commits on its own and migrated rows drop out of the query,
+    so an interrupted run can simply be started again.
+    """
+    moved = 0
+    cur = conn.cursor()
+    while True:
+        cur.execute(
+            """
+            SELECT id, raw_text FROM policies
+            WHERE raw_text IS NOT NULL AND raw_blob IS NULL
+            ORDER BY id LIMIT %s;
+            """,
+            (batch_size,),
+        )
+        rows = cur.fetchall()
+        if not rows:
+            break
+        refs = [(pid, store.put(text.encode("utf-8"))) for pid, text in rows]
+        execute_values(cur, """
+            UPDATE policies p SET raw_blob = v.blob, raw_text = NULL
+            FROM (VALUES %s) AS v(id, blob)
+            WHERE p.id = v.id;
+        """, refs)
+        conn.commit()
+        moved += len(refs)
+    cur.close()
+    return moved
+
+def reparse(conn, store: BlobStore) -> int:
+    """Re-extract indicators for every policy from its stored document.
+
+    Documents are streamed out of the blob store chunk by chunk; only the
+    ids and blob keys come from Postgres. Returns the number of indicator
+    rows that changed.
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT id, raw_blob FROM policies WHERE raw_blob IS NOT NULL ORDER BY id;")
+    refs = cur.fetchall()
+    rows = []
+    for pid, blob in refs:
+        if not store.exists(blob):
+            print(f"Missing blob for policy {pid}: {blob}")
+            continue
+        indicators = extract_indicators_stream(store.iter_text(blob))
+        rows.extend((pid, k, str(v).lower()) for k, v in indicators.items())
+    changed = 0
+    if rows:
+        changed = len(execute_values(cur, """
+            INSERT INTO policy_indicators (policy_id, key, value)
+            VALUES %s
+            ON CONFLICT (policy_id, key) DO UPDATE SET value = EXCLUDED.value
+            WHERE policy_indicators.value IS DISTINCT FROM EXCLUDED.value
+            RETURNING id;
+        """, rows, page_size=1000, fetch=True))
+    if changed:
+        notify_data_changed(cur)
+    conn.commit()
+    cur.close()
+    return changed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-parse stored policy documents.")
+    parser.add_argument(
+        "--migrate", action="store_true",
+        help="first move inline policies.raw_text into the blob store",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="rows per migration commit (default 100)"
+    )
+    args = parser.parse_args()
+    store = BlobStore()
+    conn = get_conn()
+    try:
+        if args.migrate:
+            print(f"Moved {migrate_inline_text(conn, store, args.batch_size)} documents to {store.root}")
+        print(f"Re-parsed policies: {reparse(conn, store)} indicator values changed.")
+    finally:
+        conn.close()
@@ -0,0 +1,244 @@
+"""Drive the read endpoints at fixed request rates and check latency SLOs.
+
+Each scenario sends requests on an open-loop schedule: request ``i`` is due
+at ``start + i / rate`` whether or not earlier ones have finished, and its
+latency is measured from that due time. A server that falls behind
+therefore shows its queueing delay in the percentiles instead of quietly
+lowering the offered load (coordinated omission).
+
+Scenarios (target p95, see docs/performance.md):
+  - countries   GET /countries                    150 ms
+  - country     GET /country/{iso}                200 ms
+  - compare     GET /compare?iso=A&iso=B&iso=C    200 ms (3-5 codes)
+
+ISO codes are read from /countries at startup, so the harness works
+against the demo seed as well as a synthetic dataset from load/seed.py.
+The report is JSON on stdout (or ``--out``); the exit status is 1 when a
+scenario misses its SLO or has errors.
+
+  python load/run.py --duration 60 --rate countries=20,country=100,compare=20
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+SLO_P95_MS = {"countries": 150.0, "country": 200.0, "compare": 200.0}
+DEFAULT_RATES = {"countries": 10.0, "country": 50.0, "compare": 10.0}
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list (None when empty)."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name: str, target_rps: float, latencies: List[float], errors: int, elapsed: float):
+    """Report for one scenario; latencies are seconds for successful requests."""
+    values = sorted(latencies)
+    requests = len(values) + errors
+
+    def ms(v):
+        return round(v * 1000, 2) if v is not None else None
+
+    p95 = percentile(values, 95)
+    slo = SLO_P95_MS.get(name)
+    return {
+        "target_rps": target_rps,
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(p95),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1] if values else None),
+        "slo_p95_ms": slo,
+        "slo_met": bool(values) and errors == 0 and (slo is None or p95 * 1000 <= slo),
+    }
+
+
+def parse_rates(text: str) -> Dict[str, float]:
+    rates = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in SLO_P95_MS:
+            raise argparse.ArgumentTypeError(f"unknown scenario '{name}'")
+        try:
+            rates[name] = float(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"bad rate for '{name}': {value!r}") from None
+    return rates
+
+
+class Scenario:
+    def __init__(self, name: str, rate: float, make_path):
+        self.name = name
+        self.rate = rate
+        self.make_path = make_path
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.error_samples: List[str] = []
+
+    def record_error(self, detail: str):
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(detail)
+
+
+async def _send(client, limiter, scenario: Scenario, path: str, due: float, record: bool):
+    async with limiter:
+        try:
+            resp = await client.get(path)
+            ok = resp.status_code < 400
+            detail = f"{resp.status_code} {path}"
+        except httpx.HTTPError as e:
+            ok = False
+            detail = f"{type(e).__name__} {path}"
+    latency = time.perf_counter() - due
+    if not record:
+        return
+    if ok:
+        scenario.latencies.append(latency)
+    else:
+        scenario.record_error(detail)
+
+
+async def _drive(client, limiter, scenario: Scenario, start: float, warmup: float, duration: float):
+    tasks = []
+    interval = 1.0 / scenario.rate
+    i = 0
+    while True:
+        due = start + i * interval
+        offset = due - start
+        if offset >= warmup + duration:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        path = scenario.make_path()
+        tasks.append(
+            asyncio.create_task(_send(client, limiter, scenario, path, due, offset >= warmup))
+        )
+        i += 1
+    await asyncio.gather(*tasks)
+
+
+def compare_path(rng: random.Random, codes: List[str]) -> str:
+    """A /compare URL for 3-5 random codes; ``iso`` is a list, so it is repeated per code."""
+    sample = rng.sample(codes, min(len(codes), rng.randint(3, 5)))
+    return "/compare?" + "&".join(f"iso={code}" for code in sample)
+
+
+async def run(
+    base_url: str,
+    rates: Dict[str, float],
+    duration: float,
+    warmup: float,
+    concurrency: int,
+    seed: int,
+    timeout: float,
+):
+    rng = random.Random(seed)
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        resp = await client.get("/countries")
+        resp.raise_for_status()
+        codes = [c["iso_code"] for c in resp.json()]
+        if not codes:
+            raise SystemExit("No countries returned by /countries; seed the database first")
+
+        paths = {
+            "countries": lambda: "/countries",
+            "country": lambda: f"/country/{rng.choice(codes)}",
+            "compare": lambda: compare_path(rng, codes),
+        }
+        scenarios = [
+            Scenario(name, rate, paths[name]) for name, rate in rates.items() if rate > 0
+        ]
+        # Bounded in-flight requests; a request waiting here still counts from its due time
+        limiter = asyncio.Semaphore(concurrency)
+        start = time.perf_counter() + 0.1
+        await asyncio.gather(
+            *(_drive(client, limiter, s, start, warmup, duration) for s in scenarios)
+        )
+        elapsed = time.perf_counter() - start - warmup
+
+    report = {
+        "base_url": base_url,
+        "started_at": started_at,
+        "duration_s": duration,
+        "warmup_s": warmup,
+        "concurrency": concurrency,
+        "seed": seed,
+        "countries_available": len(codes),
+        "scenarios": {},
+    }
+    for s in scenarios:
+        summary = summarize(s.name, s.rate, s.latencies, s.errors, elapsed)
+        if s.error_samples:
+            summary["error_samples"] = s.error_samples
+        report["scenarios"][s.name] = summary
+    report["slo_met"] = all(s["slo_met"] for s in report["scenarios"].values())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the SovAI read API against its SLOs.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="API base URL")
+    parser.add_argument(
+        "--rate",
+        type=parse_rates,
+        default={},
+        help="requests/s per scenario, e.g. countries=20,country=100,compare=20 "
+        "(unlisted scenarios keep their defaults; 0 disables one)",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="measured seconds (default 30)"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=5.0, help="seconds sent but not measured first (default 5)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=64, help="max requests in flight (default 64)"
+    )
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout seconds")
+    parser.add_argument("--seed", type=int, default=1, help="seed for ISO code selection")
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    rates = {**DEFAULT_RATES, **args.rate}
+    report = asyncio.run(
+        run(
+            args.base_url,
+            rates,
+            args.duration,
+            args.warmup,
+            args.concurrency,
+            args.seed,
+            args.timeout,
+        )
+    )
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0 if report["slo_met"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
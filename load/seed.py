@@ -0,0 +1,225 @@
+"""Seed a local Postgres with a synthetic dataset for load tests.
+
+Applies db/schema.sql the same way scripts/smoke_test.py does, then
+generates countries, policies, indicators, infra signals and score
+histories with INSERT ... SELECT over generate_series, so even millions of
+rows are produced server-side in a few statements. Values derive from
+hashtext() of stable keys, so the same arguments give the same dataset.
+
+Synthetic countries use ISO-like codes that start with a digit ("0AB"),
+which never collide with real ISO codes; ``--reset`` removes only those.
+
+  python load/seed.py --countries 2000 --policies 10 --history 365 --reset
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core.scoring import notify_data_changed  # noqa: E402
+from scripts.smoke_test import apply_schema, get_conn  # noqa: E402
+
+REGIONS = ("Europe", "Asia", "Africa", "Americas", "Oceania", "Middle East")
+CATEGORIES = ("ai_act", "data_protection", "localization", "ai_policy")
+INDICATOR_KEYS = (
+    "mentions_data_localization",
+    "mentions_ai_systems",
+    "mentions_cross_border",
+    "data_residency_required",
+    "ai_registry_required",
+    "cross_border_restrictions",
+)
+
+_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+MAX_COUNTRIES = 10 * 36 * 36
+
+SYNTHETIC = "c.iso_code ~ '^[0-9]'"
+
+
+def synthetic_codes(n: int):
+    """'000', '001', ... '9ZZ': a leading digit marks synthetic rows."""
+    if n > MAX_COUNTRIES:
+        raise ValueError(f"at most {MAX_COUNTRIES} synthetic countries")
+    for i in range(n):
+        yield _ALPHABET[i // 1296] + _ALPHABET[(i // 36) % 36] + _ALPHABET[i % 36]
+
+
+def reset(cur):
+    for sql in (
+        f"""DELETE FROM policy_indicators pi USING policies p, countries c
+            WHERE pi.policy_id = p.id AND p.country_id = c.id AND {SYNTHETIC}""",
+        f"DELETE FROM policies p USING countries c WHERE p.country_id = c.id AND {SYNTHETIC}",
+        f"DELETE FROM infra_signals s USING countries c WHERE s.country_id = c.id AND {SYNTHETIC}",
+        f"""DELETE FROM readiness_scores s USING countries c
+            WHERE s.country_id = c.id AND {SYNTHETIC}""",
+        f"DELETE FROM latest_scores s USING countries c WHERE s.country_id = c.id AND {SYNTHETIC}",
+        f"DELETE FROM rankings r USING countries c WHERE r.country_id = c.id AND {SYNTHETIC}",
+        f"""DELETE FROM scoring_results s USING countries c
+            WHERE s.country_id = c.id AND {SYNTHETIC}""",
+        f"DELETE FROM countries c WHERE {SYNTHETIC}",
+    ):
+        cur.execute(sql)
+
+
+def seed(cur, countries: int, policies: int, history: int, step_hours: float, until: datetime):
+    codes = list(synthetic_codes(countries))
+    cur.execute(
+        """
+        INSERT INTO countries (iso_code, name, region)
+        SELECT code, 'Synthland ' || code,
+               (%(regions)s::text[])[1 + (abs(hashtext(code)) %% cardinality(%(regions)s::text[]))]
+        FROM unnest(%(codes)s::text[]) AS code
+        ON CONFLICT (iso_code) DO NOTHING;
+        """,
+        {"codes": codes, "regions": list(REGIONS)},
+    )
+
+    cur.execute(
+        f"""
+        INSERT INTO policies (country_id, name, source_url, category, status, content_hash)
+        SELECT c.id,
+               'Synthetic policy ' || c.iso_code || '-' || g,
+               'https://synthetic.example/' || c.iso_code || '/' || g,
+               (%(categories)s::text[])[1 + (abs(hashtext(c.iso_code || g)) %% 4)],
+               'in_force',
+               md5(c.iso_code || '/' || g)
+        FROM countries c, generate_series(1, %(policies)s) g
+        WHERE {SYNTHETIC}
+        ON CONFLICT (country_id, source_url, content_hash) DO NOTHING;
+        """,
+        {"categories": list(CATEGORIES), "policies": policies},
+    )
+
+    cur.execute(
+        f"""
+        INSERT INTO policy_indicators (policy_id, key, value)
+        SELECT p.id, k,
+               CASE WHEN abs(hashtext(p.source_url || k)) %% 2 = 0 THEN 'true' ELSE 'false' END
+        FROM policies p
+        JOIN countries c ON c.id = p.country_id
+        CROSS JOIN unnest(%(keys)s::text[]) AS k
+        WHERE {SYNTHETIC}
+        ON CONFLICT (policy_id, key) DO NOTHING;
+        """,
+        {"keys": list(INDICATOR_KEYS)},
+    )
+
+    cur.execute(
+        f"""
+        INSERT INTO infra_signals (country_id, metric, value)
+        SELECT c.id, m, 30 + abs(hashtext(c.iso_code || m)) % 60
+        FROM countries c
+        CROSS JOIN unnest(ARRAY['gpu_capacity_index', 'power_cost_index']) AS m
+        WHERE {SYNTHETIC}
+          AND NOT EXISTS (SELECT 1 FROM infra_signals s WHERE s.country_id = c.id);
+        """
+    )
+
+    # Scores drift a little per snapshot around a per-country baseline
+    cur.execute(
+        f"""
+        INSERT INTO readiness_scores (
+            country_id, score, policy_score, infra_score, language_score, risk_score, computed_at
+        )
+        SELECT c.id,
+               0.4 * ps + 0.3 * isc + 0.2 * ls - 0.1 * (100 - (0.4 * ps + 0.3 * isc + 0.2 * ls)),
+               ps, isc, ls,
+               100 - (0.4 * ps + 0.3 * isc + 0.2 * ls),
+               %(until)s - make_interval(secs => g * %(step)s)
+        FROM countries c
+        CROSS JOIN generate_series(0, %(history)s - 1) g
+        CROSS JOIN LATERAL (
+            SELECT (37 + abs(hashtext(c.iso_code)) %% 50
+                    + abs(hashtext(c.iso_code || g)) %% 7)::numeric AS ps,
+                   (30 + abs(hashtext(c.iso_code || 'i')) %% 60)::numeric AS isc,
+                   (50 + abs(hashtext(c.iso_code || 'l')) %% 30)::numeric AS ls
+        ) v
+        WHERE {SYNTHETIC}
+          AND NOT EXISTS (SELECT 1 FROM readiness_scores s WHERE s.country_id = c.id);
+        """,
+        {"until": until, "step": step_hours * 3600, "history": history},
+    )
+
+    cur.execute(
+        f"""
+        INSERT INTO latest_scores (
+            country_id, score, policy_score, infra_score, language_score, risk_score, computed_at
+        )
+        SELECT DISTINCT ON (s.country_id)
+               s.country_id, s.score, s.policy_score, s.infra_score, s.language_score,
+               s.risk_score, s.computed_at
+        FROM readiness_scores s
+        JOIN countries c ON c.id = s.country_id
+        WHERE {SYNTHETIC}
+        ORDER BY s.country_id, s.computed_at DESC
+        ON CONFLICT (country_id) DO NOTHING;
+        """
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic SovAI dataset for load tests.")
+    parser.add_argument(
+        "--countries", type=int, default=1000, help="synthetic countries (default 1000)"
+    )
+    parser.add_argument(
+        "--policies", type=int, default=10, help="policies per country (default 10)"
+    )
+    parser.add_argument(
+        "--history", type=int, default=365, help="score snapshots per country (default 365)"
+    )
+    parser.add_argument(
+        "--step-hours", type=float, default=24.0, help="hours between snapshots (default 24)"
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        default=datetime(2026, 1, 1),
+        help="timestamp of the newest snapshot (default 2026-01-01, for reproducible runs)",
+    )
+    parser.add_argument(
+        "--reset", action="store_true", help="delete existing synthetic rows first"
+    )
+    args = parser.parse_args()
+
+    apply_schema()
+    conn = get_conn()
+    started = time.perf_counter()
+    try:
+        cur = conn.cursor()
+        if args.reset:
+            reset(cur)
+        seed(cur, args.countries, args.policies, args.history, args.step_hours, args.until)
+        # Running API workers drop cached responses and ETags for the new rows
+        notify_data_changed(cur)
+        conn.commit()
+        # Fresh statistics so the planner sees the new table sizes
+        conn.autocommit = True
+        cur.execute("ANALYZE;")
+        cur.execute(
+            f"""
+            SELECT (SELECT count(*) FROM countries c WHERE {SYNTHETIC}),
+                   (SELECT count(*) FROM policies p JOIN countries c ON c.id = p.country_id
+                    WHERE {SYNTHETIC}),
+                   (SELECT count(*) FROM readiness_scores s JOIN countries c ON c.id = s.country_id
+                    WHERE {SYNTHETIC});
+            """
+        )
+        n_countries, n_policies, n_scores = cur.fetchone()
+        cur.close()
+    finally:
+        conn.close()
+    print(
+        f"SEED_COMPLETE countries={n_countries} policies={n_policies} "
+        f"score_snapshots={n_scores} in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
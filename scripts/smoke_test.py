@@ -226,11 +226,13 @@ def run_api_smoke():
         except Exception as e:
             print(f"SERVER_FALLBACK_FAILED: {e}")
         # Fallback 2: call route handlers directly (no HTTP)
-        from api.main import list_countries as fn_list, get_country as fn_country, compare as fn_compare, methodology as fn_method
+        import asyncio
+        from api.main import _load_countries as fn_list, _load_country as fn_country, _load_compare as fn_compare, methodology_spec as fn_method
         _print("HEALTH", {"status":"ok"})
-        _print("COUNTRIES", [c.model_dump() for c in fn_list()])
-        _print("COUNTRY_EU", fn_country("EU").model_dump())
-        _print("COMPARE", [c.model_dump() for c in fn_compare(["EU","IN"])])
+        # /countries is cached as a pre-serialized payload (api/payloads.py)
+        _print("COUNTRIES", json.loads(asyncio.run(fn_list()).body))
+        _print("COUNTRY_EU", asyncio.run(fn_country("EU")).model_dump())
+        _print("COMPARE", [c.model_dump() for c in asyncio.run(fn_compare(("EU","IN")))])
         _print("METHODOLOGY", fn_method())
 
 
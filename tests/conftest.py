@@ -0,0 +1,150 @@
+"""Fixtures shared by the ingest and scoring tests."""
+
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import ClassVar
+
+import pytest
+
+SCHEMA = Path(__file__).resolve().parents[1] / "db" / "schema.sql"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    hits: ClassVar[dict[str, int]] = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            n = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/flaky" and n == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path == "/missing":
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == "/slow":
+            time.sleep(1.0)
+        if self.path == "/etag" and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = f"policy text for {self.path}".encode()
+        if self.path == "/big":
+            body = b"x" * 300_000 + b" third country "
+        try:
+            self.send_response(200)
+            if self.path == "/etag":
+                self.send_header("ETag", '"v1"')
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up (deadline test)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server():
+    _StubHandler.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _source(base, path):
+    return {
+        "country": "Testland",
+        "iso_code": "TL",
+        "name": path,
+        "url": base + path,
+        "category": "test",
+    }
+
+
+@pytest.fixture()
+def stub_hits(stub_server):
+    """Requests per path seen by ``stub_server``."""
+    return _StubHandler.hits
+
+
+@pytest.fixture()
+def source():
+    """Factory for a source entry (fetch_sources.SOURCES format) on the stub server."""
+    return _source
+
+
+@pytest.fixture()
+def pg_cursor():
+    """Cursor on a fresh db/schema.sql in a scratch schema; everything is rolled back.
+
+    Uses the DB_* settings and skips when no Postgres is reachable.
+    """
+    psycopg2 = pytest.importorskip("psycopg2")
+    try:
+        conn = psycopg2.connect(
+            dbname=os.getenv("DB_NAME", "sovai"),
+            user=os.getenv("DB_USER", "sovai"),
+            password=os.getenv("DB_PASSWORD", "sovai"),
+            host=os.getenv("DB_HOST", "localhost"),
+            port=os.getenv("DB_PORT", "5432"),
+            connect_timeout=3,
+        )
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    try:
+        cur = conn.cursor()
+        cur.execute(f"CREATE SCHEMA {schema}; SET LOCAL search_path TO {schema};")
+        cur.execute(SCHEMA.read_text(encoding="utf-8"))
+        yield cur
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+class _SavepointConn:
+    """Connection facade for code under test that commits, on the ``pg_cursor`` transaction.
+
+    commit / rollback / close map to savepoints, so each caller behaves as if it
+    had its own transaction while everything still rolls back after the test.
+    """
+
+    def __init__(self, cur):
+        self._conn = cur.connection
+        self._name = f"sp_{uuid.uuid4().hex[:12]}"
+        self._execute(f"SAVEPOINT {self._name};")
+
+    def _execute(self, sql):
+        with self._conn.cursor() as cur:
+            cur.execute(sql)
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def commit(self):
+        self._execute(f"RELEASE SAVEPOINT {self._name}; SAVEPOINT {self._name};")
+
+    def rollback(self):
+        self._execute(f"ROLLBACK TO SAVEPOINT {self._name};")
+
+    def close(self):
+        # Like closing a real connection: whatever was not committed is dropped
+        self._execute(f"ROLLBACK TO SAVEPOINT {self._name}; RELEASE SAVEPOINT {self._name};")
+
+
+@pytest.fixture()
+def pg_connect(pg_cursor):
+    """Stand-in for a get_conn() whose connections all share the ``pg_cursor`` transaction."""
+    return lambda: _SavepointConn(pg_cursor)
@@ -0,0 +1,92 @@
+import asyncio
+
+from api import cache as C
+
+
+def test_lru_evicts_least_recently_used():
+    lru = C.ResponseCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1  # refresh "a"
+    lru.put("c", 3)
+    assert lru.get("b") is C._MISS
+    assert lru.get("a") == 1 and lru.get("c") == 3
+
+
+def test_cached_bypasses_without_listener_and_drops_on_bump(monkeypatch):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return len(calls)
+
+    monkeypatch.setattr(C, "_cache", C.ResponseCache(maxsize=8))
+
+    # No listener connected -> never serve from cache
+    C._listening.clear()
+    assert asyncio.run(C.cached("countries", (), loader)) == 1
+    assert asyncio.run(C.cached("countries", (), loader)) == 2
+
+    C._listening.set()
+    try:
+        assert asyncio.run(C.cached("countries", (), loader)) == 3
+        assert asyncio.run(C.cached("countries", (), loader)) == 3
+        C.bump_version()
+        assert asyncio.run(C.cached("countries", (), loader)) == 4
+    finally:
+        C._listening.clear()
+
+
+def test_conditional_request_matching():
+    from datetime import datetime, timezone
+
+    from starlette.requests import Request
+
+    from api import http_cache as H
+
+    def req(**headers):
+        raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+    etag = '"abc"'
+    lm = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert H.is_not_modified(req(if_none_match='"x", W/"abc"'), etag, lm)
+    assert not H.is_not_modified(req(if_none_match='"x"'), etag, lm)
+    assert H.is_not_modified(req(if_modified_since="Thu, 02 Jan 2025 03:04:05 GMT"), etag, lm)
+    assert not H.is_not_modified(req(if_modified_since="Thu, 02 Jan 2025 03:04:04 GMT"), etag, lm)
+    # If-None-Match wins over If-Modified-Since
+    assert not H.is_not_modified(
+        req(if_none_match='"x"', if_modified_since="Thu, 02 Jan 2030 00:00:00 GMT"), etag, lm
+    )
+
+
+def test_validators_follow_the_data_version(monkeypatch):
+    from contextlib import asynccontextmanager
+    from datetime import datetime
+
+    from api import http_cache as H
+
+    state = [(7, datetime(2025, 1, 2, 3, 4, 5, 678))]
+
+    class Cursor:
+        async def execute(self, sql, params=None):
+            assert "data_version" in sql
+
+        async def fetchone(self):
+            return state[0]
+
+    @asynccontextmanager
+    async def cursor(query="other"):
+        yield Cursor()
+
+    monkeypatch.setattr(H.db, "cursor", cursor)
+    C._listening.clear()
+    etag, last_modified = asyncio.run(H.validators("country", "EU"))
+    assert last_modified.isoformat() == "2025-01-02T03:04:05+00:00"
+    assert asyncio.run(H.validators("country", "EU"))[0] == etag
+    assert asyncio.run(H.validators("country", "IN"))[0] != etag
+
+    # A rename or re-parsed indicator bumps the version without new scores
+    state[0] = (8, datetime(2025, 1, 2, 3, 9, 0))
+    renamed, later = asyncio.run(H.validators("country", "EU"))
+    assert renamed != etag and later > last_modified
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from api.main import _parse_cursor, app
+
+
+def test_history_cursor_round_trip():
+    ts, iso = _parse_cursor("2024-05-01T00:00:00,eu")
+    assert (ts.isoformat(), iso) == ("2024-05-01T00:00:00", "EU")
+    assert _parse_cursor(None) is None
+    with pytest.raises(HTTPException):
+        _parse_cursor("not-a-cursor")
+
+
+def test_history_validates_params_without_db():
+    client = TestClient(app)
+    assert client.get("/country/EU/history", params={"bucket": "year"}).status_code == 422
+    assert client.get("/country/EU/history", params={"limit": 0}).status_code == 422
+    r = client.get("/history")
+    assert r.status_code == 200 and r.json()["points"] == []
@@ -0,0 +1,81 @@
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+
+from api import payloads as P
+
+
+def test_negotiate_honours_q_values_and_server_preference():
+    assert P.negotiate(None) == P.negotiate("") == P.negotiate("identity") == "identity"
+    assert P.negotiate("gzip, deflate") == "gzip"
+    assert P.negotiate("GZIP;q=0.5, identity") == "gzip"
+    assert P.negotiate("gzip;q=0") == "identity"
+    assert P.negotiate("gzip;q=0, *") == ("br" if P.brotli is not None else "identity")
+    if P.brotli is not None:
+        assert P.negotiate("gzip, br") == "br"  # equal q: server prefers br
+        assert P.negotiate("br;q=0.5, gzip") == "gzip"
+
+
+def test_payload_variants_are_built_once():
+    rows = [{"iso_code": "EU", "name": "Europäische Union", "score": 61.9}]
+    payload = P.Payload.of(rows)
+    assert json.loads(payload.body) == rows
+    assert "ä".encode() in payload.body  # compact UTF-8, like FastAPI
+    compressed = payload.encoded("gzip")
+    assert gzip.decompress(compressed) == payload.body
+    assert payload.encoded("gzip") is compressed
+
+
+def test_countries_read_only_serves_compressed_variants(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    pytest.importorskip("pyarrow")
+    from fastapi.testclient import TestClient
+
+    from api import main
+    from core import snapshot
+
+    path = str(tmp_path / "scores.arrow")
+    t = datetime(2024, 1, 1)
+    snapshot.write_rows(
+        [
+            ("EU", "European Union", "Europe", t, 61.9, 80.0, 64.5, 70.0, 34.7),
+            ("ZZ", "Unscored", None, None, None, None, None, None, None),
+        ],
+        path,
+    )
+    monkeypatch.setattr(main, "READ_ONLY", True)
+    monkeypatch.setattr(main, "_snapshots", snapshot.SnapshotReader(path))
+    client = TestClient(main.app)
+
+    plain = client.get("/countries", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200 and "content-encoding" not in plain.headers
+    assert plain.json()[0] == {
+        "iso_code": "EU",
+        "name": "European Union",
+        "readiness_score": 61.9,
+        "policy_score": 80.0,
+        "infra_score": 64.5,
+        "language_score": 70.0,
+        "risk_score": 34.7,
+    }
+    assert plain.json()[1]["readiness_score"] is None
+
+    r = client.get("/countries", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert r.content == plain.content  # httpx decodes the body
+    assert r.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    r = client.get(
+        "/countries", headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["etag"]}
+    )
+    assert r.status_code == 304 and "Accept-Encoding" in r.headers["vary"]
+    r = client.get(
+        "/countries", headers={"Accept-Encoding": "identity", "If-None-Match": r.headers["etag"]}
+    )
+    assert r.status_code == 200
+
+    r = client.get("/methodology", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip" and "weights" in r.json()
@@ -0,0 +1,131 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+
+from api import cache
+from api import simulation as SIM
+from core import scoring as S
+
+ROWS = [
+    ("EU", "European Union", 80.0, 64.5, 70.0),
+    ("IN", "India", 70.0, 54.0, 70.0),
+    ("JP", "Japan", 65.0, 68.0, 55.0),
+    ("ZZ", "Unscored", None, None, None),
+]
+
+
+def test_default_weights_match_scoring_helpers():
+    m = SIM.ComponentMatrix.from_rows(ROWS)
+    assert m.iso_codes == ["EU", "IN", "JP"]  # unscored rows are skipped
+
+    result = m.simulate(S.WEIGHTS)
+    for i, (_iso, _name, policy, infra, language) in enumerate(ROWS[:3]):
+        risk = S._compute_risk_score(policy, infra, language)
+        readiness = 0.4 * policy + 0.3 * infra + 0.2 * language - 0.1 * risk
+        assert result["risk"][i] == risk
+        assert math.isclose(result["readiness"][i], readiness)
+        assert result["readiness"][i] == m.baseline[i]
+    assert result["rank"].tolist() == m.baseline_ranks.tolist() == [1, 2, 3]
+
+
+def test_weights_and_overrides_rerank():
+    m = SIM.ComponentMatrix.from_rows(ROWS)
+    infra_heavy = {"policy": 0.1, "infra": 0.7, "language": 0.2, "risk_penalty": 0.1}
+    result = m.simulate(infra_heavy, infra={"IN": 100.0})
+    assert result["infra"].tolist() == [64.5, 100.0, 68.0]
+    assert m.components[1, SIM.INFRA] == 54.0  # cached matrix untouched
+    rows = m.ranked(result, top=2)
+    assert [(r["iso_code"], r["rank"], r["baseline_rank"]) for r in rows] == [
+        ("IN", 1, 2),
+        ("EU", 2, 1),
+    ]
+    assert m.unknown({"IN", "XX", "ZZ"}) == ["XX", "ZZ"]
+
+
+def test_simulate_endpoint_read_only(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    pytest.importorskip("pyarrow")
+    from fastapi.testclient import TestClient
+
+    from api import main
+    from core import snapshot
+
+    path = str(tmp_path / "scores.arrow")
+    snapshot.write_rows(
+        [
+            (iso, name, None, datetime(2024, 1, 1), 0.0, policy, infra, language, 0.0)
+            for iso, name, policy, infra, language in ROWS
+        ],
+        path,
+    )
+    monkeypatch.setattr(main, "READ_ONLY", True)
+    monkeypatch.setattr(main, "_snapshots", snapshot.SnapshotReader(path))
+    client = TestClient(main.app)
+
+    r = client.post("/simulate", json={})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["weights"] == S.WEIGHTS
+    assert [c["iso_code"] for c in body["countries"]] == ["EU", "IN", "JP"]
+
+    r = client.post(
+        "/simulate",
+        json={"weights": {"policy": 0.1, "infra": 0.7}, "infra": {"in": 100}, "top": 1},
+    )
+    assert [(c["iso_code"], c["baseline_rank"]) for c in r.json()["countries"]] == [("IN", 2)]
+
+    assert client.post("/simulate", json={"language": {"XX": 50}}).status_code == 400
+    assert client.post("/simulate", json={"weights": {"policy": 1.5}}).status_code == 422
+    assert client.post("/simulate", json={"infra": {"EU": 101}}).status_code == 422
+
+
+def test_matrix_has_its_own_slot_keyed_by_data_version(monkeypatch):
+    db = {"version": 1, "loads": 0, "lookups": 0}
+
+    class Cursor:
+        async def execute(self, sql, params=None):
+            self.sql = sql
+            if "data_version" in sql:
+                db["lookups"] += 1
+            else:
+                db["loads"] += 1
+
+        async def fetchone(self):
+            return (db["version"],)
+
+        async def fetchall(self):
+            return ROWS
+
+    @asynccontextmanager
+    async def cursor(query="other"):
+        yield Cursor()
+
+    monkeypatch.setattr(SIM.db, "cursor", cursor)
+    monkeypatch.setattr(SIM, "_db_matrix", None)
+    monkeypatch.setattr(cache, "_cache", cache.ResponseCache(maxsize=1))
+
+    # Listener down: one version lookup per request, no rebuild
+    cache._listening.clear()
+    m = asyncio.run(SIM.matrix())
+    assert asyncio.run(SIM.matrix()) is m
+    assert (db["loads"], db["lookups"]) == (1, 2)
+
+    # Response traffic cannot evict it
+    cache._listening.set()
+    try:
+        for i in range(3):
+            asyncio.run(cache.cached("countries", i, lambda: asyncio.sleep(0)))
+        assert asyncio.run(SIM.matrix()) is m
+        assert asyncio.run(SIM.matrix()) is m  # listener stamped: no query at all
+        assert (db["loads"], db["lookups"]) == (1, 3)
+
+        # A write bumps data_version and notifies
+        db["version"] = 2
+        cache.bump_version()
+        assert asyncio.run(SIM.matrix()) is not m
+        assert db["loads"] == 2
+    finally:
+        cache._listening.clear()
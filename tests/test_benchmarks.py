@@ -0,0 +1,28 @@
+from benchmarks import run as B
+
+
+def test_compare_flags_throughput_drops_past_threshold():
+    baseline = {
+        "a": {"throughput": 1000.0},
+        "b": {"throughput": 1000.0},
+        "gone": {"throughput": 5.0},
+    }
+    current = {
+        "a": {"throughput": 950.0},  # -5%: within threshold
+        "b": {"throughput": 800.0},  # -20%: regression
+        "new": {"throughput": 1.0},
+    }
+    rows, regressions = B.compare(baseline, current, threshold_pct=10)
+    assert regressions == ["b"]
+    changes = {r["case"]: r["change_pct"] for r in rows}
+    assert round(changes["a"], 1) == -5.0
+    assert changes["gone"] is None and changes["new"] is None
+
+
+def test_run_cases_reports_throughput():
+    cases = [("noop[n=10]", "items/s", 10, lambda: None)]
+    results = B.run_cases(cases, repeat=2)
+    entry = results["noop[n=10]"]
+    assert entry["unit"] == "items/s" and entry["loops"] >= 1
+    assert entry["throughput"] > 0
+    assert B.run_cases(cases, repeat=1, only="other") == {}
@@ -0,0 +1,27 @@
+import os
+
+from ingest.blob_store import BlobStore
+from ingest.parse_policies import extract_indicators, extract_indicators_stream
+
+
+def test_put_is_content_addressed_and_compressed(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = ("Rules on data residency. " * 4000).encode()
+
+    digest = store.put(data)
+    assert store.put(data) == digest  # same content, same key, stored once
+    assert os.path.getsize(store.path(digest)) < len(data) // 10
+    with store.open(digest) as f:
+        assert f.read() == data
+
+
+def test_iter_text_streams_for_reparsing(tmp_path):
+    store = BlobStore(str(tmp_path))
+    text = "é" * 100_000 + " third country transfers"
+    digest = store.put(text.encode("utf-8"))
+
+    # Odd chunk size splits multi-byte characters across reads
+    chunks = list(store.iter_text(digest, chunk_bytes=4097))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    assert extract_indicators_stream(store.iter_text(digest)) == extract_indicators(text)
@@ -0,0 +1,45 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from core import export as E
+
+ROWS = [
+    ("EU", "European Union", "Europe", datetime(2024, 1, 1, 12), 61.9, 80.0, 64.5, 70.0, 34.7),
+    ("IN", "India", "Asia", datetime(2024, 1, 2), 54.0, 70.0, 54.0, 70.0, None),
+]
+
+
+def _batches():
+    # Two batches, as the server-side cursor would deliver them
+    return iter([ROWS[:1], ROWS[1:]])
+
+
+def test_ndjson_and_csv_encoders():
+    lines = b"".join(E._ndjson(_batches())).decode().splitlines()
+    assert [json.loads(line)["iso_code"] for line in lines] == ["EU", "IN"]
+    assert json.loads(lines[0])["computed_at"] == "2024-01-01T12:00:00"
+
+    rows = list(csv.reader(io.StringIO(b"".join(E._csv(_batches())).decode())))
+    assert rows[0] == list(E.COLUMNS)
+    assert rows[2][:4] == ["IN", "India", "Asia", "2024-01-02T00:00:00"] and rows[2][-1] == ""
+
+
+def test_arrow_stream_round_trips():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(b"".join(E._arrow(_batches()))).read_all()
+    assert table.num_rows == 2
+    assert table.column("risk_score").to_pylist() == [34.7, None]
+
+
+def test_query_filters_and_validation():
+    sql, params = E._query("history", "asia", datetime(2024, 1, 1), None)
+    assert "readiness_scores" in sql and "lower(c.region)" in sql
+    assert set(params) == {"region", "since"}
+    with pytest.raises(E.ExportError):
+        E._query("everything", None, None, None)
+    with pytest.raises(E.ExportError):
+        E.check_format("xml")
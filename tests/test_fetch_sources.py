@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ingest import fetch_sources as F
+
+
+def test_iter_fetch_retries_and_skips_failures(stub_server, stub_hits, source):
+    sources = [source(stub_server, p) for p in ("/ok", "/flaky", "/missing")]
+    docs = list(F.iter_fetch(sources, backoff=0.01, deadline=10, use_cache=False))
+
+    assert sorted(d["name"] for d in docs) == ["/flaky", "/ok"]
+    assert stub_hits["/flaky"] == 2  # one retry after 503
+    assert stub_hits["/missing"] == 1  # 404 is not retried
+    assert all(d["raw_text"].startswith("policy text") for d in docs)
+
+
+def test_iter_fetch_yields_as_completed_within_deadline(stub_server, source):
+    sources = [source(stub_server, "/slow"), source(stub_server, "/ok")]
+    started = time.monotonic()
+    names = [d["name"] for d in F.iter_fetch(sources, deadline=0.5, use_cache=False)]
+    assert names == ["/ok"]
+    assert time.monotonic() - started < 1.0
+
+
+def test_iter_fetch_revalidates_from_disk_cache(stub_server, tmp_path, source):
+    cache = F.SourceCache(str(tmp_path))
+    sources = [source(stub_server, "/etag"), source(stub_server, "/ok")]
+
+    first = F.FetchStats()
+    docs = {d["name"]: d for d in F.iter_fetch(sources, cache=cache, stats=first)}
+    assert (first.hits, first.misses) == (0, 2)
+    assert not docs["/etag"]["unchanged"] and docs["/etag"]["raw_text"]
+    for d in docs.values():  # what the loader does once the batch has committed
+        d["cache_entry"].commit()
+
+    # /etag answers 304 to the stored validator; /ok re-sends an identical body
+    second = F.FetchStats()
+    docs = {d["name"]: d for d in F.iter_fetch(sources, cache=cache, stats=second)}
+    assert (second.hits, second.misses) == (2, 0)
+    assert all(d["unchanged"] and d["raw_text"] is None for d in docs.values())
+    assert docs["/ok"]["content_hash"] == cache.load(stub_server + "/ok")["content_hash"]
+
+
+def test_cache_is_not_updated_until_the_doc_is_stored(stub_server, tmp_path, source):
+    cache = F.SourceCache(str(tmp_path))
+    sources = [source(stub_server, "/etag")]
+
+    (doc,) = F.iter_fetch(sources, cache=cache)
+    assert cache.load(stub_server + "/etag") is None
+    doc["cache_entry"].abort()  # the load failed
+
+    # No validators were saved, so the next run fetches and loads it again
+    (doc,) = F.iter_fetch(sources, cache=cache)
+    assert not doc["unchanged"] and doc["raw_text"]
+    doc["cache_entry"].commit()
+    assert list(tmp_path.glob("*.tmp")) == []
+
+    (doc,) = F.iter_fetch(sources, cache=cache)
+    assert doc["unchanged"]
+
+
+def test_iter_fetch_parses_full_body_but_stores_head(stub_server, source):
+    from ingest.parse_policies import indicator_stream
+
+    sources = [source(stub_server, "/big")]
+    (doc,) = F.iter_fetch(sources, use_cache=False, parser=indicator_stream)
+    assert len(doc["raw_text"]) == F.MAX_STORED_CHARS
+    # The phrase sits past the stored head; it is still found while streaming
+    assert doc["indicators"]["mentions_cross_border"] is True
+
+
+def test_iter_fetch_stores_full_body_in_blob_store(stub_server, tmp_path, source):
+    from ingest.blob_store import BlobStore
+
+    blobs = BlobStore(str(tmp_path))
+    (doc,) = F.iter_fetch([source(stub_server, "/big")], use_cache=False, blobs=blobs)
+    assert doc["blob"] == doc["content_hash"]
+    assert blobs.read_text(doc["blob"]).endswith(" third country ")
+    assert len(blobs.read_text(doc["blob"])) > F.MAX_STORED_CHARS
@@ -0,0 +1,158 @@
+import functools
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("psycopg2")
+
+# load_db runs as a script from ingest/ and imports its siblings by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ingest"))
+
+import load_db as L  # noqa: E402
+from blob_store import BlobStore  # noqa: E402
+from fetch_sources import SourceCache  # noqa: E402
+
+
+class _FakeConn:
+    def __init__(self):
+        self.commits = self.rollbacks = 0
+        self.closed = False
+        self.statements = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_failed_load_is_reloaded_on_next_run(stub_server, tmp_path, monkeypatch, source):
+    cache = SourceCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(L, "iter_fetch", functools.partial(L.iter_fetch, cache=cache))
+    monkeypatch.setattr(L, "get_conn", _FakeConn)
+    sources = [source(stub_server, "/ok")]
+    blobs = BlobStore(str(tmp_path / "blobs"))
+
+    def failing(cur, docs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(L, "load_batch", failing)
+    with pytest.raises(RuntimeError):
+        L.main(sources=sources, blobs=blobs)
+
+    loaded = []
+
+    def recording(cur, docs):
+        loaded.extend(d["name"] for d in docs)
+        return len(docs), 0
+
+    monkeypatch.setattr(L, "load_batch", recording)
+    L.main(sources=sources, blobs=blobs)
+    assert loaded == ["/ok"]
+
+    # Stored now, so the run after that skips it
+    L.main(sources=sources, blobs=blobs)
+    assert loaded == ["/ok"]
+
+
+def test_failed_batch_rolls_back_and_stops_the_fetch_stage(
+    stub_server, tmp_path, monkeypatch, source
+):
+    monkeypatch.setattr(L, "iter_fetch", functools.partial(L.iter_fetch, use_cache=False))
+    conns = []
+    monkeypatch.setattr(L, "get_conn", lambda: conns.append(_FakeConn()) or conns[-1])
+
+    def failing(cur, docs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(L, "load_batch", failing)
+    sources = [source(stub_server, f"/doc{i}") for i in range(20)]
+    with pytest.raises(RuntimeError):
+        L.main(sources=sources, blobs=BlobStore(str(tmp_path)), batch_size=1, buffer=1)
+
+    (conn,) = conns
+    assert conn.rollbacks == 1 and conn.closed and conn.commits == 0
+    # The producer no longer blocks on the full queue; it exits instead
+    deadline = time.monotonic() + 5
+    while any(t.name == "ingest-fetch" for t in threading.enumerate()):
+        assert time.monotonic() < deadline, "fetch thread still running"
+        time.sleep(0.05)
+
+
+def _doc(path, text, country="Testland"):
+    return {
+        "country": country,
+        "iso_code": "TL",
+        "name": path,
+        "url": "http://stub" + path,
+        "category": "test",
+        "raw_text": text,
+        "indicators": {"mentions_cloud": "cloud" in text},
+    }
+
+
+def test_load_batch_counts_renamed_countries(pg_cursor):
+    assert L.load_batch(pg_cursor, [_doc("/a", "cloud")]) == (1, 1)
+    assert L.load_batch(pg_cursor, [_doc("/a", "cloud")]) == (0, 0)
+    assert L.load_batch(pg_cursor, [_doc("/a", "cloud", country="Testland Republic")]) == (0, 1)
+
+
+def test_rename_only_batch_notifies(stub_server, tmp_path, monkeypatch, source):
+    # A batch whose only effect is a rename still reaches the API
+    monkeypatch.setattr(L, "iter_fetch", functools.partial(L.iter_fetch, use_cache=False))
+    conns = []
+    monkeypatch.setattr(L, "get_conn", lambda: conns.append(_FakeConn()) or conns[-1])
+    monkeypatch.setattr(L, "load_batch", lambda cur, docs: (0, 1))
+    L.main(sources=[source(stub_server, "/ok")], blobs=BlobStore(str(tmp_path)))
+    assert any("pg_notify" in sql for sql in conns[-1].statements)
+
+    monkeypatch.setattr(L, "load_batch", lambda cur, docs: (0, 0))
+    L.main(sources=[source(stub_server, "/ok")], blobs=BlobStore(str(tmp_path)))
+    assert not any("pg_notify" in sql for sql in conns[-1].statements)
+
+
+def _stored(cur):
+    cur.execute(
+        """
+        SELECT p.source_url, p.raw_text, pi.value
+        FROM policies p JOIN policy_indicators pi ON pi.policy_id = p.id
+        ORDER BY p.source_url;
+        """
+    )
+    return cur.fetchall()
+
+
+def test_reloading_a_batch_writes_nothing(pg_cursor):
+    docs = [_doc("/a", "cloud"), _doc("/b", "paper")]
+    assert L.load_batch(pg_cursor, docs) == (2, 1)
+    before = _stored(pg_cursor)
+    assert L.load_batch(pg_cursor, docs) == (0, 0)
+    assert _stored(pg_cursor) == before
+
+
+def test_changed_doc_replaces_its_predecessor(pg_cursor):
+    L.load_batch(pg_cursor, [_doc("/a", "cloud"), _doc("/b", "paper")])
+    assert L.load_batch(pg_cursor, [_doc("/a", "on paper")]) == (1, 0)
+    assert _stored(pg_cursor) == [
+        ("http://stub/a", "on paper", "false"),
+        ("http://stub/b", "paper", "false"),
+    ]
+
+
+def test_two_versions_in_one_batch_keep_the_last(pg_cursor):
+    L.load_batch(pg_cursor, [_doc("/a", "v1")])
+    assert L.load_batch(pg_cursor, [_doc("/a", "v2 cloud"), _doc("/a", "v3")]) == (1, 0)
+    assert _stored(pg_cursor) == [("http://stub/a", "v3", "false")]
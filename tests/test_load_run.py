@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from load import run as L
+
+
+def test_percentile_is_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    assert L.percentile(values, 50) == 0.05
+    assert L.percentile(values, 95) == 0.095
+    assert L.percentile(values, 99) == 0.099
+    assert L.percentile([0.2], 99) == 0.2
+    assert L.percentile([], 50) is None
+
+
+def test_summary_checks_p95_against_slo():
+    fast = L.summarize("countries", 10.0, [0.01] * 95 + [0.5] * 5, 0, 10.0)
+    assert fast["requests"] == 100
+    assert fast["throughput_rps"] == 10.0
+    assert fast["p95_ms"] == 10.0 and fast["max_ms"] == 500.0
+    assert fast["slo_p95_ms"] == 150.0 and fast["slo_met"]
+
+    slow = L.summarize("countries", 10.0, [0.01] * 90 + [0.5] * 10, 0, 10.0)
+    assert not slow["slo_met"]
+
+    failing = L.summarize("compare", 10.0, [0.01] * 99, 1, 10.0)
+    assert failing["requests"] == 100 and not failing["slo_met"]
+
+
+def test_parse_rates():
+    assert L.parse_rates("countries=20, country=100") == {"countries": 20.0, "country": 100.0}
+    with pytest.raises(Exception):
+        L.parse_rates("history=5")
+
+
+def test_compare_path_matches_every_sampled_country(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    import random
+    from datetime import datetime
+
+    from fastapi.testclient import TestClient
+
+    from api import main
+    from core import snapshot
+
+    codes = ["EU", "IN", "JP", "KR", "SG"]
+    path = str(tmp_path / "scores.arrow")
+    snapshot.write_rows(
+        [(c, c, None, datetime(2024, 1, 1), 50.0, 50.0, 50.0, 50.0, 50.0) for c in codes], path
+    )
+    monkeypatch.setattr(main, "READ_ONLY", True)
+    monkeypatch.setattr(main, "_snapshots", snapshot.SnapshotReader(path))
+
+    url = L.compare_path(random.Random(1), codes)
+    sampled = url.split("?", 1)[1].count("iso=")
+    r = TestClient(main.app).get(url)
+    assert r.status_code == 200
+    assert len(r.json()) == sampled >= 3
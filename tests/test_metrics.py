@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from api import metrics as M
+from api.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = M.Histogram("t_seconds", "test", ("route",), (0.1, 1.0))
+    h.observe(0.05, ("/a",))
+    h.observe(0.1, ("/a",))  # le is inclusive
+    h.observe(3.0, ("/a",))
+    lines = h.render()
+    assert 't_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 't_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 't_seconds_count{route="/a"} 3' in lines
+
+
+def test_requests_are_recorded_by_route_template():
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/no-such-path")
+    body = client.get("/metrics").text
+    assert 'sovai_http_request_duration_seconds_count{route="/health",method="GET",status="200"}' in body
+    assert 'route="unmatched",method="GET",status="404"' in body
+    assert 'sovai_http_response_size_bytes_bucket{route="/health",status="200",le="256"}' in body
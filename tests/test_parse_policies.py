@@ -0,0 +1,30 @@
+from ingest import parse_policies as P
+
+
+def test_extract_indicators_flags_and_legacy_keys():
+    out = P.extract_indicators("Rules on Data Residency and High-Risk AI systems.")
+    assert out == {
+        "mentions_data_localization": True,
+        "mentions_ai_systems": True,
+        "mentions_cross_border": False,
+        "data_residency_required": True,
+        "ai_registry_required": True,
+        "cross_border_restrictions": False,
+    }
+
+
+def test_stream_matches_phrases_split_across_chunks():
+    text = "Transfers to a third country require approval. " * 3 + "See the AI registry."
+    expected = P.extract_indicators(text)
+    for size in (1, 2, 5, 13):
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        assert P.extract_indicators_stream(chunks) == expected
+    assert expected["mentions_cross_border"] and expected["mentions_ai_systems"]
+
+
+def test_stream_stops_once_every_indicator_is_found():
+    scan = P.indicator_stream()
+    assert not scan.feed("data localisation, cross bor")
+    assert scan.feed("der rules for each ai sys") is False
+    assert scan.feed("tem") is True
+    assert scan.feed("anything else") is True
@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+
+from core import rankings as R
+
+T = datetime(2024, 1, 1)
+# iso, name, region, computed_at, readiness, policy, infra, language, risk
+ROWS = [
+    ("EU", "European Union", "Europe", T, 61.9, 80.0, 64.5, 70.0, 34.7),
+    ("IN", "India", "Asia", T, 54.0, 70.0, 54.0, 70.0, 41.8),
+    ("JP", "Japan", "Asia", T, 50.9, 65.0, 61.2, 55.0, 44.6),
+    ("KR", "South Korea", "Asia", T, 50.9, 65.0, 67.3, 55.0, 44.6),
+    ("XX", "Nowhere", None, T, 40.0, 50.0, 50.0, 55.0, 60.0),
+    ("ZZ", "Unscored", "Asia", None, None, None, None, None, None),
+]
+
+
+def test_overall_ranking_with_ties_and_percentiles():
+    index = R.RankingIndex(ROWS)
+    top = index.top("readiness")
+    assert [(e.iso_code, e.position, e.rank) for e in top] == [
+        ("EU", 1, 1),
+        ("IN", 2, 2),
+        ("JP", 3, 3),  # tie with KR: same rank, name order
+        ("KR", 4, 3),
+        ("XX", 5, 5),
+    ]
+    assert [e.percentile for e in top] == [100.0, 75.0, 50.0, 50.0, 0.0]
+    assert top[0].total == 5
+    assert [e.iso_code for e in index.top("readiness", k=2)] == ["EU", "IN"]
+
+
+def test_risk_is_lower_is_better_and_regions_are_scoped():
+    index = R.RankingIndex(ROWS)
+    assert [e.iso_code for e in index.top("risk")][:2] == ["EU", "IN"]
+    asia = index.top("infra", "Asia")
+    assert [(e.iso_code, e.rank, e.total) for e in asia] == [
+        ("KR", 1, 3),
+        ("JP", 2, 3),
+        ("IN", 3, 3),
+    ]
+    assert index.scopes() == ["Asia", "Europe"]
+    assert index.top("infra", "Nowhere") == []
+
+
+def test_country_lookup_covers_overall_and_region():
+    index = R.RankingIndex(ROWS)
+    found = index.country("JP")
+    assert {(c, s) for c, s, _e in found} == {
+        (c, s) for c in R.COMPONENTS for s in (R.OVERALL, "Asia")
+    }
+    assert len(index.country("XX")) == len(R.COMPONENTS)  # no region: overall only
+    assert index.country("ZZ") == []
+
+
+def test_ranking_endpoints_read_only(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    pytest.importorskip("pyarrow")
+    from fastapi.testclient import TestClient
+
+    from api import main
+    from core import snapshot
+
+    path = str(tmp_path / "scores.arrow")
+    snapshot.write_rows(ROWS, path)
+    monkeypatch.setattr(main, "READ_ONLY", True)
+    monkeypatch.setattr(main, "_snapshots", snapshot.SnapshotReader(path))
+    client = TestClient(main.app)
+
+    r = client.get("/rankings", params={"component": "infra", "region": "Asia", "top": 2})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["total"] == 3 and body["lower_is_better"] is False
+    assert [e["iso_code"] for e in body["entries"]] == ["KR", "JP"]
+    assert client.get("/rankings", params={"component": "risk"}).json()["lower_is_better"]
+
+    r = client.get("/country/jp/rank")
+    assert r.status_code == 200
+    ranks = r.json()["ranks"]
+    assert (ranks[0]["component"], ranks[0]["scope"], ranks[0]["rank"]) == ("readiness", "all", 3)
+    assert ranks[-1]["scope"] == "Asia"
+
+    assert client.get("/rankings", params={"region": "Atlantis"}).status_code == 404
+    assert client.get("/country/ZZ/rank").status_code == 404
+    assert client.get("/rankings", params={"component": "speed"}).status_code == 422
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("psycopg2")
+
+# reparse runs as a script from ingest/ and imports its siblings by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ingest"))
+
+import parse_policies  # noqa: E402
+import reparse as R  # noqa: E402
+from blob_store import BlobStore  # noqa: E402
+
+from api import cache, http_cache  # noqa: E402
+
+
+class _Conn:
+    """The fixture's connection, minus commits (the test rolls everything back)."""
+
+    def __init__(self, cur):
+        self._conn = cur.connection
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def commit(self):
+        pass
+
+
+class _AsyncCursor:
+    def __init__(self, cur):
+        self._cur = cur
+
+    async def execute(self, sql, params=None):
+        self._cur.execute(sql, params)
+
+    async def fetchone(self):
+        return self._cur.fetchone()
+
+
+def _country_etag(cur, monkeypatch) -> str:
+    @asynccontextmanager
+    async def cursor(query="other"):
+        yield _AsyncCursor(cur)
+
+    monkeypatch.setattr(http_cache.db, "cursor", cursor)
+    cache._listening.clear()
+    return asyncio.run(http_cache.validators("country", "TL"))[0]
+
+
+def test_reparse_with_new_keywords_changes_country_etag(pg_cursor, tmp_path, monkeypatch):
+    store = BlobStore(str(tmp_path))
+    text = "Public bodies must keep records in a sovereign cloud."
+    pg_cursor.execute("INSERT INTO countries (iso_code, name) VALUES ('TL', 'Testland');")
+    pg_cursor.execute(
+        """
+        INSERT INTO policies (country_id, name, source_url, raw_blob)
+        SELECT id, 'Cloud act', 'http://stub/a', %s FROM countries;
+        """,
+        (store.put(text.encode("utf-8")),),
+    )
+    conn = _Conn(pg_cursor)
+    assert R.reparse(conn, store) == 6
+    etag = _country_etag(pg_cursor, monkeypatch)
+
+    # Same keywords: nothing changes, clients keep their copy
+    assert R.reparse(conn, store) == 0
+    assert _country_etag(pg_cursor, monkeypatch) == etag
+
+    registry = dict(parse_policies.INDICATOR_KEYWORDS)
+    registry["mentions_data_localization"] += ("sovereign cloud",)
+    monkeypatch.setattr(
+        parse_policies, "_DEFAULT_MATCHER", parse_policies.KeywordMatcher(registry)
+    )
+    # The flag and its legacy twin flip in place: no new rows, no new scores
+    assert R.reparse(conn, store) == 2
+    assert _country_etag(pg_cursor, monkeypatch) != etag
@@ -34,3 +34,43 @@ def test_language_and_risk_simple():
     # composite = 0.4*80 + 0.3*60 + 0.2*70 = 32 + 18 + 14 = 64 -> risk = 36
     assert math.isclose(risk, 36.0)
 
+
+def test_score_arrays_match_per_row_helpers():
+    isos = ["EU", "in", "JP", "KR", "ZZ"]
+    indicators = [
+        {"mentions_data_localization": "true", "mentions_ai_systems": "true", "mentions_cross_border": "true"},
+        {"data_residency_required": "yes", "mentions_ai_systems": "false", "ai_registry_required": "true"},
+        {"mentions_ai_systems": "1"},
+        {},
+        {"mentions_cross_border": "", "cross_border_restrictions": "y"},
+    ]
+    infra = [
+        {"gpu_capacity_index": 65.0, "power_cost_index": 55.0},
+        {"gpu_capacity_index": 55.0, "power_cost_index": 60.0},
+        {"power_cost_index": 0.0},
+        {},
+        {"gpu_capacity_index": 120.0, "power_cost_index": 10.0},
+    ]
+    arrays = S._compute_score_arrays(isos, indicators, infra)
+
+    for i, iso in enumerate(isos):
+        policy, _ = S._compute_policy_score(indicators[i])
+        infra_score, _ = S._compute_infra_score(infra[i])
+        language = S._compute_language_score(iso)
+        risk = S._compute_risk_score(policy, infra_score, language)
+        readiness = 0.4 * policy + 0.3 * infra_score + 0.2 * language - 0.1 * risk
+        # Exact equality: the batch engine must not drift from the per-row rules
+        assert arrays["policy"][i] == policy
+        assert arrays["infra"][i] == infra_score
+        assert arrays["language"][i] == language
+        assert arrays["risk"][i] == risk
+        assert arrays["readiness"][i] == readiness
+
+
+def test_input_fingerprint_tracks_inputs_not_order():
+    base = S._input_fingerprint("eu", {"a": "true", "b": "false"}, {"gpu_capacity_index": 60.0})
+    same = S._input_fingerprint("EU", {"b": "false", "a": "true"}, {"gpu_capacity_index": 60.0})
+    assert base == same
+    assert base != S._input_fingerprint("EU", {"a": "true", "b": "true"}, {"gpu_capacity_index": 60.0})
+    assert base != S._input_fingerprint("EU", {"a": "true", "b": "false"}, {"gpu_capacity_index": 61.0})
+    assert base != S._input_fingerprint("IN", {"a": "true", "b": "false"}, {"gpu_capacity_index": 60.0})
@@ -0,0 +1,98 @@
+import pytest
+
+from core import scoring, snapshot
+from core import sharding as SH
+
+
+def test_shard_ranges_cover_every_id_once():
+    ids = [1, 2, 3, 5, 8, 13, 21, 34, 55, 89]
+    ranges = SH.shard_ranges(ids, 3)
+    assert ranges == [(1, 3), (5, 13), (21, 89)]
+    covered = [i for i in ids for first, last in ranges if first <= i <= last]
+    assert covered == ids
+
+
+def test_shard_ranges_edge_cases():
+    assert SH.shard_ranges([], 4) == []
+    assert SH.shard_ranges([7, 9], 8) == [(7, 7), (9, 9)]  # never more shards than ids
+    assert SH.shard_ranges([7, 9], 0) == [(7, 9)]
+
+
+@pytest.fixture()
+def scored_db(pg_cursor, pg_connect, monkeypatch):
+    """Four countries with inputs; every get_conn() shares the test transaction."""
+    pg_cursor.execute(
+        """
+        INSERT INTO countries (iso_code, name, region) VALUES
+            ('AA', 'Aland', 'Europe'), ('BB', 'Bland', 'Europe'),
+            ('CC', 'Cland', 'Asia'), ('DD', 'Dland', 'Asia');
+        INSERT INTO infra_signals (country_id, metric, value)
+        SELECT id, 'gpu_capacity_index', 10 * id FROM countries;
+        """
+    )
+    monkeypatch.setattr(scoring, "get_conn", pg_connect)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_PATH", "")
+    return pg_cursor
+
+
+def _one(cur, sql, params=None):
+    cur.execute(sql, params)
+    return cur.fetchone()
+
+
+def test_sharded_run_scores_each_shard_once_and_publishes_together(scored_db):
+    cur = scored_db
+    run_id = SH.start(shards=2, full=True)
+    with pytest.raises(SH.ShardingError, match="in progress"):
+        SH.start(shards=2)
+    with pytest.raises(SH.ShardingError, match="2 shard"):
+        SH.finalize(run_id)
+
+    assert SH.work(run_id) == 2
+    assert SH.work(run_id) == 0  # nothing left to claim
+    assert _one(cur, "SELECT count(*) FROM scoring_results;") == (4,)
+    # Staged only: the API still serves the previous (empty) state
+    assert _one(cur, "SELECT count(*) FROM latest_scores;") == (0,)
+
+    version = _one(cur, "SELECT version FROM data_version;")[0]
+    assert SH.finalize() == run_id
+    (computed_at,) = _one(cur, "SELECT computed_at FROM scoring_runs WHERE id = %s;", (run_id,))
+    assert _one(cur, "SELECT count(*), min(computed_at), max(computed_at) FROM latest_scores;") == (
+        4,
+        computed_at,
+        computed_at,
+    )
+    assert _one(cur, "SELECT count(*) FROM scoring_results;") == (0,)
+    assert _one(cur, "SELECT status FROM scoring_runs WHERE id = %s;", (run_id,)) == ("finalized",)
+    assert _one(cur, "SELECT count(*) > 0 FROM rankings;") == (True,)
+    assert _one(cur, "SELECT version FROM data_version;")[0] > version
+
+
+def test_abort_drops_staged_results_and_frees_the_run_slot(scored_db):
+    cur = scored_db
+    run_id = SH.start(shards=2)
+    SH.work(run_id)
+    assert SH.abort() == run_id
+    assert _one(cur, "SELECT status FROM scoring_runs WHERE id = %s;", (run_id,)) == ("aborted",)
+    assert _one(cur, "SELECT count(*) FROM scoring_results;") == (0,)
+    assert _one(cur, "SELECT count(*) FROM latest_scores;") == (0,)
+    with pytest.raises(SH.ShardingError, match="not in progress"):
+        SH.finalize(run_id)
+    assert SH.start(shards=1) != run_id
+
+
+def test_finalize_keeps_newer_scores_of_a_plain_run(scored_db):
+    cur = scored_db
+    run_id = SH.start(shards=2, full=True)
+    SH.work(run_id)
+    # A plain run commits while the sharded one waits to be finalized
+    cur.execute("UPDATE infra_signals SET value = value + 5;")
+    scoring.compute_scores()
+    cur.execute("SELECT country_id, score, computed_at FROM latest_scores ORDER BY 1;")
+    newer = cur.fetchall()
+
+    SH.finalize(run_id)
+    cur.execute("SELECT country_id, score, computed_at FROM latest_scores ORDER BY 1;")
+    assert cur.fetchall() == newer
+    # The run's snapshots still land in the history
+    assert _one(cur, "SELECT count(DISTINCT computed_at) FROM readiness_scores;") == (2,)
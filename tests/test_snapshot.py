@@ -0,0 +1,92 @@
+import os
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from core import snapshot as SN
+
+ROWS = [
+    ("EU", "European Union", "Europe", datetime(2024, 1, 2), 61.9, 80.0, 64.5, 70.0, 34.7),
+    ("IN", "India", "Asia", datetime(2024, 1, 1), 54.0, 70.0, 54.0, 70.0, 41.8),
+    ("ZZ", "Unscored", None, None, None, None, None, None, None),
+]
+
+
+def test_snapshot_round_trip_and_select(tmp_path):
+    path = str(tmp_path / "scores.arrow")
+    version = SN.write_rows(ROWS, path)
+    assert SN.write_rows(ROWS, path) == version  # content-derived
+
+    snap = SN.SnapshotReader(path).get()
+    assert snap.version == version
+    assert snap.computed_at == datetime(2024, 1, 2)
+    assert [r["iso_code"] for r in snap.rows()] == ["EU", "IN", "ZZ"]
+    assert snap.rows()[2]["readiness_score"] is None
+    assert [r["iso_code"] for r in snap.select(["ZZ", "EU"])] == ["EU", "ZZ"]
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+
+def test_reader_picks_up_swapped_snapshot(tmp_path):
+    path = str(tmp_path / "scores.arrow")
+    SN.write_rows(ROWS, path)
+    reader = SN.SnapshotReader(path)
+    first = reader.get()
+    assert reader.get() is first
+
+    SN.write_rows(ROWS[:1], path)
+    second = reader.get()
+    assert second is not first and len(second.rows()) == 1
+    # A request still holding the old mapping keeps reading it safely
+    assert len(first.rows()) == 3
+
+
+def test_missing_snapshot_raises(tmp_path):
+    with pytest.raises(SN.SnapshotError):
+        SN.SnapshotReader(str(tmp_path / "missing.arrow")).get()
+
+
+def test_read_only_app_never_connects_to_postgres(tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from api import cache, db, main
+
+    def no_database(*args, **kwargs):
+        raise AssertionError("read-only worker dialed Postgres")
+
+    path = str(tmp_path / "scores.arrow")
+    SN.write_rows(ROWS, path)
+    monkeypatch.setattr(main, "READ_ONLY", True)
+    monkeypatch.setattr(main, "READ_ONLY_DB", False)
+    monkeypatch.setattr(main, "_snapshots", SN.SnapshotReader(path))
+    monkeypatch.setattr(db, "get_conn", no_database)
+    monkeypatch.setattr(db, "_conn_kwargs", no_database)
+
+    with TestClient(main.app) as client:
+        assert db._pool is None and db._async_pool is None
+        assert cache._thread is None
+        assert client.get("/countries").status_code == 200
+        assert client.get("/compare", params={"iso": "EU"}).status_code == 200
+        assert client.get("/country/EU").status_code == 503
+        assert client.get("/history", params={"iso": "EU"}).status_code == 503
+
+
+def test_fetch_rows_lists_every_country_by_name(pg_cursor):
+    pg_cursor.execute(
+        """
+        INSERT INTO countries (iso_code, name, region) VALUES
+            ('IN', 'India', 'Asia'), ('EU', 'European Union', 'Europe'), ('ZZ', 'Unscored', NULL);
+        INSERT INTO latest_scores (
+            country_id, score, policy_score, infra_score, language_score, risk_score, computed_at
+        )
+        SELECT id, 61.9, 80, 64.5, 70, 34.7, '2024-01-02' FROM countries WHERE iso_code = 'EU';
+        """
+    )
+    rows = SN.fetch_rows(pg_cursor)
+    assert [r[0] for r in rows] == ["EU", "IN", "ZZ"]
+    assert rows[0] == ROWS[0]  # NUMERIC scores come back as floats
+    assert rows[1][3:] == (None,) * 6
+    # Rows are what write_rows() stores
+    assert len(rows[0]) == len(SN.COLUMNS)
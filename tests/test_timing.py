@@ -0,0 +1,46 @@
+import json
+import logging
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from api import timing as T
+from api.main import app
+
+
+def test_request_id_is_echoed_or_generated():
+    client = TestClient(app)
+    r = client.get("/health", headers={"X-Request-ID": "req-42"})
+    assert r.headers["x-request-id"] == "req-42"
+
+    r = client.get("/health", headers={"X-Request-ID": "not valid\tid"})
+    assert r.headers["x-request-id"] != "not valid\tid" and len(r.headers["x-request-id"]) == 32
+
+
+def test_server_timing_reports_encode_and_total():
+    r = TestClient(app).get("/methodology")
+    parts = [p.split(";")[0] for p in r.headers["server-timing"].split(", ")]
+    assert parts[-1] == "total" and "encode" in parts
+
+
+def test_phases_are_noops_outside_requests():
+    with T.phase("model"):
+        pass
+    T.add("db", 1.0)
+    assert T.current_request_id() is None
+
+
+def test_request_log_lines_reach_stderr_without_logging_config(monkeypatch, capsys):
+    monkeypatch.setattr(logging.getLogger(), "handlers", [])
+    monkeypatch.setattr(T.logger, "handlers", [])
+    monkeypatch.setattr(T.logger, "level", logging.NOTSET)
+    monkeypatch.setattr(T, "SAMPLE_RATE", 1.0)
+    T.configure_logging()
+    T.configure_logging()
+    assert len(T.logger.handlers) == 1
+
+    TestClient(app).get("/health", headers={"X-Request-ID": "req-log"})
+    line = json.loads(capsys.readouterr().err.strip().splitlines()[-1])
+    assert line["request_id"] == "req-log" and line["route"] == "/health"